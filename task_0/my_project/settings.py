@@ -48,6 +48,7 @@ load_dotenv()
 
 
 MIDDLEWARE = [
+    'profile_app.middleware.RequestMetricsMiddleware', # First: its timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -132,4 +133,29 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Access the profile data from environment variables
 PROFILE_EMAIL = os.getenv('MY_EMAIL')
 PROFILE_NAME = os.getenv('MY_NAME')
-PROFILE_STACK = os.getenv('MY_STACK')
\ No newline at end of file
+PROFILE_STACK = os.getenv('MY_STACK')
+
+# Cat-facts list API used by /me (point it at a local fake server for load tests)
+CAT_FACTS_API_URL = os.getenv('CAT_FACTS_API_URL', 'https://catfact.ninja/facts')
+
+# In-memory fact pool behind /me (profile_app.facts.FactPool), one per worker process
+CAT_FACT_POOL = {
+    'SIZE': 50,               # Facts fetched per refresh (one upstream request)
+    'REFRESH_INTERVAL': int(os.getenv('CAT_FACT_REFRESH_INTERVAL', 300)),  # Seconds between refresh attempts; stale facts are served meanwhile
+    'TIMEOUT': 5,             # Seconds per upstream request
+    'RETRY_INTERVAL': 5,      # Seconds before retrying a failed fetch while no facts are pooled yet
+}
+
+# HTTP client for the cat-fact API (profile_app.upstream): keep-alive connection
+# pool plus a circuit breaker that fails fast while the API is down
+CAT_FACT_UPSTREAM = {
+    'POOL_MAXSIZE': 10,        # Keep-alive connections kept per worker process
+    'FAILURE_THRESHOLD': 3,    # Consecutive failures/timeouts that open the breaker
+    'COOLDOWN': 30,            # Seconds the breaker stays open before a half-open probe
+    'HALF_OPEN_MAX_CALLS': 1,  # Concurrent probe requests while half-open
+}
+
+# Request instrumentation (profile_app.middleware.RequestMetricsMiddleware): add a
+# Server-Timing header with the per-phase durations to every response. The /metrics
+# histograms are collected either way; disable the header to hide timings from clients.
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'true').lower() == 'true'
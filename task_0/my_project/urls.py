@@ -17,7 +17,15 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path , include
 
+from profile_app.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('me', include('profile_app.urls'))
+    path('me', include('profile_app.urls')),
+
+    # Async (ASGI) variant of /me
+    path('async/me', include('profile_app.async_urls')),
+
+    # Prometheus metrics of this worker process
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+from .metrics import install_query_recorder
 
 
 class ProfileAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profile_app'
+
+    def ready(self):
+        connection_created.connect(install_query_recorder, dispatch_uid='profile_app.install_query_recorder')
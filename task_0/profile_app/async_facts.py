@@ -0,0 +1,87 @@
+# task_0/profile_app/async_facts.py
+# Async counterpart of facts.py for the ASGI /async/me view: the pool is refreshed
+# with httpx on the event loop, and concurrent requests share one in-flight fetch.
+
+import asyncio
+import weakref
+
+import httpx
+import requests
+
+from .facts import FactPool, facts_from_body, pool_options
+from .metrics import timed
+from .upstream import get_upstream_client
+
+
+@timed('upstream')
+async def afetch_cat_facts(breaker, url, limit, timeout) -> list:
+    """
+    Async fetch_cat_facts() with httpx, guarded by the same circuit breaker as the
+    sync client. Raises CircuitOpenError, httpx.HTTPError or ValueError on failure.
+    """
+    breaker.before_call()
+    try:
+        # One short-lived client per refresh: refreshes are minutes apart, so there is
+        # no connection worth keeping, and nothing stays bound to a finished event loop
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(url, params={'limit': limit})
+            response.raise_for_status()
+    except httpx.HTTPError as exc:
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500:
+            breaker.record_success() # 4xx: the upstream is up
+        else:
+            breaker.record_failure()
+        raise
+    breaker.record_success()
+    return facts_from_body(response.json())
+
+
+class AsyncFactPool(FactPool):
+    """
+    FactPool for one event loop. A refresh runs as a single asyncio task that all
+    requests arriving meanwhile share (single-flight): a burst of cold-start
+    requests waits on one upstream call, and stale facts are served while a
+    background refresh runs.
+    """
+
+    def __init__(self, *args, breaker=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker       # upstream.CircuitBreaker (default: the process-wide one)
+        self._task = None            # the in-flight refresh
+
+    async def aget_fact(self) -> str:
+        """Async get_fact()."""
+        if self._task is None and self._due():
+            self._task = asyncio.create_task(self._arun_refresh())
+        # Cold start: wait for the shared fetch (shielded: a client disconnect must not cancel it)
+        if not self.facts and self._task is not None:
+            await asyncio.shield(self._task)
+        return self._pick()
+
+    async def _arun_refresh(self):
+        try:
+            breaker = self.breaker or get_upstream_client().breaker
+            self._store(await afetch_cat_facts(breaker, self.url, self.size, self.timeout))
+        except (httpx.HTTPError, requests.RequestException, ValueError) as exc: # CircuitOpenError is a RequestException
+            self._fail(exc)
+        finally:
+            self._task = None
+
+
+# One pool per event loop: asyncio tasks cannot be shared between loops. Under an
+# ASGI server that is one pool per worker process.
+_pools = weakref.WeakKeyDictionary()
+
+
+def get_async_fact_pool() -> AsyncFactPool:
+    """The AsyncFactPool of the running event loop, configured like get_fact_pool()."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = AsyncFactPool(**pool_options())
+    return pool
+
+
+def reset_async_fact_pools():
+    """Drops every loop's pool (used when the settings change, e.g. in tests)."""
+    _pools.clear()
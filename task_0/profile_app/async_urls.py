@@ -0,0 +1,7 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    # Async (ASGI) variant of the /me endpoint
+    path('', async_views.profile_endpoint_async, name='profile_endpoint_async'),
+]
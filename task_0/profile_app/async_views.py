@@ -0,0 +1,21 @@
+# task_0/profile_app/async_views.py
+# Async variant of /me, served under /async/me. Meant to run under an ASGI server
+# (e.g. gunicorn my_project.asgi:application -k uvicorn_worker.UvicornWorker), where
+# one event loop per worker shares a single fact pool and in-flight refresh.
+
+from django.http import JsonResponse
+
+from .async_facts import get_async_fact_pool
+from .views import profile_response
+
+
+async def profile_endpoint_async(request):
+    """
+    Handles GET /async/me (same response as /me). A request never blocks the
+    event loop: concurrent requests share one upstream fetch (see AsyncFactPool).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    cat_fact = await get_async_fact_pool().aget_fact()
+    return profile_response(cat_fact)
@@ -0,0 +1,174 @@
+# task_0/profile_app/facts.py
+# In-memory pool of cat facts for /me, refreshed in the background
+# (stale-while-revalidate), so requests never wait on catfact.ninja.
+
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+from .metrics import timed
+from .upstream import get_upstream_client
+
+# List endpoint: one request returns a whole pool of facts
+CAT_FACTS_API = 'https://catfact.ninja/facts'
+
+
+def facts_from_body(body) -> list:
+    """
+    The facts of a decoded list API body ({"data": [{"fact": "..."}, ...]}).
+    Raises ValueError for any other shape, or if it holds no facts.
+    """
+    data = body.get('data', []) if isinstance(body, dict) else None
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValueError(f'Unexpected cat-fact API body: {str(body)[:100]}')
+    facts = [item['fact'] for item in data if isinstance(item.get('fact'), str) and item['fact']]
+    if not facts:
+        raise ValueError('The cat-fact API returned no facts')
+    return facts
+
+
+@timed('upstream')
+def fetch_cat_facts(client, url, limit, timeout) -> list:
+    """
+    GET `limit` facts from the cat-facts list API in one request through `client`
+    (an upstream.UpstreamClient). Raises requests.RequestException (CircuitOpenError
+    while the breaker is open) or ValueError for an unexpected body.
+    """
+    return facts_from_body(client.get_json(url, params={'limit': limit}, timeout=timeout))
+
+
+class FactPool:
+    """
+    Process-local pool of facts. get_fact() answers from memory; once the pool is
+    older than `refresh_interval` seconds it keeps answering with the stale facts
+    while one background thread fetches a new pool. Attempts (successful or not)
+    are at least `refresh_interval` apart, so the upstream sees at most one
+    request per interval and per worker process, whatever the traffic.
+    Only the very first request of a process waits for the upstream. While the
+    pool is still empty, a failed fetch is retried after `retry_interval`
+    seconds instead (the upstream client's circuit breaker limits the calls).
+    """
+
+    def __init__(self, url, size=50, refresh_interval=300.0, timeout=5.0, client=None, retry_interval=5.0):
+        self.url = url
+        self.client = client         # upstream.UpstreamClient (default: the process-wide one)
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.retry_interval = min(retry_interval, refresh_interval)
+        self.timeout = timeout
+        self.facts = []
+        self.fetched_at = None       # monotonic time of the last successful refresh
+        self.last_error = None       # str of the last failed refresh (None after a success)
+        self.hits = 0                # facts served from the pool
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._next_attempt = 0.0     # monotonic time before which no refresh starts
+        self._idle = threading.Event()  # Cleared while a refresh runs
+        self._idle.set()
+        self._lock = threading.Lock()
+
+    def get_fact(self) -> str:
+        """A fact from the pool, or the error fallback when none could be fetched yet."""
+        # 1. Cold start: no facts yet, fetch in this request (other requests wait for it)
+        if not self.facts:
+            self._refresh(blocking=True)
+        # 2. Stale pool: keep serving it, refresh in the background
+        elif time.monotonic() >= self._next_attempt:
+            self._refresh(blocking=False)
+
+        return self._pick()
+
+    def _pick(self) -> str:
+        facts = self.facts # Replaced as a whole by _store(), never mutated
+        if not facts:
+            return f'Error retrieving cat fact: {self.last_error}'
+        self.hits += 1
+        return random.choice(facts)
+
+    def _due(self) -> bool:
+        """True once per refresh interval: reserves the next refresh attempt."""
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
+        self._next_attempt = now + self.refresh_interval
+        return True
+
+    def _refresh(self, blocking):
+        with self._lock:
+            due = self._idle.is_set() and self._due()
+            if due:
+                self._idle.clear()
+        if due and blocking:
+            self._run_refresh()
+        elif due:
+            threading.Thread(target=self._run_refresh, name='cat-fact-refresh', daemon=True).start()
+        elif blocking:
+            # Cold start while another request is already fetching: wait for its result
+            self._idle.wait(self.timeout)
+
+    def _run_refresh(self):
+        try:
+            self._store(fetch_cat_facts(self.client or get_upstream_client(), self.url, self.size, self.timeout))
+        except (requests.RequestException, ValueError) as exc:
+            self._fail(exc)
+        finally:
+            self._idle.set()
+
+    def _store(self, facts):
+        self.facts = facts
+        self.fetched_at = time.monotonic()
+        self.last_error = None
+        self.refreshes += 1
+
+    def _fail(self, exc):
+        self.last_error = str(exc)
+        self.refresh_failures += 1
+        # No facts to serve meanwhile: retry soon rather than after a whole refresh interval
+        if not self.facts:
+            with self._lock:
+                self._next_attempt = min(self._next_attempt, time.monotonic() + self.retry_interval)
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'size': len(self.facts),
+            'age_seconds': round(time.monotonic() - self.fetched_at, 3) if self.fetched_at is not None else None,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_options() -> dict:
+    """FactPool keyword arguments from settings.CAT_FACTS_API_URL and settings.CAT_FACT_POOL."""
+    config = getattr(settings, 'CAT_FACT_POOL', {})
+    return {
+        'url': getattr(settings, 'CAT_FACTS_API_URL', CAT_FACTS_API),
+        'size': config.get('SIZE', 50),
+        'refresh_interval': config.get('REFRESH_INTERVAL', 300),
+        'timeout': config.get('TIMEOUT', 5),
+        'retry_interval': config.get('RETRY_INTERVAL', 5),
+    }
+
+
+def get_fact_pool() -> FactPool:
+    """The process-wide FactPool, configured by settings.CAT_FACT_POOL."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = FactPool(**pool_options())
+    return _pool
+
+
+def reset_fact_pool():
+    """Drops the process-wide pool (used when the settings change, e.g. in tests)."""
+    global _pool
+    with _pool_lock:
+        _pool = None
@@ -0,0 +1,104 @@
+# task_0/profile_app/fake_catfact.py
+# A local stand-in for https://catfact.ninja (/fact and /facts?limit=N), so /me
+# can be load tested and tested without depending on the real API's latency or rate limits.
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class _CatFactHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        with self.server.fake.lock:
+            self.server.fake.connections += 1
+
+    def do_GET(self):
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests += 1
+            number = fake.requests
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        url = urlsplit(self.path)
+        if fake.body is not None:
+            body = fake.body
+        elif url.path.rstrip('/').endswith('/facts'):
+            limit = int(parse_qs(url.query).get('limit', ['10'])[0])
+            facts = [f'Cat fact number {number}.{i}.' for i in range(limit)]
+            body = json.dumps({'current_page': 1, 'data': [{'fact': fact, 'length': len(fact)} for fact in facts]})
+        else:
+            fact = f'Cat fact number {number}.'
+            body = json.dumps({'fact': fact, 'length': len(fact)})
+        body = body.encode()
+        self.send_response(fake.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Quiet under load
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024 # Load tests open many connections at once
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError): # Clients that timed out and hung up
+            super().handle_error(request, client_address)
+
+
+class FakeCatFactServer:
+    """
+    Serves the cat-fact API on a free local port from a background thread.
+    `latency` (seconds) delays every answer (slow upstream), `status` is the
+    HTTP status returned (erroring upstream) and `body`, when set, the text served
+    instead of facts (malformed upstream); stop() it for a dead one. `requests`
+    counts the requests served, `connections` the TCP connections accepted.
+    Use as a context manager:
+
+        with FakeCatFactServer(latency=0.05) as fake:
+            ... settings.CAT_FACTS_API_URL = fake.url ...
+    """
+
+    def __init__(self, latency: float = 0.0, status: int = 200, body: str = None):
+        self.latency = latency
+        self.status = status
+        self.body = body
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """URL of the /facts list endpoint."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/facts'
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), _CatFactHandler)
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
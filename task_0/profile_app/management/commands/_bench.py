@@ -0,0 +1,134 @@
+# profile_app/management/commands/_bench.py
+# Shared helpers for the load-test management commands (not a command itself).
+# Same report format as task_1's analyzer_app/management/commands/_bench.py.
+
+import asyncio
+import contextlib
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+
+def emit(command, name: str, results, output: str = None, **extra):
+    """
+    Writes a benchmark report as one machine-readable JSON document
+    (to `output` as well, when given, for diffing between commits).
+    """
+    report = json.dumps({'benchmark': name, **extra, 'results': results}, indent=2)
+    command.stdout.write(report)
+    if output:
+        with open(output, 'w') as report_file:
+            report_file.write(report + '\n')
+
+
+def percentile(sorted_values, fraction: float):
+    """Nearest-rank percentile of an already sorted list (None if empty)."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+async def run_load(send, concurrency: int, duration: float) -> dict:
+    """
+    Keeps `concurrency` clients calling `await send(i)` back to back for `duration`
+    seconds. `send` returns the HTTP status code; 5xx and exceptions count as errors.
+    Returns requests/sec, latency percentiles in milliseconds and a count per status code.
+    """
+    latencies = []
+    errors = 0
+    status_codes = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def client(client_id):
+        nonlocal errors
+        i = client_id
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status_code = await send(i)
+                status_codes[status_code] += 1
+                failed = status_code >= 500
+            except Exception:
+                status_codes['exception'] += 1
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+            i += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': _ms(percentile(latencies, 0.50)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+        'status_codes': {str(code): count for code, count in sorted(status_codes.items(), key=str)},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def local_server(application: str, cwd, workers: int = 4, env=None, timeout: float = 30.0, args=()):
+    """
+    Runs `gunicorn <application> <args>` on a free local port for the duration of
+    the block and yields its base URL. The server inherits this process's
+    environment (settings module, profile variables), plus `env`.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', application, '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--log-level', 'warning', *args],
+        cwd=cwd, env={**os.environ, **(env or {})},
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'gunicorn did not start listening within {timeout}s')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def git_revision(cwd) -> str:
+    """Short commit hash of the checkout (None outside a git checkout), for diffable reports."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
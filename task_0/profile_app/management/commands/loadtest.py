@@ -0,0 +1,82 @@
+# profile_app/management/commands/loadtest.py
+
+import asyncio
+import platform
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from profile_app.fake_catfact import FakeCatFactServer
+from ._bench import emit, git_revision, local_server, run_load
+
+# name -> (gunicorn application, extra gunicorn arguments, path under test)
+DEPLOYMENTS = {
+    # The Procfile deployment: sync workers, sync /me
+    'wsgi': ('my_project.wsgi:application', (), '/me'),
+    # ASGI workers, async /async/me
+    'asgi': ('my_project.asgi:application', ('--worker-class', 'uvicorn_worker.UvicornWorker'), '/async/me'),
+}
+
+
+class Command(BaseCommand):
+    help = ('Load test of /me: starts a local fake cat-fact API and, for each deployment, '
+            'gunicorn pointed at it (CAT_FACTS_API_URL), then drives the endpoint at several '
+            'concurrency levels. Prints requests/sec, p50/p95/p99 latency and the upstream '
+            'calls made as JSON, e.g.\n'
+            '  python manage.py loadtest --fact-latency-ms 50 --output before.json')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deployments', nargs='+', default=list(DEPLOYMENTS), choices=list(DEPLOYMENTS),
+                            help='wsgi: the Procfile deployment (/me); asgi: uvicorn workers (/async/me).')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100],
+                            help='Concurrent clients per run.')
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Seconds per run.')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='gunicorn workers for the local server.')
+        parser.add_argument('--fact-latency-ms', type=float, default=50.0,
+                            help='Delay of every fake cat-fact answer (simulated upstream latency).')
+        parser.add_argument('--refresh-interval', type=int, default=2,
+                            help='Fact pool refresh interval of the servers, in seconds (short, so '
+                                 'refreshes happen during the runs).')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError('loadtest needs httpx (pip install httpx).')
+
+        results = []
+        # 1. Fake upstream, and each deployment of the app pointed at it
+        with FakeCatFactServer(latency=options['fact_latency_ms'] / 1000) as fake:
+            env = {'CAT_FACTS_API_URL': fake.url, 'CAT_FACT_REFRESH_INTERVAL': str(options['refresh_interval'])}
+            for name in options['deployments']:
+                application, server_args, path = DEPLOYMENTS[name]
+                with local_server(application, cwd=settings.BASE_DIR, workers=options['workers'],
+                                  env=env, args=server_args) as url:
+                    # 2. One run per concurrency level
+                    runs = asyncio.run(self.run(httpx, url, path, fake, options))
+                results += [{'deployment': name, 'scenario': 'me', **result} for result in runs]
+
+        # 3. Report
+        emit(self, 'loadtest_me', results, output=options['output'],
+             revision=git_revision(settings.BASE_DIR), python=platform.python_version(),
+             workers=options['workers'], duration=options['duration'],
+             fact_latency_ms=options['fact_latency_ms'], refresh_interval=options['refresh_interval'])
+
+    @staticmethod
+    async def run(httpx, base_url, path, fake, options):
+        limits = httpx.Limits(max_connections=max(options['concurrency']), max_keepalive_connections=None)
+        results = []
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            async def me(i):
+                return (await client.get(path)).status_code
+
+            for concurrency in options['concurrency']:
+                upstream_before = fake.requests
+                result = await run_load(me, concurrency, options['duration'])
+                # Upstream calls during the run (one per pool refresh and worker, not per request)
+                result['upstream_requests'] = fake.requests - upstream_before
+                results.append(result)
+        return results
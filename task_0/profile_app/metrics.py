@@ -0,0 +1,245 @@
+# task_0/profile_app/metrics.py
+# Per-request timings (SQL, cat-fact API call, rendering) and their process-wide
+# aggregation into Prometheus histograms. The request middleware lives in
+# profile_app/middleware.py; /metrics is served by metrics_view().
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+
+from .upstream import CircuitBreaker, get_upstream_client
+
+# Timing record of the request being handled in this thread / task (None outside requests)
+_current = ContextVar('request_metrics', default=None)
+
+PHASES = ('db', 'upstream', 'render')
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestTimings:
+    """Seconds spent per phase, plus the SQL query count, for one request."""
+    __slots__ = ('started', 'phases', 'queries', 'active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.active = set() # Phases being timed right now (nested calls are counted once)
+
+
+def start_request() -> tuple:
+    """Starts a timing record for the current request; returns (record, token for end_request)."""
+    record = RequestTimings()
+    return record, _current.set(record)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def timed(phase):
+    """
+    Decorator adding the time spent in the function (or coroutine function) to
+    `phase` of the current request. Costs one ContextVar lookup when called
+    outside a request.
+    """
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                record = _current.get()
+                if record is None or phase in record.active:
+                    return await func(*args, **kwargs)
+                record.active.add(phase)
+                t0 = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record.phases[phase] += time.perf_counter() - t0
+                    record.active.discard(phase)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record = _current.get()
+            if record is None or phase in record.active:
+                return func(*args, **kwargs)
+            record.active.add(phase)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record.phases[phase] += time.perf_counter() - t0
+                record.active.discard(phase)
+        return wrapper
+    return decorator
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper (see connection.execute_wrappers) counting the
+    queries of the current request and their time.
+    """
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.phases['db'] += time.perf_counter() - t0
+        record.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: wraps every new connection with record_query()."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ----------------------------------------------
+# Aggregation (per process)
+# ----------------------------------------------
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per label tuple. Thread-safe."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {} # labels -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            label_text = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+def format_labels(names, values) -> str:
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time spent handling the request.',
+                             ('route', 'method', 'status'), DURATION_BUCKETS)
+PHASE_DURATION = Histogram('http_request_phase_duration_seconds',
+                           'Time spent per phase of the request (db, upstream, render, view).',
+                           ('route', 'method', 'phase'), DURATION_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'SQL queries executed per request.',
+                       ('route', 'method'), QUERY_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Size of the response body.',
+                          ('route', 'method'), SIZE_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, PHASE_DURATION, DB_QUERIES, RESPONSE_SIZE)
+
+
+def view_time(record: RequestTimings, total) -> float:
+    """Seconds spent in the view, without the JSON encoding."""
+    return max(total - record.phases['render'], 0.0)
+
+
+def observe_request(route, method, status_code, record: RequestTimings, total, size):
+    """Adds one finished request to the histograms."""
+    REQUEST_DURATION.observe((route, method, str(status_code)), total)
+    for phase, seconds in record.phases.items():
+        PHASE_DURATION.observe((route, method, phase), seconds)
+    PHASE_DURATION.observe((route, method, 'view'), view_time(record, total))
+    DB_QUERIES.observe((route, method), record.queries)
+    if size is not None:
+        RESPONSE_SIZE.observe((route, method), size)
+
+
+def server_timing(record: RequestTimings, total, size=None) -> str:
+    """
+    Server-Timing header value, durations in milliseconds. The body size in
+    bytes (unknown for streamed responses) is the description of `size`.
+    """
+    entries = [f'db;dur={record.phases["db"] * 1000:.2f};desc="{record.queries} queries"']
+    entries.extend(f'{phase};dur={record.phases[phase] * 1000:.2f}' for phase in PHASES[1:])
+    entries.append(f'view;dur={view_time(record, total) * 1000:.2f}')
+    entries.append(f'total;dur={total * 1000:.2f}')
+    if size is not None:
+        entries.append(f'size;desc="{size} bytes"')
+    return ', '.join(entries)
+
+
+def fact_pool_metrics() -> list:
+    """Counters of the /me fact pool (see facts.FactPool)."""
+    from .facts import get_fact_pool # facts.py imports this module
+    stats = get_fact_pool().stats()
+    lines = []
+    for metric, key, kind, help_text in (
+            ('cat_fact_pool_hits_total', 'hits', 'counter', 'Facts served from the pool.'),
+            ('cat_fact_pool_refreshes_total', 'refreshes', 'counter', 'Successful pool refreshes.'),
+            ('cat_fact_pool_refresh_failures_total', 'refresh_failures', 'counter', 'Failed pool refreshes.'),
+            ('cat_fact_pool_facts', 'size', 'gauge', 'Facts in the pool.'),
+            ('cat_fact_pool_age_seconds', 'age_seconds', 'gauge', 'Seconds since the last successful refresh.')):
+        if stats[key] is not None:
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}', f'{metric} {stats[key]}']
+    return lines
+
+
+def upstream_metrics() -> list:
+    """State and counters of the cat-fact API circuit breaker (see upstream.CircuitBreaker)."""
+    stats = get_upstream_client().breaker.stats()
+    states = (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN)
+    return [
+        '# HELP cat_fact_circuit_state Circuit breaker state (0 closed, 1 half-open, 2 open).',
+        '# TYPE cat_fact_circuit_state gauge',
+        f'cat_fact_circuit_state {states.index(stats["state"])}',
+        '# HELP cat_fact_circuit_opened_total Times the circuit breaker opened.',
+        '# TYPE cat_fact_circuit_opened_total counter',
+        f'cat_fact_circuit_opened_total {stats["opened"]}',
+        '# HELP cat_fact_circuit_short_circuited_total Upstream calls rejected while open.',
+        '# TYPE cat_fact_circuit_short_circuited_total counter',
+        f'cat_fact_circuit_short_circuited_total {stats["short_circuited"]}',
+    ]
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.expose()
+    lines += fact_pool_metrics()
+    lines += upstream_metrics()
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics in the Prometheus text format. Each worker process keeps its own
+    numbers, so a scrape reports the worker that answered it.
+    """
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
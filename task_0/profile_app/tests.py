@@ -1,3 +1,368 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
 
-# Create your tests here.
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from .async_facts import AsyncFactPool, afetch_cat_facts, reset_async_fact_pools
+from .facts import FactPool, fetch_cat_facts, reset_fact_pool
+from .fake_catfact import FakeCatFactServer
+from .upstream import CircuitBreaker, CircuitOpenError, UpstreamClient, reset_upstream_client
+
+
+# Bodies of a broken or changed upstream: all must fail the refresh with a ValueError
+MALFORMED_BODIES = ('not json', 'null', '"text"', '[{"fact": "a list"}]', '{"data": "not a list"}',
+                    '{"data": ["not an object"]}', '{"data": [{"fact": 42}]}', '{"data": []}', '{}')
+
+
+class FactPoolTests(SimpleTestCase):
+    """FactPool against a local stub of catfact.ninja."""
+
+    def setUp(self):
+        self.fake = FakeCatFactServer().start()
+        self.addCleanup(self.fake.stop)
+
+    def pool(self, **kwargs):
+        client = UpstreamClient()
+        self.addCleanup(client.close)
+        return FactPool(self.fake.url, **{'size': 5, 'refresh_interval': 60, 'client': client, **kwargs})
+
+    def test_serves_from_memory_after_one_fetch(self):
+        pool = self.pool()
+        facts = {pool.get_fact() for _ in range(200)}
+
+        self.assertEqual(self.fake.requests, 1)
+        self.assertTrue(all(fact.startswith('Cat fact number 1.') for fact in facts))
+        self.assertEqual(pool.stats()['size'], 5)
+
+    def test_concurrent_cold_start_fetches_once(self):
+        self.fake.latency = 0.2
+        pool = self.pool()
+        facts = []
+        threads = [threading.Thread(target=lambda: facts.append(pool.get_fact())) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.fake.requests, 1)
+        self.assertEqual(len(facts), 20)
+        self.assertTrue(all(fact.startswith('Cat fact number 1.') for fact in facts))
+
+    def test_stale_pool_is_served_while_refreshing(self):
+        pool = self.pool(refresh_interval=0.1)
+        pool.get_fact()
+        time.sleep(0.15)
+        self.fake.latency = 0.5
+
+        started = time.monotonic()
+        fact = pool.get_fact()
+        self.assertLess(time.monotonic() - started, 0.2) # Did not wait for the upstream
+        self.assertTrue(fact.startswith('Cat fact number 1.'))
+
+        self.assertTrue(pool._idle.wait(2))
+        self.assertEqual(self.fake.requests, 2)
+        self.assertTrue(pool.get_fact().startswith('Cat fact number 2.'))
+
+    def test_one_refresh_per_interval_under_load(self):
+        pool = self.pool(refresh_interval=0.2)
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            pool.get_fact()
+        pool._idle.wait(2)
+
+        # Initial fetch plus at most one refresh per elapsed interval
+        self.assertLessEqual(self.fake.requests, 3)
+
+    def test_failed_refresh_keeps_stale_facts(self):
+        pool = self.pool(refresh_interval=0.1)
+        pool.get_fact()
+        time.sleep(0.15)
+        self.fake.status = 500
+
+        pool.get_fact()
+        self.assertTrue(pool._idle.wait(2))
+        self.assertTrue(pool.get_fact().startswith('Cat fact number 1.'))
+        self.assertEqual(pool.stats()['refresh_failures'], 1)
+
+    def test_unavailable_upstream_returns_fallback_and_retries_soon(self):
+        self.fake.status = 503
+        pool = self.pool(retry_interval=0.1)
+
+        self.assertTrue(pool.get_fact().startswith('Error retrieving cat fact:'))
+        self.assertTrue(pool.get_fact().startswith('Error retrieving cat fact:'))
+        self.assertEqual(self.fake.requests, 1) # Next attempt only after retry_interval
+
+        time.sleep(0.15)
+        self.fake.status = 200
+        self.assertTrue(pool.get_fact().startswith('Cat fact number 2.'))
+        self.assertEqual(self.fake.requests, 2) # Not refresh_interval (60s) later
+
+    def test_malformed_body(self):
+        client = UpstreamClient()
+        self.addCleanup(client.close)
+        for body in MALFORMED_BODIES:
+            with self.subTest(body=body):
+                self.fake.body = body
+                with self.assertRaises(ValueError):
+                    fetch_cat_facts(client, self.fake.url, 5, timeout=5)
+
+        self.fake.body = '{"data": ["not an object"]}'
+        pool = self.pool()
+        self.assertTrue(pool.get_fact().startswith('Error retrieving cat fact: Unexpected cat-fact API body'))
+        self.assertEqual(pool.stats()['refresh_failures'], 1)
+
+
+class UpstreamClientTests(SimpleTestCase):
+    """Keep-alive pooling and the circuit breaker, against a slow, erroring or dead stub."""
+
+    def setUp(self):
+        self.fake = FakeCatFactServer().start()
+        self.addCleanup(self.fake.stop)
+
+    def client_for_test(self, **breaker_options):
+        breaker = CircuitBreaker(**{'failure_threshold': 3, 'cooldown': 0.2, **breaker_options})
+        client = UpstreamClient(breaker)
+        self.addCleanup(client.close)
+        return client
+
+    def test_reuses_connections(self):
+        client = self.client_for_test()
+        for _ in range(5):
+            self.assertEqual(len(client.get_json(self.fake.url, params={'limit': 2})['data']), 2)
+
+        self.assertEqual(self.fake.requests, 5)
+        self.assertEqual(self.fake.connections, 1)
+
+    def test_opens_after_consecutive_errors_and_fails_fast(self):
+        self.fake.status = 500
+        client = self.client_for_test()
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                client.get_json(self.fake.url)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            client.get_json(self.fake.url)
+        self.assertEqual(self.fake.requests, 3) # The open breaker did not call the upstream
+        self.assertEqual(client.breaker.stats()['short_circuited'], 1)
+
+    def test_timeouts_count_as_failures(self):
+        self.fake.latency = 0.5
+        client = self.client_for_test(failure_threshold=2)
+        for _ in range(2):
+            with self.assertRaises(requests.Timeout):
+                client.get_json(self.fake.url, timeout=0.1)
+
+        started = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            client.get_json(self.fake.url, timeout=0.1)
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    def test_dead_upstream_opens_the_breaker(self):
+        url = self.fake.url
+        self.fake.stop()
+        self.addCleanup(self.fake.start) # setUp's cleanup stops it again
+        client = self.client_for_test(failure_threshold=2)
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                client.get_json(url, timeout=1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_client_errors_do_not_open_the_breaker(self):
+        self.fake.status = 404
+        client = self.client_for_test(failure_threshold=1)
+        with self.assertRaises(requests.HTTPError):
+            client.get_json(self.fake.url)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_closes_on_success(self):
+        self.fake.status = 500
+        client = self.client_for_test(failure_threshold=1, cooldown=0.1)
+        with self.assertRaises(requests.HTTPError):
+            client.get_json(self.fake.url)
+        time.sleep(0.15)
+        self.fake.status = 200
+
+        client.get_json(self.fake.url) # The probe
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_half_open_probe_reopens(self):
+        self.fake.status = 500
+        client = self.client_for_test(failure_threshold=1, cooldown=0.1)
+        with self.assertRaises(requests.HTTPError):
+            client.get_json(self.fake.url)
+        time.sleep(0.15)
+
+        with self.assertRaises(requests.HTTPError):
+            client.get_json(self.fake.url)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            client.get_json(self.fake.url)
+        self.assertEqual(self.fake.requests, 2)
+
+    def test_half_open_allows_one_probe_at_a_time(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+        breaker.record_failure()
+        breaker.before_call() # Probe in flight
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        breaker.before_call()
+
+    def test_open_breaker_serves_the_fallback_fact(self):
+        self.fake.status = 503
+        client = self.client_for_test(failure_threshold=1, cooldown=60)
+        with self.assertRaises(requests.HTTPError):
+            client.get_json(self.fake.url)
+
+        pool = FactPool(self.fake.url, refresh_interval=0, client=client)
+        self.assertTrue(pool.get_fact().startswith('Error retrieving cat fact: Circuit breaker open'))
+        self.assertEqual(self.fake.requests, 1)
+
+
+class AsyncFactPoolTests(SimpleTestCase):
+    """Single-flight refreshes of the async pool, against the local stub."""
+
+    def setUp(self):
+        self.fake = FakeCatFactServer().start()
+        self.addCleanup(self.fake.stop)
+
+    def pool(self, **kwargs):
+        return AsyncFactPool(self.fake.url, **{'size': 5, 'refresh_interval': 60,
+                                               'breaker': CircuitBreaker(), **kwargs})
+
+    async def test_burst_of_cold_requests_makes_one_upstream_call(self):
+        self.fake.latency = 0.2
+        pool = self.pool()
+        facts = await asyncio.gather(*(pool.aget_fact() for _ in range(1000)))
+
+        self.assertEqual(self.fake.requests, 1)
+        self.assertTrue(all(fact.startswith('Cat fact number 1.') for fact in facts))
+
+    async def test_stale_pool_is_served_while_refreshing(self):
+        pool = self.pool(refresh_interval=0.1)
+        await pool.aget_fact()
+        await asyncio.sleep(0.15)
+        self.fake.latency = 0.3
+
+        facts = await asyncio.gather(*(pool.aget_fact() for _ in range(100)))
+        self.assertTrue(all(fact.startswith('Cat fact number 1.') for fact in facts))
+
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.fake.requests, 2)
+        self.assertTrue((await pool.aget_fact()).startswith('Cat fact number 2.'))
+
+    async def test_unavailable_upstream_returns_fallback(self):
+        self.fake.status = 503
+        pool = self.pool()
+
+        facts = await asyncio.gather(*(pool.aget_fact() for _ in range(50)))
+        self.assertTrue(all(fact.startswith('Error retrieving cat fact:') for fact in facts))
+        self.assertEqual(self.fake.requests, 1)
+        self.assertEqual(pool.stats()['refresh_failures'], 1)
+
+    async def test_malformed_body(self):
+        for body in MALFORMED_BODIES:
+            with self.subTest(body=body):
+                self.fake.body = body
+                with self.assertRaises(ValueError):
+                    await afetch_cat_facts(CircuitBreaker(), self.fake.url, 5, timeout=5)
+
+        self.fake.body = '{"data": [{"fact": 42}]}'
+        pool = self.pool()
+        self.assertTrue((await pool.aget_fact()).startswith('Error retrieving cat fact:'))
+        self.assertEqual(pool.stats()['refresh_failures'], 1)
+
+
+class ProfileEndpointTests(SimpleTestCase):
+
+    def setUp(self):
+        self.fake = FakeCatFactServer().start()
+        self.addCleanup(self.fake.stop)
+        reset_fact_pool()
+        reset_async_fact_pools()
+        reset_upstream_client()
+        self.addCleanup(reset_fact_pool)
+        self.addCleanup(reset_async_fact_pools)
+        self.addCleanup(reset_upstream_client)
+
+    def test_me_uses_the_fact_pool(self):
+        with override_settings(CAT_FACTS_API_URL=self.fake.url):
+            responses = [self.client.get('/me') for _ in range(10)]
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertEqual(body['status'], 'success')
+            self.assertTrue(body['fact'].startswith('Cat fact number 1.'))
+            self.assertIn('timestamp', body)
+        self.assertEqual(self.fake.requests, 1)
+
+    async def test_async_me_shares_one_fetch(self):
+        with override_settings(CAT_FACTS_API_URL=self.fake.url):
+            responses = await asyncio.gather(*(self.async_client.get('/async/me') for _ in range(50)))
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertEqual(body['status'], 'success')
+            self.assertTrue(body['fact'].startswith('Cat fact number 1.'))
+        self.assertEqual(self.fake.requests, 1)
+
+
+class RequestMetricsTests(SimpleTestCase):
+    """Server-Timing header on every response, and the histograms served at /metrics."""
+
+    def setUp(self):
+        self.fake = FakeCatFactServer().start()
+        self.addCleanup(self.fake.stop)
+        reset_fact_pool()
+        reset_upstream_client()
+        self.addCleanup(reset_fact_pool)
+        self.addCleanup(reset_upstream_client)
+
+    def server_timing(self, response) -> dict:
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_server_timing(self):
+        with override_settings(CAT_FACTS_API_URL=self.fake.url):
+            response = self.client.get('/me')
+        timing = self.server_timing(response)
+        self.assertEqual(list(timing), ['db', 'upstream', 'render', 'view', 'total', 'size'])
+        self.assertEqual(timing['db']['desc'], '"0 queries"')
+        self.assertEqual(timing['size'], {'desc': f'"{len(response.content)} bytes"'})
+        durations = {name: float(params['dur']) for name, params in timing.items() if 'dur' in params}
+        self.assertGreater(durations['upstream'], 0) # Cold start: the pool fetched while the request waited
+        self.assertLessEqual(durations['upstream'], durations['view'] + 0.01)
+
+    def test_header_can_be_turned_off(self):
+        with override_settings(CAT_FACTS_API_URL=self.fake.url, SERVER_TIMING_HEADER=False):
+            self.assertFalse(self.client.get('/me').has_header('Server-Timing'))
+
+    def test_metrics_endpoint(self):
+        def series_count(text, line_start):
+            return next((int(line.rsplit(' ', 1)[1]) for line in text.splitlines() if line.startswith(line_start)), 0)
+
+        count_line = 'http_response_size_bytes_count{route="me",method="GET"}'
+        before = series_count(self.client.get('/metrics').content.decode(), count_line)
+        with override_settings(CAT_FACTS_API_URL=self.fake.url):
+            self.client.get('/me')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertEqual(series_count(text, count_line), before + 1)
+        for line_start in ('# TYPE http_request_duration_seconds histogram',
+                           'http_request_duration_seconds_bucket{route="me",method="GET",status="200",le="+Inf"}',
+                           'http_request_phase_duration_seconds_count{route="me",method="GET",phase="upstream"}',
+                           'http_request_phase_duration_seconds_count{route="me",method="GET",phase="view"}',
+                           'cat_fact_pool_refreshes_total ',
+                           'cat_fact_circuit_state 0'):
+            with self.subTest(line=line_start):
+                self.assertTrue(any(line.startswith(line_start) for line in text.splitlines()))
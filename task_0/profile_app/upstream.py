@@ -0,0 +1,131 @@
+# task_0/profile_app/upstream.py
+# HTTP access to the cat-fact API: one keep-alive session (connection pool) per
+# process, behind a circuit breaker so a slow or dead upstream fails fast.
+
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling the upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures: calls then fail fast
+    with CircuitOpenError for `cooldown` seconds. After the cooldown it is
+    half-open and lets up to `half_open_max_calls` probe requests through at a
+    time; a successful probe closes it, a failed one opens it for another cooldown.
+    """
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+    def __init__(self, failure_threshold=3, cooldown=30.0, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0            # consecutive failures while closed
+        self.opened = 0              # times the breaker opened
+        self.short_circuited = 0     # calls rejected while open
+        self._opened_at = 0.0
+        self._probes = 0             # half-open calls in flight
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Reserves a call, or raises CircuitOpenError."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state, self._probes = self.HALF_OPEN, 0
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN
+                                           and self._probes >= self.half_open_max_calls):
+                self.short_circuited += 1
+                raise CircuitOpenError('Circuit breaker open: the cat-fact API is failing')
+            if self.state == self.HALF_OPEN:
+                self._probes += 1
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._probes = self.CLOSED, 0, 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self._opened_at, self._probes = self.OPEN, time.monotonic(), 0
+                self.opened += 1
+
+    def stats(self) -> dict:
+        return {'state': self.state, 'failures': self.failures, 'opened': self.opened,
+                'short_circuited': self.short_circuited}
+
+
+def is_upstream_failure(exc) -> bool:
+    """Timeouts, connection errors and 5xx answers count against the breaker; 4xx do not."""
+    response = getattr(exc, 'response', None)
+    return response is None or response.status_code >= 500
+
+
+class UpstreamClient:
+    """A pooled keep-alive requests.Session guarded by a CircuitBreaker."""
+
+    def __init__(self, breaker=None, pool_maxsize=10):
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        # No retries: a failure is reported to the breaker instead of multiplying the wait
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_json(self, url, params=None, timeout=5.0):
+        """
+        GET `url` and decode its JSON body. Raises CircuitOpenError without any
+        network I/O while the breaker is open, requests.RequestException on failure.
+        """
+        self.breaker.before_call()
+        try:
+            response = self.session.get(url, params=params, timeout=timeout)
+            response.raise_for_status() # Raise an error for bad status codes
+        except requests.RequestException as exc:
+            if is_upstream_failure(exc):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_upstream_client() -> UpstreamClient:
+    """The process-wide UpstreamClient, configured by settings.CAT_FACT_UPSTREAM."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = getattr(settings, 'CAT_FACT_UPSTREAM', {})
+                breaker = CircuitBreaker(
+                    failure_threshold=config.get('FAILURE_THRESHOLD', 3),
+                    cooldown=config.get('COOLDOWN', 30),
+                    half_open_max_calls=config.get('HALF_OPEN_MAX_CALLS', 1),
+                )
+                _client = UpstreamClient(breaker, pool_maxsize=config.get('POOL_MAXSIZE', 10))
+    return _client
+
+
+def reset_upstream_client():
+    """Closes and drops the process-wide client (used when the settings change, e.g. in tests)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -1,13 +1,18 @@
 # task_0/profile_app/views.py
 
 import os
-import requests
 from datetime import datetime
 from django.http import JsonResponse
 from django.conf import settings
 
-# External API endpoint
-CAT_FACT_API = 'https://catfact.ninja/fact'
+from .facts import get_fact_pool
+from .metrics import timed
+
+
+@timed('render')
+def render_json(data, status):
+    return JsonResponse(data, status=status)
+
 
 def profile_endpoint(request):
     """
@@ -17,17 +22,14 @@ def profile_endpoint(request):
     if request.method != 'GET':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
-    try:
-        # 1. Fetch data from external API
-        cat_fact_response = requests.get(CAT_FACT_API, timeout=5)
-        cat_fact_response.raise_for_status() # Raise an error for bad status codes
-        cat_fact_data = cat_fact_response.json()
-        cat_fact = cat_fact_data.get('fact', 'Could not retrieve a cat fact.')
-    
-    except requests.RequestException as e:
-        # 2. Handle API failure
-        cat_fact = f"Error retrieving cat fact: {str(e)}"
-        
+    # 1. Cat fact from the in-memory pool (refreshed in the background, see facts.py)
+    # 2. Until a first fetch succeeds it is the API error message
+    cat_fact = get_fact_pool().get_fact()
+    return profile_response(cat_fact)
+
+
+def profile_response(cat_fact):
+    """The /me response for a given cat fact (shared with the async view)."""
     # 3. Get current UTC time (required format is usually ISO 8601)
     current_utc_time = datetime.utcnow().isoformat() + 'Z' # 'Z' denotes Zulu/UTC time
     
@@ -48,4 +50,4 @@ def profile_endpoint(request):
     }
 
     # 5. Return the JSON response
-    return JsonResponse(response_data, status=200)
\ No newline at end of file
+    return render_json(response_data, status=200)
\ No newline at end of file
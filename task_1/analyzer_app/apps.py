@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db.backends.signals import connection_created
+
+from .cache import check_generation_cache
+from .metrics import install_query_recorder
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Applies settings.SQLITE_PRAGMAS to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
 
 
 class AnalyzerAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer_app'
+
+    def ready(self):
+        connection_created.connect(configure_sqlite, dispatch_uid='analyzer_app.configure_sqlite')
+        connection_created.connect(install_query_recorder, dispatch_uid='analyzer_app.install_query_recorder')
+        checks.register(check_generation_cache)
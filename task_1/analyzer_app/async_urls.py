@@ -0,0 +1,17 @@
+# analyzer_app/async_urls.py
+from django.urls import path
+from .async_views import AsyncStringListCreateView, AsyncStringDetailView, AsyncStringUploadView
+from .urls import method_dispatch
+
+urlpatterns = [
+    # Fixed paths before the detail view: this handles POST /async/strings/upload
+    # (GET/DELETE /async/strings/upload reach the stored string "upload")
+    path('upload', method_dispatch('upload', AsyncStringDetailView.as_view(), POST=AsyncStringUploadView.as_view()),
+         name='async-string-upload'),
+
+    # This handles /async/strings/{value}
+    path('<str:string_value>', AsyncStringDetailView.as_view(), name='async-string-detail'),
+
+    # This handles the base path /async/strings or /async/strings/
+    path('', AsyncStringListCreateView.as_view(), name='async-string-list-create'),
+]
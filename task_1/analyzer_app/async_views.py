@@ -0,0 +1,211 @@
+# analyzer_app/async_views.py
+# Async variants of the list/create and detail endpoints, served under /async/strings.
+# They are plain Django async views (DRF's APIView is sync-only) and are meant to
+# run under an ASGI server (see gunicorn_asgi.conf.py), where a request waiting on
+# the database does not hold a worker.
+
+import asyncio
+import json
+import os
+
+from asgiref.sync import sync_to_async
+from django.db.utils import IntegrityError
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from .bloom import definitely_missing
+from .cache import (
+    awrite_generation, detail_cache_headers, etag_matches, get_detail_cache, get_list_cache, list_cache_headers,
+    list_cache_key,
+)
+from .models import StringEntry
+from .pagination import apaginate, parse_limit
+from .renderers import FastJSONRenderer
+from .serializers import (
+    ENTRY_FIELDS, StringInputSerializer, StringEntrySerializer, created_at_formatter, serialize_row, serialize_rows,
+)
+from .services import create_entry, delete_entry
+from .ingest import ingest_enabled
+from .uploads import UploadTooLarge, spool_body, submit_analysis
+from .utils import analyze_string, hash_value
+from .views import enqueue_ingest, filter_strings, row_position
+
+
+def json_response(data, status_code, headers=None):
+    """Renders `data` with the same JSON renderer as the DRF views."""
+    content = FastJSONRenderer().render(data) if data is not None else b''
+    return HttpResponse(content, status=status_code, content_type='application/json', headers=headers)
+
+
+def not_found():
+    return json_response({'detail': 'String not found in the database.'}, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncAPIView(View):
+    """Base for the async views: CSRF-exempt JSON endpoints, like DRF's APIView."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Set on the view itself: in Django 4.2 the csrf_exempt decorator would hide the coroutine
+        view.csrf_exempt = True
+        return view
+
+
+class AsyncStringListCreateView(AsyncAPIView):
+    """
+    Handles POST /async/strings and GET /async/strings (same contract as StringListCreateView).
+    """
+
+    async def post(self, request, *args, **kwargs):
+        # 1. Parse and validate the input JSON (400 / 422)
+        try:
+            payload = json.loads(request.body)
+        except ValueError as exc:
+            return json_response({'detail': f'JSON parse error - {exc}'}, status.HTTP_400_BAD_REQUEST)
+        input_serializer = StringInputSerializer(data=payload)
+        if not input_serializer.is_valid():
+            return json_response(input_serializer.errors, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # Write-behind mode: queue it, analysis and insert happen in batches (202 / 429)
+        if ingest_enabled():
+            data, status_code, headers = enqueue_ingest(input_serializer.validated_data['value'])
+            return json_response(data, status_code, headers=headers)
+
+        # 2. Analyze String (CPU only, no I/O)
+        analysis_result = analyze_string(input_serializer.validated_data['value'])
+
+        # 3. Save. The entry and its index rows are written in one transaction, which
+        #    the async ORM cannot open, so the regular write path runs in a thread
+        try:
+            instance = await sync_to_async(create_entry)(analysis_result)
+        except IntegrityError:
+            return json_response({'error': 'String already exists in the system'}, status.HTTP_409_CONFLICT)
+
+        # 4. Success Response (201 Created)
+        return json_response(StringEntrySerializer(instance).data, status.HTTP_201_CREATED)
+
+    async def get(self, request, *args, **kwargs):
+        # 1. Filters (building them may introspect the database once, so not on the event loop)
+        queryset, filters_applied = await sync_to_async(filter_strings)(request.GET)
+
+        # 2. Pagination parameters and the list cache
+        limit = parse_limit(request.GET.get('limit'))
+        cursor = request.GET.get('cursor')
+        include_count = request.GET.get('include_count', 'true').lower() != 'false'
+
+        list_cache = get_list_cache()
+        cache_key = list_cache_key(await awrite_generation(), filters_applied,
+                                   limit=limit, cursor=cursor, include_count=include_count)
+        headers = list_cache_headers(cache_key)
+        if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+            return HttpResponseNotModified(headers=headers)
+
+        response_data = await list_cache.aget(cache_key)
+        if response_data is not None:
+            return json_response(response_data, status.HTTP_200_OK, headers={'X-Cache': 'HIT', **headers})
+
+        # 3. Keyset page and optional count through the async ORM
+        try:
+            rows, next_cursor = await apaginate(queryset.values_list(*ENTRY_FIELDS), cursor, limit,
+                                                position=row_position)
+        except ValidationError as exc:
+            return json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+        response_data = {
+            "data": serialize_rows(rows),
+            "count": await queryset.acount() if include_count else None,
+            "next": next_cursor,
+            "filters_applied": filters_applied,
+        }
+        await list_cache.aset(cache_key, response_data)
+        return json_response(response_data, status.HTTP_200_OK, headers={'X-Cache': 'MISS', **headers})
+
+
+class AsyncStringDetailView(AsyncAPIView):
+    """
+    Handles GET /async/strings/{value} and DELETE /async/strings/{value}
+    """
+
+    async def get(self, request, string_value, *args, **kwargs):
+        string_id = hash_value(string_value)
+        detail_cache = get_detail_cache()
+
+        # 1. Ids the Bloom filter has never seen are not stored (404 without a query)
+        if definitely_missing(string_id):
+            return not_found()
+
+        # 2. Conditional GET: 304 if the stored row (id + created_at) matches the ETag.
+        #    The database is asked, not the per-process detail cache
+        created_at = None
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            created_at = await StringEntry.objects.filter(pk=string_id).values_list('created_at', flat=True).afirst()
+            if created_at is None:
+                return not_found()
+            created_at = created_at_formatter()(created_at)
+            headers = detail_cache_headers(string_id, created_at)
+            if etag_matches(if_none_match, headers['ETag']):
+                return HttpResponseNotModified(headers=headers)
+
+        # 3. Hot keys are answered from the detail cache (unless step 2 found a newer row)
+        data = await detail_cache.aget(string_id)
+        if data is not None and created_at in (None, data['created_at']):
+            headers = detail_cache_headers(string_id, data['created_at'])
+            return json_response(data, status.HTTP_200_OK, headers={'X-Cache': 'HIT', **headers})
+
+        # 4. Retrieve the row (404 if not found)
+        row = await StringEntry.objects.filter(pk=string_id).values_list(*ENTRY_FIELDS).afirst()
+        if row is None:
+            return not_found()
+
+        # 5. Serialize, cache and return (200 OK)
+        data = serialize_row(row)
+        await detail_cache.aset(string_id, data)
+        headers = detail_cache_headers(string_id, data['created_at'])
+        return json_response(data, status.HTTP_200_OK, headers={'X-Cache': 'MISS', **headers})
+
+    async def delete(self, request, string_value, *args, **kwargs):
+        string_id = hash_value(string_value)
+        if definitely_missing(string_id):
+            return not_found()
+        try:
+            instance = await StringEntry.objects.aget(pk=string_id)
+        except StringEntry.DoesNotExist:
+            return not_found()
+
+        # Same write path as the sync view (cache invalidation + write generation)
+        await sync_to_async(delete_entry)(instance)
+        return json_response(None, status.HTTP_204_NO_CONTENT)
+
+
+class AsyncStringUploadView(AsyncAPIView):
+    """
+    Handles POST /async/strings/upload (same contract as StringUploadView). The event
+    loop keeps serving other requests while the upload is copied and analyzed.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        if not request.content_type.startswith('text/plain'):
+            return json_response({'detail': f'Unsupported media type "{request.content_type}" in request.'},
+                                 status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        try:
+            path, size = await sync_to_async(spool_body)(request.read)
+        except UploadTooLarge:
+            return json_response({'error': 'Upload exceeds the maximum allowed size'},
+                                 status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        try:
+            if size == 0:
+                return json_response({'value': ['This field may not be blank.']},
+                                     status.HTTP_422_UNPROCESSABLE_ENTITY)
+            analysis_result = await asyncio.wrap_future(submit_analysis(path, size))
+        except UnicodeDecodeError:
+            return json_response({'error': 'Upload is not valid UTF-8 text'}, status.HTTP_400_BAD_REQUEST)
+        finally:
+            os.unlink(path)
+
+        return json_response(analysis_result, status.HTTP_200_OK)
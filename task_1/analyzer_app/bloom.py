@@ -0,0 +1,274 @@
+# analyzer_app/bloom.py
+# Negative lookups for GET/DELETE /strings/{value} (settings.STRING_ID_FILTER).
+# Each worker process keeps a Bloom filter over the stored SHA-256 ids: an id the
+# filter has never seen is definitely not stored, so the 404 is answered without
+# a database query. The filter is only trusted while it is in sync with the
+# global write generation (see cache.write_generation(), shared by every worker);
+# otherwise lookups go to the database while a background sync adds the ids
+# created since the last one. Lookups do not read the generation themselves (in
+# the default configuration that is a query too): the sync thread re-reads it
+# every SYNC_INTERVAL, and a copy older than MAX_STALENESS is not trusted. A
+# string stored by another worker may thus be answered 404 here for up to
+# MAX_STALENESS seconds. The whole table is only scanned at startup and when the filter is full.
+
+import logging
+import math
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .cache import LocalGeneration, bump_write_generation, write_generation
+from .models import StringEntry
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Bloom filter sized for `capacity` ids at `false_positive_rate`. Ids are
+    SHA-256 hex digests, so the bit positions are taken from the digest itself
+    (double hashing on two 64-bit slices) instead of hashing again. Ids cannot
+    be removed: a deleted id stays a (harmless) false positive until the next rebuild.
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.01, generation=None, synced_at=None):
+        self.capacity = max(int(capacity), 1)
+        self.false_positive_rate = false_positive_rate
+        bits = math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.bits = max(64, (bits + 7) // 8 * 8)
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.count = 0               # ids added (deleted ones included)
+        self.generation = generation # write generation the filter reflects
+        self.synced_at = synced_at   # ids created before this (minus the overlap) are in the filter
+        self._array = bytearray(self.bits // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, string_id):
+        h1 = int(string_id[:16], 16)
+        h2 = int(string_id[16:32], 16) | 1 # Odd, so the k positions differ
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, string_id):
+        positions = self._positions(string_id)
+        with self._lock: # |= on a bytearray is not atomic
+            for position in positions:
+                self._array[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, string_id) -> bool:
+        array = self._array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(string_id))
+
+    def advance(self, generation) -> bool:
+        """
+        Moves the filter to `generation` if it is the one right after its own,
+        i.e. the caller's write (already added) is the only one it missed.
+        """
+        with self._lock:
+            if self.generation is not None and generation == self.generation + 1:
+                self.generation = generation
+                return True
+            return False
+
+    def sync_to(self, generation, synced_at):
+        """Marks a sync as done, unless a newer generation was reached meanwhile."""
+        with self._lock:
+            if self.generation is None or generation > self.generation:
+                self.generation = generation
+            self.synced_at = max(self.synced_at, synced_at) if self.synced_at else synced_at
+
+    def expected_false_positive_rate(self) -> float:
+        """(1 - e^(-kn/m))^k for the ids added so far."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._array)
+
+    def stats(self) -> dict:
+        return {'capacity': self.capacity, 'count': self.count, 'bits': self.bits, 'hashes': self.hashes,
+                'memory_bytes': self.memory_bytes(), 'target_false_positive_rate': self.false_positive_rate,
+                'expected_false_positive_rate': round(self.expected_false_positive_rate(), 6)}
+
+
+def build_bloom_filter(capacity_factor=2.0, min_capacity=100000, false_positive_rate=0.01,
+                       chunk_size=10000) -> BloomFilter:
+    """
+    Builds a filter over every stored id. The generation is read before the scan:
+    a write committed during the scan bumps it, so the new filter starts out of
+    sync instead of missing that write.
+    """
+    synced_at = timezone.now()
+    generation = write_generation()
+    capacity = max(int(StringEntry.objects.count() * capacity_factor), min_capacity)
+    bloom = BloomFilter(capacity, false_positive_rate, generation, synced_at)
+    for string_id in StringEntry.objects.values_list('id', flat=True).iterator(chunk_size=chunk_size):
+        bloom.add(string_id)
+    return bloom
+
+
+class IdFilter:
+    """
+    The process-wide Bloom filter and its background syncs. Counters report
+    how many lookups were short-circuited (negatives), passed to the database
+    because the id may exist (positives) or because the filter was not usable.
+    """
+
+    def __init__(self, capacity_factor=2.0, min_capacity=100000, false_positive_rate=0.01,
+                 sync_interval=1.0, sync_overlap=30.0, max_staleness=2.0):
+        self.capacity_factor = capacity_factor
+        self.min_capacity = min_capacity
+        self.false_positive_rate = false_positive_rate
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.bloom = None
+        self.write_generation = LocalGeneration(max_staleness) # Refreshed by the syncs and own writes
+        self.negatives = 0
+        self.positives = 0
+        self.unusable = 0
+        self.rebuilds = 0
+        self.syncs = 0
+        self._syncing = False
+        self._last_sync = -math.inf
+        self._lock = threading.Lock()
+
+    def definitely_missing(self, string_id) -> bool:
+        """
+        True only if the id is certainly not stored. Never queries the database:
+        the write generation is this process's recent copy.
+        """
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync() # Keeps the generation fresh while lookups come in
+        bloom, generation = self.bloom, self.write_generation.fresh()
+        if bloom is None or generation is None or bloom.generation != generation:
+            self.unusable += 1
+            return False
+        if string_id in bloom:
+            self.positives += 1
+            return False
+        self.negatives += 1
+        return True
+
+    def record_write(self, added_ids=()):
+        """
+        transaction.on_commit callback of every write: adds the new ids, bumps the
+        write generation and keeps the filter in sync if no other write came in between.
+        """
+        bloom = self.bloom
+        if bloom is not None:
+            for string_id in added_ids:
+                bloom.add(string_id)
+        bumped_at = time.monotonic()
+        generation = bump_write_generation()
+        self.write_generation.observe(generation, bumped_at)
+        if bloom is not None and (not bloom.advance(generation) or bloom.count > bloom.capacity):
+            self.sync()
+
+    def sync(self):
+        """Starts a background sync, at most one at a time and one per `sync_interval`."""
+        with self._lock:
+            if self._syncing or time.monotonic() - self._last_sync < self.sync_interval:
+                return
+            self._syncing, self._last_sync = True, time.monotonic()
+        threading.Thread(target=self._run_sync, name='string-id-filter', daemon=True).start()
+
+    def _run_sync(self):
+        try:
+            bloom = self.bloom
+            if bloom is None or bloom.count > bloom.capacity:
+                self._rebuild()
+            else:
+                self._add_recent(bloom)
+        except Exception: # The database is used directly until a sync succeeds
+            logger.exception('String id filter sync failed')
+        finally:
+            connection.close() # This thread's connection
+            with self._lock:
+                self._syncing = False
+
+    def _rebuild(self):
+        """Full scan of the table: at startup, and when the filter holds more ids than it was sized for."""
+        started, read_at = time.perf_counter(), time.monotonic()
+        self.bloom = build_bloom_filter(self.capacity_factor, self.min_capacity, self.false_positive_rate)
+        self.write_generation.observe(self.bloom.generation, read_at)
+        self.rebuilds += 1
+        logger.info('String id filter rebuilt with %d ids in %.2fs (%d bytes)', self.bloom.count,
+                    time.perf_counter() - started, self.bloom.memory_bytes())
+
+    def _add_recent(self, bloom):
+        """
+        Adds the ids created since the previous sync (another worker's writes),
+        an index range scan on created_at. As in build_bloom_filter(), the
+        generation is read before the query. `sync_overlap` covers writes whose
+        created_at was set before the previous sync but committed after it
+        (transaction time plus clock skew between workers). Nothing is scanned
+        while no other worker has written.
+        """
+        synced_at, read_at = timezone.now(), time.monotonic()
+        generation = write_generation()
+        if generation != bloom.generation:
+            recent = StringEntry.objects.filter(created_at__gte=bloom.synced_at - self.sync_overlap)
+            for string_id in recent.values_list('id', flat=True).iterator():
+                if string_id not in bloom:
+                    bloom.add(string_id)
+            bloom.sync_to(generation, synced_at)
+            self.syncs += 1
+        self.write_generation.observe(generation, read_at)
+
+    def stats(self) -> dict:
+        bloom = self.bloom
+        return {'negatives': self.negatives, 'positives': self.positives, 'unusable': self.unusable,
+                'rebuilds': self.rebuilds, 'syncs': self.syncs,
+                'in_sync': bloom is not None and bloom.generation == write_generation(),
+                **(bloom.stats() if bloom is not None else {})}
+
+
+def id_filter_enabled() -> bool:
+    return getattr(settings, 'STRING_ID_FILTER', {}).get('ENABLED', False)
+
+
+_id_filter = None
+_id_filter_lock = threading.Lock()
+
+
+def get_id_filter() -> IdFilter:
+    """
+    The process-wide IdFilter, configured by settings.STRING_ID_FILTER. Its
+    first build starts in the background when the worker first uses it.
+    """
+    global _id_filter
+    if _id_filter is None:
+        with _id_filter_lock:
+            if _id_filter is None:
+                config = getattr(settings, 'STRING_ID_FILTER', {})
+                id_filter = IdFilter(
+                    capacity_factor=config.get('CAPACITY_FACTOR', 2.0),
+                    min_capacity=config.get('MIN_CAPACITY', 100000),
+                    false_positive_rate=config.get('FALSE_POSITIVE_RATE', 0.01),
+                    sync_interval=config.get('SYNC_INTERVAL', 1),
+                    sync_overlap=config.get('SYNC_OVERLAP', 30),
+                    max_staleness=config.get('MAX_STALENESS', 2),
+                )
+                id_filter.sync()
+                _id_filter = id_filter
+    return _id_filter
+
+
+def definitely_missing(string_id) -> bool:
+    """
+    Whether GET/DELETE /strings/{value} can answer 404 for `string_id` without a
+    query. No I/O, so the async views call it directly.
+    """
+    return id_filter_enabled() and get_id_filter().definitely_missing(string_id)
+
+
+def record_write(added_ids=()):
+    """on_commit callback of the write paths in services.py (bumps the write generation)."""
+    if id_filter_enabled():
+        get_id_filter().record_write(added_ids)
+    else:
+        bump_write_generation()
@@ -0,0 +1,466 @@
+# analyzer_app/cache.py
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe, process-local LRU cache with an optional TTL.
+    Keeps hit/miss counters for monitoring.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    # Async views: an in-memory lookup does not block the event loop
+    async def aget(self, key, default=None):
+        return self.get(key, default)
+
+    async def aset(self, key, value):
+        self.set(key, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': hit_rate(self.hits, self.misses),
+                'size': len(self._data), 'max_size': self.max_size}
+
+
+class SharedCache:
+    """
+    Same interface as LRUCache, backed by a Django cache alias (e.g. Redis or
+    Memcached) so entries and invalidations are shared between worker processes.
+    Size and eviction are managed by the cache backend itself. Keys are hashed:
+    list cache keys hold JSON, which memcached does not accept.
+    """
+
+    def __init__(self, alias, prefix, ttl=None):
+        self.backend = caches[alias]
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key) -> str:
+        return self.prefix + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def get(self, key, default=None):
+        value = self.backend.get(self._key(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(self._key(key), value, timeout=self.ttl)
+
+    # Async views: the backend's own async API (a thread for backends without native support)
+    async def aget(self, key, default=None):
+        value = await self.backend.aget(self._key(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    async def aset(self, key, value):
+        await self.backend.aset(self._key(key), value, timeout=self.ttl)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
+
+    def clear(self):
+        # Only safe on a dedicated cache: it drops every key of the alias
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': hit_rate(self.hits, self.misses),
+                'size': None, 'max_size': None}
+
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+def build_cache(config, prefix):
+    """Creates an LRUCache or SharedCache from a settings dict."""
+    if config.get('CACHE_ALIAS'):
+        return SharedCache(config['CACHE_ALIAS'], prefix, ttl=config.get('TTL'))
+    return LRUCache(max_size=config.get('MAX_SIZE', 1024), ttl=config.get('TTL'))
+
+
+def build_detail_cache(config, prefix):
+    """
+    build_cache() for the detail cache: a process-local LRU is wrapped in a
+    DeleteCheckedCache, so deletes made by other workers retire its entries.
+    """
+    cache = build_cache(config, prefix)
+    if isinstance(cache, SharedCache):
+        return cache # A delete drops the shared entry itself
+    return DeleteCheckedCache(cache, max_staleness=config.get('MAX_STALENESS', 1))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(setting_name, prefix, build=build_cache):
+    cache = _caches.get(setting_name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(setting_name)
+            if cache is None:
+                cache = _caches[setting_name] = build(getattr(settings, setting_name, {}), prefix)
+    return cache
+
+
+def get_detail_cache():
+    """
+    Cache of serialized GET /strings/{value} payloads, keyed by the SHA-256 id.
+    Configured with settings.STRING_DETAIL_CACHE.
+    """
+    return _get_cache('STRING_DETAIL_CACHE', 'string-detail:', build=build_detail_cache)
+
+
+def get_list_cache():
+    """
+    Cache of rendered GET /strings payloads, keyed by write generation plus the
+    normalized filters and pagination parameters (see list_cache_key()).
+    Configured with settings.STRING_LIST_CACHE.
+    """
+    return _get_cache('STRING_LIST_CACHE', 'string-list:')
+
+
+def get_filter_stats_cache():
+    """
+    Per-process copy of the row counts that GET /strings filters are planned
+    with (search.filter_statistics()). Configured with settings.STRING_FILTER_STATS_CACHE.
+    """
+    return _get_cache('STRING_FILTER_STATS_CACHE', 'filter-stats:')
+
+
+def list_cache_key(generation, filters_applied, **params) -> str:
+    """Stable key for one list response: same filters + page => same key."""
+    return f'{generation}:' + json.dumps({'filters': filters_applied, **params}, sort_keys=True)
+
+
+# ----------------------------------------------
+# Global write generation
+# ----------------------------------------------
+# Every committed write (POST, batch POST, DELETE) bumps this counter. List cache
+# keys include it, so a response cached before a write can never be served after it.
+# Every worker must see the same value, so it is kept in the database (one
+# WriteGeneration row, bumped with an atomic UPDATE) unless
+# STRING_LIST_CACHE['GENERATION_CACHE_ALIAS'] names a shared cache with an atomic
+# incr (Redis, Memcached), which saves the read query. check_generation_cache()
+# rejects per-process or non-atomic cache backends at startup.
+# The delete generation is kept the same way and only bumped by deletes: it is what
+# process-local detail caches check their entries against (see DeleteCheckedCache).
+
+WRITE_GENERATION_KEY = 'strings:write-generation'
+DELETE_GENERATION_KEY = 'strings:delete-generation'
+
+# Backends that cannot hold the generation: not shared between processes, or incr is a get + set
+UNSUITABLE_GENERATION_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache': 'is local to each worker process',
+    'django.core.cache.backends.dummy.DummyCache': 'stores nothing',
+    'django.core.cache.backends.db.DatabaseCache': 'has no atomic incr',
+    'django.core.cache.backends.filebased.FileBasedCache': 'has no atomic incr',
+}
+
+
+def _generation_backend():
+    """The shared cache holding the generation, or None when it is kept in the database."""
+    alias = getattr(settings, 'STRING_LIST_CACHE', {}).get('GENERATION_CACHE_ALIAS')
+    return caches[alias] if alias else None
+
+
+def _generation_row(key) -> int:
+    from .models import WriteGeneration # cache.py is imported before the app registry is ready
+    return WriteGeneration.DELETE_GENERATION_ID if key == DELETE_GENERATION_KEY else WriteGeneration.SINGLETON_ID
+
+
+def _db_write_generation(key=WRITE_GENERATION_KEY) -> int:
+    from .models import WriteGeneration
+    generation = WriteGeneration.objects.filter(pk=_generation_row(key)).values_list('value', flat=True).first()
+    if generation is None:
+        # Start from a clock value: process-local list caches may hold keys of an older database
+        row, _ = WriteGeneration.objects.get_or_create(pk=_generation_row(key), defaults={'value': time.time_ns()})
+        generation = row.value
+    return generation
+
+
+def write_generation(key=WRITE_GENERATION_KEY) -> int:
+    """The write generation (or, with key=DELETE_GENERATION_KEY, the delete generation)."""
+    backend = _generation_backend()
+    if backend is None:
+        return _db_write_generation(key)
+    generation = backend.get(key)
+    if generation is None:
+        # Start from a clock value so an evicted counter never repeats an old generation
+        backend.add(key, time.time_ns(), timeout=None)
+        generation = backend.get(key)
+    return generation
+
+
+async def awrite_generation(key=WRITE_GENERATION_KEY) -> int:
+    """write_generation() for async views (no blocking call on the event loop)."""
+    backend = _generation_backend()
+    if backend is None:
+        from .models import WriteGeneration
+        generation = await WriteGeneration.objects.filter(
+            pk=_generation_row(key)).values_list('value', flat=True).afirst()
+        return generation if generation is not None else await sync_to_async(_db_write_generation)(key)
+    generation = await backend.aget(key)
+    if generation is None:
+        await backend.aadd(key, time.time_ns(), timeout=None)
+        generation = await backend.aget(key)
+    return generation
+
+
+def bump_write_generation(key=WRITE_GENERATION_KEY) -> int:
+    backend = _generation_backend()
+    if backend is None:
+        from .models import WriteGeneration
+        rows = WriteGeneration.objects.filter(pk=_generation_row(key))
+        with transaction.atomic():
+            if not rows.update(value=F('value') + 1): # First write ever: create the row
+                _db_write_generation(key)
+                rows.update(value=F('value') + 1)
+            return rows.values_list('value', flat=True).get()
+    try:
+        return backend.incr(key)
+    except ValueError: # Key missing or evicted
+        write_generation(key)
+        return backend.incr(key)
+
+
+class LocalGeneration:
+    """
+    This process's copy of a shared generation, for the hot paths that cannot
+    afford a read per request. Readers only trust it for `max_age` seconds after
+    it was read (fresh() is None afterwards), so writes of other workers are
+    seen at most that late. Generations only grow: an older read never replaces a newer one.
+    """
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.value = None
+        self.read_at = -math.inf # monotonic time the read started
+        self._lock = threading.Lock()
+
+    def observe(self, value, read_at):
+        """Records `value`, read (or returned by a bump) at monotonic time `read_at`."""
+        with self._lock:
+            if self.value is None or value >= self.value:
+                self.value = value
+                self.read_at = max(self.read_at, read_at)
+
+    def fresh(self):
+        """The generation if it was read less than `max_age` seconds ago, else None."""
+        value, read_at = self.value, self.read_at
+        return value if time.monotonic() - read_at < self.max_age else None
+
+
+# Delete generation each detail cache lookup of this request (thread / task) was checked
+# against: key -> generation. set() stamps entries with it, so an entry read from the
+# database is never stamped with a generation that was read after the database read.
+_checked_generation = ContextVar('detail_cache_checked_generation', default=(None, None))
+
+
+class DeleteCheckedCache:
+    """
+    Same interface as LRUCache, around a process-local LRUCache of GET /strings/{value}
+    payloads. Entries are stamped with the delete generation and only served while
+    it has not changed, so a string deleted by another worker stops being served
+    once this worker has seen the bump: at most `max_staleness` seconds later
+    (0 reads the generation on every lookup). Hits cost no query in between.
+    """
+
+    def __init__(self, cache, max_staleness=1):
+        self.cache = cache
+        self.generation = LocalGeneration(max_staleness)
+        self.stale = 0 # Entries found but retired by a delete
+
+    def current_generation(self) -> int:
+        generation = self.generation.fresh()
+        if generation is None:
+            read_at = time.monotonic()
+            generation = write_generation(DELETE_GENERATION_KEY)
+            self.generation.observe(generation, read_at)
+        return generation
+
+    async def acurrent_generation(self) -> int:
+        generation = self.generation.fresh()
+        if generation is None:
+            read_at = time.monotonic()
+            generation = await awrite_generation(DELETE_GENERATION_KEY)
+            self.generation.observe(generation, read_at)
+        return generation
+
+    def _checked(self, key, generation, item, default):
+        _checked_generation.set((key, generation))
+        if item is None:
+            return default
+        stamp, value = item
+        if stamp != generation:
+            self.stale += 1
+            self.cache.delete(key)
+            return default
+        return value
+
+    def _stamp(self, key):
+        """Generation the last lookup of `key` was checked against (None: do not cache)."""
+        checked_key, generation = _checked_generation.get()
+        return generation if checked_key == key else None
+
+    def get(self, key, default=None):
+        return self._checked(key, self.current_generation(), self.cache.get(key), default)
+
+    def set(self, key, value):
+        generation = self._stamp(key)
+        if generation is not None:
+            self.cache.set(key, (generation, value))
+
+    async def aget(self, key, default=None):
+        return self._checked(key, await self.acurrent_generation(), self.cache.get(key), default)
+
+    async def aset(self, key, value):
+        self.set(key, value)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        hits, misses = stats['hits'] - self.stale, stats['misses'] + self.stale
+        return {**stats, 'hits': hits, 'misses': misses, 'hit_rate': hit_rate(hits, misses), 'stale': self.stale}
+
+
+def record_delete():
+    """
+    transaction.on_commit callback of the delete paths: bumps the delete generation,
+    which retires the entry in the process-local detail caches of the other workers.
+    """
+    detail_cache = get_detail_cache()
+    if isinstance(detail_cache, DeleteCheckedCache):
+        bumped_at = time.monotonic()
+        detail_cache.generation.observe(bump_write_generation(DELETE_GENERATION_KEY), bumped_at)
+
+
+def check_generation_cache(app_configs, **kwargs) -> list:
+    """System check: GENERATION_CACHE_ALIAS, when set, must be a shared cache with an atomic incr."""
+    alias = getattr(settings, 'STRING_LIST_CACHE', {}).get('GENERATION_CACHE_ALIAS')
+    if not alias:
+        return []
+    if alias not in settings.CACHES:
+        return [checks.Error(f"STRING_LIST_CACHE['GENERATION_CACHE_ALIAS'] = {alias!r} is not in CACHES.",
+                             id='analyzer_app.E001')]
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in UNSUITABLE_GENERATION_BACKENDS:
+        return [checks.Error(
+            f"STRING_LIST_CACHE['GENERATION_CACHE_ALIAS'] = {alias!r} uses {backend}, which "
+            f"{UNSUITABLE_GENERATION_BACKENDS[backend]}: after a write, workers would serve stale "
+            f"lists and the id filter false 404s.",
+            hint='Use Redis or Memcached, or set it to None to keep the generation in the database.',
+            id='analyzer_app.E002',
+        )]
+    return []
+
+
+def invalidate_entry(string_id):
+    """Drops every cached representation of one stored string. Call on delete/update."""
+    get_detail_cache().delete(string_id)
+
+
+# ----------------------------------------------
+# HTTP caching (ETag / If-None-Match)
+# ----------------------------------------------
+# A stored string never changes, but it can be deleted and stored again under the
+# same id with a new created_at, so the ETag of GET /strings/{value} is a digest of
+# the id and the serialized created_at. A GET /strings response only changes with
+# the write generation, so its ETag is a digest of its list cache key.
+
+def _etag(text, representation) -> str:
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+    if representation == 'json':
+        return f'"{digest}"'
+    return f'"{digest}.{representation}"' # e.g. the browsable API's HTML
+
+
+def detail_etag(string_id, created_at, representation='json') -> str:
+    """`created_at` as serialized in the response body."""
+    return _etag(f'{string_id}:{created_at}', representation)
+
+
+def list_etag(cache_key, representation='json') -> str:
+    return _etag(cache_key, representation)
+
+
+def etag_matches(if_none_match, etag) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    return '*' in tags or etag in (tag.removeprefix('W/') for tag in tags)
+
+
+def detail_cache_headers(string_id, created_at, representation='json') -> dict:
+    return {'ETag': detail_etag(string_id, created_at, representation), 'Vary': 'Accept',
+            'Cache-Control': getattr(settings, 'STRING_DETAIL_CACHE_CONTROL', 'no-cache')}
+
+
+def list_cache_headers(cache_key, representation='json') -> dict:
+    return {'ETag': list_etag(cache_key, representation), 'Vary': 'Accept',
+            'Cache-Control': getattr(settings, 'STRING_LIST_CACHE_CONTROL', 'no-cache')}
@@ -0,0 +1,162 @@
+# analyzer_app/ingest.py
+# Write-behind ingestion for POST /strings (settings.STRING_INGEST['MODE'] = 'async').
+# Requests only enqueue the value and answer 202; a background thread analyzes
+# queued values and inserts them in batches, one transaction per batch (group
+# commit), instead of one analysis + transaction per request.
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .cache import LRUCache
+from .services import bulk_create_entries
+from .utils import analyze_strings, hash_value
+
+logger = logging.getLogger(__name__)
+
+PENDING, CREATED, CONFLICT, FAILED = 'pending', 'created', 'conflict', 'failed'
+
+
+class IngestQueueFull(Exception):
+    """The queue is at STRING_INGEST['QUEUE_SIZE'] (or draining): the client should retry later."""
+
+
+class IngestQueue:
+    """
+    Bounded in-process queue of values to store, with one writer thread.
+    Statuses of finished items are kept for `result_ttl` seconds for the
+    status endpoint. Each worker process has its own queue.
+    """
+
+    def __init__(self, max_size=10000, batch_size=500, max_wait=0.05, result_ttl=600, result_max_size=100000):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.committed = 0           # items written (created or conflict)
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = {}           # id -> value, queued or being written
+        self._results = LRUCache(max_size=result_max_size, ttl=result_ttl)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+
+    def submit(self, value: str) -> str:
+        """Queues a (validated) value and returns its id. Raises IngestQueueFull."""
+        string_id = hash_value(value)
+        with self._lock:
+            if self._closed:
+                raise IngestQueueFull
+            if string_id in self._pending: # Same value already on its way
+                return string_id
+            # Marked pending first: the writer may finish the item before put_nowait() returns
+            self._pending[string_id] = value
+            try:
+                self._queue.put_nowait(value)
+            except queue.Full:
+                del self._pending[string_id]
+                raise IngestQueueFull
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='string-ingest', daemon=True)
+                self._thread.start()
+        return string_id
+
+    def status(self, string_id):
+        """(status, detail) of a submitted id known to this process, or None."""
+        if string_id in self._pending:
+            return PENDING, None
+        return self._results.get(string_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _take_batch(self) -> list:
+        """Blocks for a first value, then collects more for up to `max_wait` seconds."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            while not (self._closed and self._queue.empty()):
+                batch = self._take_batch()
+                if batch:
+                    self._write(batch)
+                close_old_connections() # Honour CONN_MAX_AGE / drop broken connections
+        finally:
+            connection.close()
+
+    def _write(self, values):
+        try:
+            analysis_results = analyze_strings(values)
+            created = {instance.pk for instance in bulk_create_entries(analysis_results)}
+        except Exception as exc: # Keep the writer alive; the batch is reported as failed
+            logger.exception('String ingest batch of %d values failed', len(values))
+            outcome = {hash_value(value): (FAILED, str(exc)) for value in values}
+        else:
+            # Not created: stored before (or by a concurrent writer) -> same as a 409
+            outcome = {result['id']: (CREATED, None) if result['id'] in created else (CONFLICT, None)
+                       for result in analysis_results}
+            self.committed += len(values)
+            self.batches += 1
+        for string_id, result in outcome.items():
+            self._results.set(string_id, result)
+        with self._lock:
+            for string_id in outcome:
+                self._pending.pop(string_id, None)
+
+    def drain(self, timeout=None):
+        """Stops accepting values and waits until the queued ones are written."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning('String ingest drain timed out with %d values queued', self.depth())
+
+    def stats(self) -> dict:
+        return {'depth': self.depth(), 'pending': len(self._pending), 'committed': self.committed,
+                'batches': self.batches}
+
+
+def ingest_enabled() -> bool:
+    return getattr(settings, 'STRING_INGEST', {}).get('MODE', 'sync') == 'async'
+
+
+_ingest_queue = None
+_ingest_queue_lock = threading.Lock()
+
+
+def get_ingest_queue() -> IngestQueue:
+    """
+    The process-wide IngestQueue, configured by settings.STRING_INGEST. It is
+    drained at interpreter exit, which gunicorn and uvicorn workers reach on a
+    graceful shutdown (SIGTERM, or the end of max_requests).
+    """
+    global _ingest_queue
+    if _ingest_queue is None:
+        with _ingest_queue_lock:
+            if _ingest_queue is None:
+                config = getattr(settings, 'STRING_INGEST', {})
+                _ingest_queue = IngestQueue(
+                    max_size=config.get('QUEUE_SIZE', 10000),
+                    batch_size=config.get('BATCH_SIZE', 500),
+                    max_wait=config.get('MAX_WAIT', 0.05),
+                    result_ttl=config.get('RESULT_TTL', 600),
+                )
+                atexit.register(_ingest_queue.drain, config.get('DRAIN_TIMEOUT', 10))
+    return _ingest_queue
@@ -0,0 +1,67 @@
+# analyzer_app/management/commands/bench_analyze_batch.py
+
+import gc
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer_app.utils import analyze_string, analyze_strings
+from ._bench import emit, random_text
+
+
+class Command(BaseCommand):
+    help = 'Throughput (strings/sec) of analyze_strings() vs. an analyze_string() loop.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+                            help='Batch sizes to measure.')
+        parser.add_argument('--max-length', type=int, default=100,
+                            help='Strings have a random length between 1 and this value.')
+        parser.add_argument('--duplicates', type=float, default=0.0,
+                            help='Fraction of each batch that repeats an earlier value (0-1).')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Also measure analyze_strings(workers=N) when N > 1.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        largest = max(options['sizes'])
+        pool = [random_text(rng.randint(1, options['max_length']), seed=i) for i in range(largest)]
+        for i in range(1, largest):
+            if rng.random() < options['duplicates']:
+                pool[i] = pool[rng.randrange(i)]
+
+        results = []
+        for size in options['sizes']:
+            values = pool[:size]
+            if analyze_strings(values) != [analyze_string(value) for value in values]:
+                raise AssertionError(f'analyze_strings() disagrees with analyze_string() at size {size}')
+
+            # Repeat small batches so every measurement covers a similar amount of work
+            rounds = max(1, 20000 // size)
+            loop_s = self.time_rounds(lambda: [analyze_string(value) for value in values], rounds)
+            batch_s = self.time_rounds(lambda: analyze_strings(values), rounds)
+            result = {
+                'batch_size': size,
+                'loop_strings_per_sec': round(size / loop_s),
+                'batch_strings_per_sec': round(size / batch_s),
+                'speedup': round(loop_s / batch_s, 2),
+            }
+
+            if options['workers'] > 1:
+                workers_s = self.time_rounds(lambda: analyze_strings(values, workers=options['workers']), rounds)
+                result['workers_strings_per_sec'] = round(size / workers_s)
+                result['workers_speedup'] = round(loop_s / workers_s, 2)
+            results.append(result)
+
+        emit(self, 'analyze_strings', results, max_length=options['max_length'],
+             duplicates=options['duplicates'], workers=options['workers'])
+
+    @staticmethod
+    def time_rounds(func, rounds):
+        """Average seconds per call; results are dropped so they don't skew GC for the next run."""
+        gc.collect()
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return (time.perf_counter() - t0) / rounds
@@ -0,0 +1,67 @@
+# analyzer_app/management/commands/bench_analyzer.py
+
+import hashlib
+import re
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from analyzer_app.utils import analyze_string, lsh_bands
+from ._bench import emit, random_text, time_call
+
+
+def legacy_analyze_string(value: str) -> dict:
+    """The multi-pass analyze_string() this benchmark compares against."""
+    sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    cleaned_string = re.sub(r'[^a-zA-Z0-9]', '', value).lower()
+    properties = {
+        "length": len(value),
+        "is_palindrome": cleaned_string == cleaned_string[::-1],
+        "unique_characters": len(set(value)),
+        "word_count": len(value.split()),
+        "sha256_hash": sha256_hash,
+        "character_frequency_map": dict(Counter(value)),
+    }
+    return {"id": sha256_hash, "value": value, "properties": properties,
+            "lsh_bands": lsh_bands(properties["character_frequency_map"])}
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of analyze_string() against the legacy multi-pass implementation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--large-size', type=int, default=4_000_000,
+                            help='Length of the multi-megabyte inputs (default: 4,000,000).')
+        parser.add_argument('--min-time', type=float, default=0.5,
+                            help='Minimum seconds spent timing each case.')
+
+    def handle(self, *args, **options):
+        large = random_text(options['large_size'], seed=3)
+        cases = {
+            'short': 'A man, a plan, a canal: Panama!',
+            '500_chars': random_text(500, seed=1),
+            '500_chars_palindrome': random_text(250, seed=2) + random_text(250, seed=2)[::-1],
+            'large': large,
+            'large_palindrome': large[:len(large) // 2] + large[:len(large) // 2][::-1],
+        }
+
+        results = []
+        for name, value in cases.items():
+            legacy = legacy_analyze_string(value)
+            fused = analyze_string(value)
+            # Guard: the two implementations must agree exactly (including key order)
+            if legacy != fused or list(legacy['properties']['character_frequency_map']) != \
+                    list(fused['properties']['character_frequency_map']):
+                raise AssertionError(f'analyze_string() disagrees with the legacy result for {name!r}')
+
+            legacy_s = time_call(legacy_analyze_string, value, min_time=options['min_time'])
+            fused_s = time_call(analyze_string, value, min_time=options['min_time'])
+            results.append({
+                'case': name,
+                'chars': len(value),
+                'legacy_us': round(legacy_s * 1e6, 2),
+                'fused_us': round(fused_s * 1e6, 2),
+                'speedup': round(legacy_s / fused_s, 2),
+            })
+
+        emit(self, 'analyze_string', results)
@@ -0,0 +1,74 @@
+# analyzer_app/management/commands/bench_asgi.py
+
+import asyncio
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ._bench import emit, random_text, run_load
+
+
+class Command(BaseCommand):
+    help = ('Load test of a running WSGI deployment (sync views under /strings) against a '
+            'running ASGI deployment (async views under /async/strings): requests/sec and '
+            'p50/p95/p99 latency per scenario and concurrency level. Start both first, e.g.\n'
+            '  gunicorn string_analyzer.wsgi:application -b 127.0.0.1:8001 -w 4\n'
+            '  gunicorn string_analyzer.asgi:application -c gunicorn_asgi.conf.py -b 127.0.0.1:8002')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8001',
+                            help='Base URL of the WSGI deployment.')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8002',
+                            help='Base URL of the ASGI deployment.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[50, 100, 250, 500],
+                            help='Concurrent clients per run.')
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Seconds per run.')
+        parser.add_argument('--scenarios', nargs='+', default=['list', 'detail', 'create'],
+                            choices=['list', 'detail', 'create'])
+        parser.add_argument('--seed-strings', type=int, default=200,
+                            help='Strings created on each deployment before the read scenarios.')
+
+    def handle(self, *args, **options):
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError('bench_asgi needs httpx (pip install httpx).')
+
+        deployments = {'wsgi': (options['wsgi_url'], '/strings'), 'asgi': (options['asgi_url'], '/async/strings')}
+        results = asyncio.run(self.run(httpx, deployments, options))
+        emit(self, 'asgi_vs_wsgi', results, duration=options['duration'])
+
+    async def run(self, httpx, deployments, options):
+        # Unique per run, so repeated runs against the same database do not collide
+        run_id = uuid.uuid4().hex[:8]
+        values = [f'bench {run_id} {i} ' + random_text(40, seed=i) for i in range(options['seed_strings'])]
+
+        results = []
+        for name, (base_url, prefix) in deployments.items():
+            limits = httpx.Limits(max_connections=max(options['concurrency']), max_keepalive_connections=None)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+                for value in values:
+                    response = await client.post(prefix, json={'value': value})
+                    if response.status_code not in (201, 409):
+                        raise CommandError(f'{name}: seeding failed with HTTP {response.status_code}')
+
+                for scenario in options['scenarios']:
+                    for concurrency in options['concurrency']:
+                        send = self.scenario(client, prefix, scenario, values, f'{run_id}-{name}-{concurrency}')
+                        result = await run_load(send, concurrency, options['duration'])
+                        results.append({'deployment': name, 'scenario': scenario, **result})
+        return results
+
+    @staticmethod
+    def scenario(client, prefix, scenario, values, tag):
+        async def list_page(i):
+            return (await client.get(prefix, params={'limit': 20, 'length_gt': i % 40})).status_code
+
+        async def detail(i):
+            return (await client.get(f'{prefix}/{values[i % len(values)]}')).status_code
+
+        async def create(i):
+            return (await client.post(prefix, json={'value': f'create {tag} {i}'})).status_code
+
+        return {'list': list_page, 'detail': detail, 'create': create}[scenario]
@@ -0,0 +1,99 @@
+# analyzer_app/management/commands/bench_concurrent_writes.py
+
+import multiprocessing
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ._bench import emit, percentile, random_text
+
+
+def _write_worker(args):
+    """
+    Runs in a separate process (like a gunicorn worker): inserts `count` strings
+    through create_entry() and returns (latencies, errors, started, finished), with
+    wall-clock timestamps taken after Django setup.
+    """
+    settings_module, tag, worker_id, count = args
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    import django
+    django.setup()
+    from django.db import DatabaseError
+    from analyzer_app.services import create_entry
+    from analyzer_app.utils import analyze_string
+
+    latencies, errors = [], 0
+    started = time.time()
+    for i in range(count):
+        value = f'{tag} {worker_id} {i} ' + random_text(30, seed=worker_id * count + i)
+        t0 = time.perf_counter()
+        try:
+            create_entry(analyze_string(value))
+        except DatabaseError: # "database is locked", serialization failures, ...
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+    return latencies, errors, started, time.time()
+
+
+class Command(BaseCommand):
+    help = ('Concurrent-write throughput of the configured database profile (DB_ENGINE, '
+            'SQLITE_JOURNAL_MODE, ...): N processes insert through create_entry() at once. '
+            'The inserted rows are deleted afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8],
+                            help='Numbers of concurrent writer processes to measure.')
+        parser.add_argument('--writes', type=int, default=200,
+                            help='Inserts per writer process.')
+
+    def handle(self, *args, **options):
+        tag = f'bench-writes-{uuid.uuid4().hex[:8]}'
+        results = []
+        try:
+            for workers in options['workers']:
+                results.append(self.measure(f'{tag}-{workers}', workers, options['writes']))
+        finally:
+            self.cleanup(tag)
+        emit(self, 'concurrent_writes', results, **self.profile())
+
+    def measure(self, tag, workers, writes):
+        jobs = [(os.environ['DJANGO_SETTINGS_MODULE'], tag, worker_id, writes) for worker_id in range(workers)]
+        # spawn: each writer gets its own interpreter and database connection
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            outcomes = pool.map(_write_worker, jobs)
+
+        # Throughput over the window where writers ran (process start-up excluded)
+        elapsed = max(outcome[3] for outcome in outcomes) - min(outcome[2] for outcome in outcomes)
+        latencies = sorted(latency for outcome in outcomes for latency in outcome[0])
+        return {
+            'workers': workers,
+            'writes': len(latencies),
+            'errors': sum(outcome[1] for outcome in outcomes),
+            'writes_per_sec': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        }
+
+    @staticmethod
+    def cleanup(tag):
+        from analyzer_app.models import StringEntry
+        from analyzer_app.services import bulk_delete_entries
+        # Through the regular delete path, so the stats counters stay correct
+        bulk_delete_entries(StringEntry.objects.filter(value__startswith=tag))
+
+    @staticmethod
+    def profile():
+        database = settings.DATABASES['default']
+        profile = {'vendor': connection.vendor, 'conn_max_age': database.get('CONN_MAX_AGE', 0)}
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout'):
+                    profile[pragma] = cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+        else:
+            profile['server_side_cursors'] = not database.get('DISABLE_SERVER_SIDE_CURSORS', False)
+        return profile
@@ -0,0 +1,94 @@
+# analyzer_app/management/commands/bench_id_filter.py
+
+import logging
+import time
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from analyzer_app import bloom
+from analyzer_app.cache import get_detail_cache
+from analyzer_app.models import StringEntry
+from analyzer_app.utils import hash_value
+from ._bench import Rollback, emit, seed_entries, time_call
+
+
+class Command(BaseCommand):
+    help = ('Latency of GET /strings/{value} for never-stored values with and without the '
+            'Bloom filter (STRING_ID_FILTER), plus its size, build time and measured '
+            'false-positive rate. Seeded rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000,
+                            help='Number of strings to seed before measuring.')
+        parser.add_argument('--false-positive-rate', type=float, default=0.01,
+                            help='Target false-positive rate of the filter.')
+        parser.add_argument('--probes', type=int, default=100_000,
+                            help='Never-stored ids checked to measure the false-positive rate.')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                seed_entries(options['rows'], seed=24)
+                result = self.measure(options['false_positive_rate'], options['probes'])
+                raise Rollback
+        except Rollback:
+            pass
+
+        emit(self, 'id_filter', [result], output=options['output'], rows=options['rows'],
+             vendor=connection.vendor)
+
+    def measure(self, false_positive_rate, probes):
+        # 1. Build the filter from the table, as a worker does at startup
+        started = time.perf_counter()
+        bloom_filter = bloom.build_bloom_filter(capacity_factor=1.0, min_capacity=1,
+                                                false_positive_rate=false_positive_rate)
+        build_s = time.perf_counter() - started
+
+        # 2. Measured false-positive rate over ids that are certainly not stored
+        missing_ids = [hash_value(f'never stored {i}') for i in range(probes)]
+        false_positives = sum(1 for string_id in missing_ids if string_id in bloom_filter)
+
+        # 3. Miss latency: filter check, primary-key query, and the whole GET request
+        index = next(i for i, string_id in enumerate(missing_ids) if string_id not in bloom_filter)
+        string_id, path = missing_ids[index], f'/strings/never%20stored%20{index}'
+        check_s = time_call(lambda: string_id in bloom_filter, min_time=0.5)
+        query = StringEntry.objects.filter(pk=string_id).values_list('id', flat=True)
+        query_s = time_call(lambda: query.all().first(), min_time=0.5, max_runs=20000)
+
+        client = Client()
+        get_detail_cache().clear()
+        logging.disable(logging.WARNING) # One "Not Found" log line per request otherwise
+        with override_settings(STRING_ID_FILTER={'ENABLED': False}):
+            without_s = time_call(lambda: client.get(path), min_time=1.0, max_runs=20000)
+        # A filter that never syncs (a sync thread would not see the seeded, uncommitted
+        # rows) and trusts its generation for the whole run
+        id_filter = bloom.IdFilter(sync_interval=float('inf'), max_staleness=float('inf'))
+        id_filter.bloom, id_filter._last_sync = bloom_filter, time.monotonic()
+        id_filter.write_generation.observe(bloom_filter.generation, time.monotonic())
+        previous, bloom._id_filter = bloom._id_filter, id_filter
+        try:
+            with override_settings(STRING_ID_FILTER={'ENABLED': True}):
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(path)
+                if response.status_code != 404 or id_filter.negatives != 1 or len(queries):
+                    raise AssertionError('The Bloom filter did not short-circuit the miss')
+                with_s = time_call(lambda: client.get(path), min_time=1.0, max_runs=20000)
+        finally:
+            bloom._id_filter = previous
+            logging.disable(logging.NOTSET)
+
+        return {
+            **bloom_filter.stats(),
+            'bits_per_id': round(bloom_filter.bits / max(bloom_filter.count, 1), 2),
+            'build_s': round(build_s, 3),
+            'measured_false_positive_rate': round(false_positives / probes, 6) if probes else None,
+            'filter_check_us': round(check_s * 1e6, 2),
+            'pk_query_us': round(query_s * 1e6, 2),
+            'get_miss_without_filter_us': round(without_s * 1e6, 2),
+            'get_miss_with_filter_us': round(with_s * 1e6, 2),
+            'get_miss_speedup': round(without_s / with_s, 2),
+        }
@@ -0,0 +1,59 @@
+# analyzer_app/management/commands/bench_search.py
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand
+
+from analyzer_app.models import StringEntry
+from analyzer_app.search import filter_value, pg_trgm_available
+from ._bench import Rollback, emit, seed_entries, time_call
+
+
+class Command(BaseCommand):
+    help = ('Latency of ?contains= / ?startswith= through the trigram index vs. a plain '
+            'LIKE (icontains/istartswith) scan. Seeded rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help='Number of strings to seed before measuring.')
+        parser.add_argument('--contains', nargs='+', default=['hello', 'xq7', 'aB3dE', '4242 '],
+                            help='Substring search terms.')
+        parser.add_argument('--startswith', nargs='+', default=['12345 ', '999', '7'],
+                            help='Prefix search terms.')
+
+    def handle(self, *args, **options):
+        searches = [(term, False) for term in options['contains']]
+        searches += [(term, True) for term in options['startswith']]
+
+        results = []
+        try:
+            with transaction.atomic():
+                seed_entries(options['rows'], seed=12)
+                for term, prefix in searches:
+                    results.append(self.measure(term, prefix))
+                raise Rollback
+        except Rollback:
+            pass
+
+        emit(self, 'substring_search', results, rows=options['rows'], vendor=connection.vendor,
+             pg_trgm=pg_trgm_available())
+
+    def measure(self, term, prefix):
+        lookup = 'value__istartswith' if prefix else 'value__icontains'
+        indexed = filter_value(StringEntry.objects.all(), term, prefix=prefix).values_list('id', flat=True)
+        naive = StringEntry.objects.filter(**{lookup: term}).values_list('id', flat=True)
+
+        matches = sorted(indexed)
+        if matches != sorted(naive):
+            raise AssertionError(f'Indexed search disagrees with the LIKE scan for {term!r}')
+
+        # .all() gives a fresh queryset, so every run goes to the database
+        indexed_s = time_call(lambda: list(indexed.all()), min_time=0.5, max_runs=50)
+        naive_s = time_call(lambda: list(naive.all()), min_time=0.5, max_runs=50)
+        return {
+            'lookup': 'startswith' if prefix else 'contains',
+            'term': term,
+            'matches': len(matches),
+            'indexed_ms': round(indexed_s * 1000, 3),
+            'like_scan_ms': round(naive_s * 1000, 3),
+            'speedup': round(naive_s / indexed_s, 2),
+        }
@@ -0,0 +1,57 @@
+# analyzer_app/management/commands/bench_serializers.py
+
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from analyzer_app.models import StringEntry
+from analyzer_app.pagination import LIST_ORDERING
+from analyzer_app.renderers import FastJSONRenderer, orjson
+from analyzer_app.serializers import ENTRY_FIELDS, StringEntrySerializer, serialize_rows
+from ._bench import Rollback, emit, seed_entries
+
+
+class Command(BaseCommand):
+    help = ('Rows/sec of the list read path: StringEntrySerializer + JSONRenderer vs. '
+            'values_list() + serialize_rows() + FastJSONRenderer. Seeded rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                            help='List sizes to measure.')
+
+    def handle(self, *args, **options):
+        results = []
+        try:
+            with transaction.atomic():
+                seeded = 0
+                for rows in sorted(options['rows']):
+                    seed_entries(rows - seeded, seed=rows)
+                    seeded = rows
+                    queryset = StringEntry.objects.order_by(*LIST_ORDERING)[:rows]
+                    results.append({'rows': rows, **self.measure(queryset)})
+                raise Rollback
+        except Rollback:
+            pass
+
+        emit(self, 'list_serialization', results, orjson=orjson is not None)
+
+    def measure(self, queryset):
+        t0 = time.perf_counter()
+        model_body = JSONRenderer().render(StringEntrySerializer(list(queryset), many=True).data)
+        model_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fast_body = FastJSONRenderer().render(serialize_rows(queryset.values_list(*ENTRY_FIELDS)))
+        fast_s = time.perf_counter() - t0
+
+        if model_body != fast_body:
+            raise AssertionError('The fast read path produced a different JSON body.')
+
+        count = queryset.count()
+        return {
+            'model_serializer_rows_per_sec': round(count / model_s),
+            'fast_path_rows_per_sec': round(count / fast_s),
+            'speedup': round(model_s / fast_s, 2),
+        }
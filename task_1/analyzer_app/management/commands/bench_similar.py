@@ -0,0 +1,81 @@
+# analyzer_app/management/commands/bench_similar.py
+
+import heapq
+import random
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+
+from analyzer_app.models import StringEntry
+from analyzer_app.search import similar_entries
+from analyzer_app.utils import analyze_string, distribution_similarity
+from ._bench import Rollback, emit, seed_entries
+
+
+class Command(BaseCommand):
+    help = ('Recall@k and latency of the LSH similarity search vs. an exact scan over '
+            'every stored string. Seeded rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000,
+                            help='Number of strings to seed before measuring.')
+        parser.add_argument('--queries', type=int, default=20,
+                            help='Number of queries (edited copies of random stored strings).')
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--edits', type=int, default=2,
+                            help='Characters replaced in each query string.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(13)
+        k = options['k']
+
+        results = []
+        try:
+            with transaction.atomic():
+                seed_entries(options['rows'], seed=13)
+                sample = list(StringEntry.objects.order_by('?').values_list('value', flat=True)[:options['queries']])
+                for value in sample:
+                    results.append(self.measure(self.edit(value, options['edits'], rng), k))
+                raise Rollback
+        except Rollback:
+            pass
+
+        summary = {
+            'mean_recall': round(sum(r['recall'] for r in results) / len(results), 4) if results else None,
+            'mean_lsh_ms': round(sum(r['lsh_ms'] for r in results) / len(results), 3) if results else None,
+            'mean_exact_ms': round(sum(r['exact_ms'] for r in results) / len(results), 3) if results else None,
+        }
+        emit(self, 'similarity_search', results, rows=options['rows'], k=k, edits=options['edits'], **summary)
+
+    @staticmethod
+    def edit(value, edits, rng):
+        chars = list(value)
+        for _ in range(edits):
+            chars[rng.randrange(len(chars))] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        return ''.join(chars)
+
+    def measure(self, value, k):
+        analysis_result = analyze_string(value)
+        frequency_map = analysis_result['properties']['character_frequency_map']
+
+        t0 = time.perf_counter()
+        matches, candidates = similar_entries(frequency_map, analysis_result['lsh_bands'], k,
+                                              exclude_id=analysis_result['id'])
+        lsh_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        rows = StringEntry.objects.exclude(id=analysis_result['id']).values_list('character_frequency_map', flat=True)
+        exact = heapq.nlargest(k, (distribution_similarity(frequency_map, other) for other in rows.iterator()))
+        exact_s = time.perf_counter() - t0
+
+        # Tie-tolerant recall: LSH results at least as similar as the exact k-th best
+        threshold = exact[-1] if exact else 0
+        found = sum(1 for similarity, _ in matches if similarity >= threshold)
+        return {
+            'value': value,
+            'candidates': candidates,
+            'recall': round(found / len(exact), 4) if exact else 1.0,
+            'lsh_ms': round(lsh_s * 1000, 3),
+            'exact_ms': round(exact_s * 1000, 3),
+        }
@@ -0,0 +1,179 @@
+# analyzer_app/management/commands/loadtest.py
+
+import asyncio
+import platform
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ._bench import emit, git_revision, local_server, random_text, run_load, seed_entries
+
+SCENARIOS = ['create', 'list', 'list_filtered', 'detail', 'delete']
+
+# Rotated through by the list_filtered scenario, one per request
+LIST_FILTERS = [
+    {'is_palindrome': 'false'},
+    {'length_gt': '20', 'length_lt': '40'},
+    {'word_count_gt': '3'},
+    {'unique_characters_gt': '15'},
+    {'contains_character': 'q'},
+    {'startswith': '12'},
+    {'contains': 'abc'},
+]
+
+
+class Command(BaseCommand):
+    help = ('End-to-end load test of the /strings endpoints: seeds an empty throwaway database '
+            'with a reproducible dataset, starts gunicorn on it (or targets --url) and drives each '
+            'scenario at several concurrency levels. Prints requests/sec and p50/p95/p99 '
+            'latency per scenario as JSON, e.g.\n'
+            '  SQLITE_PATH=/tmp/load.sqlite3 python manage.py migrate\n'
+            '  SQLITE_PATH=/tmp/load.sqlite3 python manage.py loadtest --rows 100000 --output before.json\n'
+            'Seeding refuses a database that already holds strings, and the seeded rows are '
+            'deleted afterwards unless --keep-seeded is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Size of the dataset seeded into the (empty) database (10k-1M).')
+        parser.add_argument('--keep-seeded', action='store_true',
+                            help='Keep the seeded dataset, so later runs on the same throwaway '
+                                 'database can use it with --no-seed.')
+        parser.add_argument('--no-seed', action='store_true',
+                            help='Measure the strings already stored instead of seeding a dataset.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100],
+                            help='Concurrent clients per run.')
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Seconds per run.')
+        parser.add_argument('--scenarios', nargs='+', default=SCENARIOS, choices=SCENARIOS)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='gunicorn workers for the local server.')
+        parser.add_argument('--url',
+                            help='Base URL of an already running server using the same database '
+                                 '(no local server is started).')
+        parser.add_argument('--delete-pool', type=int, default=5000,
+                            help='Strings created before the delete scenario for it to remove; '
+                                 'once exhausted, DELETEs answer 404 (see status_codes).')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError('loadtest needs httpx (pip install httpx).')
+
+        from analyzer_app.models import StringEntry
+
+        # 1. Reproducible dataset (the same seed always produces the same rows), only
+        #    ever written to an empty database: the run must not leave rows in a real one
+        seeded_at = None
+        if not options['no_seed']:
+            stored = StringEntry.objects.count()
+            if stored:
+                raise CommandError(
+                    f'The configured database already holds {stored} strings. Point it at an empty '
+                    f'throwaway database (e.g. SQLITE_PATH=/tmp/load.sqlite3, then migrate), or pass '
+                    f'--no-seed to measure the existing strings.')
+            seed_entries(options['rows'], seed=18)
+            seeded_at = timezone.now()
+        detail_values = list(StringEntry.objects.order_by('id').values_list('value', flat=True)[:1000])
+        if not detail_values:
+            raise CommandError('No strings to measure (--no-seed on an empty database).')
+
+        # 2. Run the scenarios against a local server (or the one at --url)
+        tag = f'loadtest-{uuid.uuid4().hex[:8]}'
+        try:
+            if options['url']:
+                results = asyncio.run(self.run(httpx, options['url'], detail_values, tag, options))
+            else:
+                with local_server('string_analyzer.wsgi:application', cwd=settings.BASE_DIR,
+                                  workers=options['workers']) as url:
+                    results = asyncio.run(self.run(httpx, url, detail_values, tag, options))
+        finally:
+            self.cleanup(tag)
+            environment = self.environment(options)
+            if seeded_at is not None and not options['keep_seeded']:
+                self.remove_seeded(seeded_at)
+
+        # 3. Report
+        emit(self, 'loadtest', results, output=options['output'], **environment)
+
+    async def run(self, httpx, base_url, detail_values, tag, options):
+        limits = httpx.Limits(max_connections=max(options['concurrency']), max_keepalive_connections=None)
+        results = []
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for scenario in options['scenarios']:
+                for concurrency in options['concurrency']:
+                    run_tag = f'{tag}-{scenario}-{concurrency}'
+                    if scenario == 'delete':
+                        await asyncio.to_thread(self.create_pool, run_tag, options['delete_pool'])
+                    send = self.scenario(client, scenario, detail_values, run_tag)
+                    result = await run_load(send, concurrency, options['duration'])
+                    results.append({'scenario': scenario, **result})
+        return results
+
+    @staticmethod
+    def scenario(client, scenario, detail_values, tag):
+        async def create(i):
+            return (await client.post('/strings', json={'value': f'{tag} {i} ' + random_text(40, seed=i)})).status_code
+
+        async def list_page(i):
+            return (await client.get('/strings', params={'limit': 20})).status_code
+
+        async def list_filtered(i):
+            params = {'limit': 20, **LIST_FILTERS[i % len(LIST_FILTERS)]}
+            return (await client.get('/strings', params=params)).status_code
+
+        async def detail(i):
+            value = detail_values[i % len(detail_values)]
+            return (await client.get(f'/strings/{quote(value, safe="")}')).status_code
+
+        async def delete(i):
+            return (await client.delete(f'/strings/{quote(pool_value(tag, i), safe="")}')).status_code
+
+        return {'create': create, 'list': list_page, 'list_filtered': list_filtered,
+                'detail': detail, 'delete': delete}[scenario]
+
+    @staticmethod
+    def create_pool(tag, count):
+        from analyzer_app.services import bulk_create_entries
+        from analyzer_app.utils import analyze_strings
+        for start in range(0, count, 5000):
+            bulk_create_entries(analyze_strings([pool_value(tag, i) for i in range(start, min(count, start + 5000))]))
+
+    @staticmethod
+    def cleanup(tag):
+        from analyzer_app.models import StringEntry
+        from analyzer_app.services import bulk_delete_entries
+        # Strings written by the create/delete scenarios; the seeded dataset stays
+        bulk_delete_entries(StringEntry.objects.filter(value__startswith=tag))
+
+    @staticmethod
+    def remove_seeded(seeded_at, chunk_size=5000):
+        from analyzer_app.models import StringEntry
+        from analyzer_app.services import bulk_delete_entries
+        # The database was empty before seeding: everything created up to then is the dataset
+        seeded = StringEntry.objects.filter(created_at__lte=seeded_at)
+        while True:
+            ids = list(seeded.values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            bulk_delete_entries(StringEntry.objects.filter(pk__in=ids))
+
+    @staticmethod
+    def environment(options):
+        from analyzer_app.models import StringEntry
+        return {
+            'revision': git_revision(settings.BASE_DIR),
+            'python': platform.python_version(),
+            'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'rows': StringEntry.objects.count(),
+            'workers': None if options['url'] else options['workers'],
+            'duration': options['duration'],
+        }
+
+
+def pool_value(tag, i):
+    return f'{tag} {i}'
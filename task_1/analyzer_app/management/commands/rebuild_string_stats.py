@@ -0,0 +1,20 @@
+# analyzer_app/management/commands/rebuild_string_stats.py
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from analyzer_app.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the StatsCounter rows (GET /strings/stats) from every stored '
+            'string, reading them in chunks. Writes wait until it commits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows fetched per database round trip (default: STRING_STREAM_CHUNK_SIZE).')
+
+    def handle(self, *args, **options):
+        payload = rebuild_stats(options['chunk_size'])
+        self.stdout.write(json.dumps({key: payload[key] for key in ('total_count', 'palindrome_count', 'updated_at')}))
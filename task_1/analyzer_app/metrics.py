@@ -0,0 +1,255 @@
+# analyzer_app/metrics.py
+# Per-request timings (SQL, analysis, serialization, rendering) and their
+# process-wide aggregation into Prometheus histograms. The request middleware
+# lives in analyzer_app/middleware.py; /metrics is served by metrics_view().
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.http import HttpResponse
+
+from .cache import get_detail_cache, get_list_cache
+
+# Timing record of the request being handled in this thread / task (None outside requests)
+_current = ContextVar('request_metrics', default=None)
+
+PHASES = ('db', 'analyze', 'serialize', 'render')
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestTimings:
+    """Seconds spent per phase, plus the SQL query count, for one request."""
+    __slots__ = ('started', 'phases', 'queries', 'active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.active = set() # Phases being timed right now (nested calls are counted once)
+
+
+def start_request() -> tuple:
+    """Starts a timing record for the current request; returns (record, token for end_request)."""
+    record = RequestTimings()
+    return record, _current.set(record)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def timed(phase):
+    """
+    Decorator adding the time spent in the function to `phase` of the current
+    request. Costs one ContextVar lookup when called outside a request.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record = _current.get()
+            if record is None or phase in record.active:
+                return func(*args, **kwargs)
+            record.active.add(phase)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record.phases[phase] += time.perf_counter() - t0
+                record.active.discard(phase)
+        return wrapper
+    return decorator
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper (see connection.execute_wrappers) counting the
+    queries of the current request and their time.
+    """
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.phases['db'] += time.perf_counter() - t0
+        record.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: wraps every new connection with record_query()."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ----------------------------------------------
+# Aggregation (per process)
+# ----------------------------------------------
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per label tuple. Thread-safe."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {} # labels -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            label_text = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+def format_labels(names, values) -> str:
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time spent handling the request.',
+                             ('route', 'method', 'status'), DURATION_BUCKETS)
+PHASE_DURATION = Histogram('http_request_phase_duration_seconds',
+                           'Time spent per phase of the request (db, analyze, serialize, render, view).',
+                           ('route', 'method', 'phase'), DURATION_BUCKETS)
+DB_QUERIES = Histogram('http_request_db_queries', 'SQL queries executed per request.',
+                       ('route', 'method'), QUERY_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Size of the response body.',
+                          ('route', 'method'), SIZE_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, PHASE_DURATION, DB_QUERIES, RESPONSE_SIZE)
+
+
+def view_time(record: RequestTimings, total) -> float:
+    """Seconds spent in the view, without rendering (DRF renders the response after the view returns)."""
+    return max(total - record.phases['render'], 0.0)
+
+
+def observe_request(route, method, status_code, record: RequestTimings, total, size):
+    """Adds one finished request to the histograms."""
+    REQUEST_DURATION.observe((route, method, str(status_code)), total)
+    for phase, seconds in record.phases.items():
+        PHASE_DURATION.observe((route, method, phase), seconds)
+    PHASE_DURATION.observe((route, method, 'view'), view_time(record, total))
+    DB_QUERIES.observe((route, method), record.queries)
+    if size is not None:
+        RESPONSE_SIZE.observe((route, method), size)
+
+
+def server_timing(record: RequestTimings, total, size=None) -> str:
+    """
+    Server-Timing header value, durations in milliseconds. The body size in
+    bytes (unknown for streamed responses) is the description of `size`.
+    """
+    entries = [f'db;dur={record.phases["db"] * 1000:.2f};desc="{record.queries} queries"']
+    entries.extend(f'{phase};dur={record.phases[phase] * 1000:.2f}' for phase in PHASES[1:])
+    entries.append(f'view;dur={view_time(record, total) * 1000:.2f}')
+    entries.append(f'total;dur={total * 1000:.2f}')
+    if size is not None:
+        entries.append(f'size;desc="{size} bytes"')
+    return ', '.join(entries)
+
+
+def cache_metrics() -> list:
+    """Hit/miss counters and sizes of the detail and list caches."""
+    caches = {'detail': get_detail_cache().stats(), 'list': get_list_cache().stats()}
+    lines = []
+    for metric, key, kind, help_text in (
+            ('string_cache_hits_total', 'hits', 'counter', 'Cache hits.'),
+            ('string_cache_misses_total', 'misses', 'counter', 'Cache misses.'),
+            ('string_cache_entries', 'size', 'gauge', 'Entries held (process-local caches only).')):
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        lines += [f'{metric}{{cache="{name}"}} {stats[key]}' for name, stats in caches.items()
+                  if stats[key] is not None]
+    return lines
+
+
+def ingest_metrics() -> list:
+    """Write-behind queue of this worker (only with STRING_INGEST['MODE'] = 'async')."""
+    from .ingest import get_ingest_queue, ingest_enabled # ingest.py imports modules that import this one
+    if not ingest_enabled():
+        return []
+    stats = get_ingest_queue().stats()
+    return [
+        '# HELP string_ingest_queue_depth Values waiting in the write-behind queue.',
+        '# TYPE string_ingest_queue_depth gauge',
+        f'string_ingest_queue_depth {stats["depth"]}',
+        '# HELP string_ingest_committed_total Values written by the write-behind queue.',
+        '# TYPE string_ingest_committed_total counter',
+        f'string_ingest_committed_total {stats["committed"]}',
+        '# HELP string_ingest_batches_total Transactions committed by the write-behind queue.',
+        '# TYPE string_ingest_batches_total counter',
+        f'string_ingest_batches_total {stats["batches"]}',
+    ]
+
+
+def id_filter_metrics() -> list:
+    """Bloom filter of this worker (only with STRING_ID_FILTER['ENABLED'])."""
+    from .bloom import get_id_filter, id_filter_enabled # bloom.py imports modules that import this one
+    if not id_filter_enabled():
+        return []
+    stats = get_id_filter().stats()
+    stats['in_sync'] = int(stats['in_sync'])
+    lines = [
+        '# HELP string_id_filter_lookups_total Detail lookups by Bloom filter outcome.',
+        '# TYPE string_id_filter_lookups_total counter',
+    ]
+    lines += [f'string_id_filter_lookups_total{{outcome="{outcome}"}} {stats[outcome]}'
+              for outcome in ('negatives', 'positives', 'unusable')]
+    for metric, key, kind, help_text in (
+            ('string_id_filter_rebuilds_total', 'rebuilds', 'counter', 'Full-table rebuilds of the Bloom filter.'),
+            ('string_id_filter_syncs_total', 'syncs', 'counter', 'Incremental syncs of the Bloom filter.'),
+            ('string_id_filter_in_sync', 'in_sync', 'gauge', '1 while the filter matches the write generation.'),
+            ('string_id_filter_ids', 'count', 'gauge', 'Ids added to the Bloom filter.'),
+            ('string_id_filter_memory_bytes', 'memory_bytes', 'gauge', 'Memory held by the Bloom filter bits.'),
+            ('string_id_filter_expected_false_positive_rate', 'expected_false_positive_rate', 'gauge',
+             'False-positive rate expected for the ids added so far.')):
+        if key in stats: # Filter details are missing until the first build finishes
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}', f'{metric} {stats[key]}']
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.expose()
+    lines += cache_metrics()
+    lines += ingest_metrics()
+    lines += id_filter_metrics()
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics in the Prometheus text format. Each worker process keeps its own
+    numbers, so a scrape reports the worker that answered it.
+    """
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
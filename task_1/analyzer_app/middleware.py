@@ -0,0 +1,53 @@
+# analyzer_app/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import end_request, observe_request, server_timing, start_request
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every request (SQL, analyze_string, serialization, rendering), adds a
+    Server-Timing header (settings.SERVER_TIMING_HEADER) and feeds the per-route
+    histograms served at /metrics. Works under WSGI and ASGI; place it first in
+    MIDDLEWARE so the total covers the whole stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        record, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, record)
+
+    async def __acall__(self, request):
+        record, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, record)
+
+    def finish(self, request, response, record):
+        total = time.perf_counter() - record.started
+        match = request.resolver_match
+        route = match.route if match is not None else '<unmatched>'
+        size = None if response.streaming else len(response.content)
+        observe_request(route, request.method, response.status_code, record, total, size)
+        if self.header:
+            response['Server-Timing'] = server_timing(record, total, size)
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stringentry',
+            index=models.Index(fields=['created_at', 'id'], name='strentry_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stringentry',
+            index=models.Index(fields=['is_palindrome', 'created_at', 'id'], name='strentry_pal_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stringentry',
+            index=models.Index(fields=['length'], name='strentry_length_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stringentry',
+            index=models.Index(fields=['word_count'], name='strentry_word_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stringentry',
+            index=models.Index(fields=['unique_characters'], name='strentry_unique_chars_idx'),
+        ),
+    ]
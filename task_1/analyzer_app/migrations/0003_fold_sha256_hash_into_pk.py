@@ -0,0 +1,55 @@
+# Folds the redundant sha256_hash column into the primary key.
+# The PK already holds the SHA-256 of the value; this migration makes sure that is
+# true for every existing row before dropping the second unique column.
+
+import hashlib
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 2000
+
+
+def realign_primary_keys(apps, schema_editor):
+    """Re-keys any row whose id is not the SHA-256 of its value."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    db_alias = schema_editor.connection.alias
+
+    mismatched = []
+    rows = StringEntry.objects.using(db_alias).values_list('id', 'value').iterator(chunk_size=CHUNK_SIZE)
+    for string_id, value in rows:
+        sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+        if string_id != sha256_hash:
+            mismatched.append((string_id, sha256_hash))
+
+    for string_id, sha256_hash in mismatched:
+        # An UPDATE of the key columns only: created_at (auto_now_add) and the
+        # other columns keep their stored values
+        StringEntry.objects.using(db_alias).filter(pk=string_id).update(id=sha256_hash, sha256_hash=sha256_hash)
+
+
+def restore_sha256_hash(apps, schema_editor):
+    """Reverse: copies the PK back into the re-added sha256_hash column."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    StringEntry.objects.using(schema_editor.connection.alias).update(sha256_hash=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0002_stringentry_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(realign_primary_keys, migrations.RunPython.noop),
+        # Drop the unique index first so the column can be re-added as nullable on reverse
+        migrations.AlterField(
+            model_name='stringentry',
+            name='sha256_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, restore_sha256_hash),
+        migrations.RemoveField(
+            model_name='stringentry',
+            name='sha256_hash',
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CHUNK_SIZE = 2000
+
+
+def backfill_character_index(apps, schema_editor):
+    """Builds CharacterIndex rows for strings stored before the index existed."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    CharacterIndex = apps.get_model('analyzer_app', 'CharacterIndex')
+    db_alias = schema_editor.connection.alias
+
+    rows = []
+    entries = StringEntry.objects.using(db_alias).values_list('id', 'character_frequency_map')
+    for string_id, frequency_map in entries.iterator(chunk_size=CHUNK_SIZE):
+        rows.extend(
+            CharacterIndex(character=character, entry_id=string_id, count=count)
+            for character, count in frequency_map.items()
+        )
+        if len(rows) >= CHUNK_SIZE:
+            CharacterIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+            rows = []
+    CharacterIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0003_fold_sha256_hash_into_pk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character', models.CharField(max_length=1)),
+                ('count', models.IntegerField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='character_index', to='analyzer_app.stringentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['character', 'count', 'entry'], name='charindex_char_count_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='characterindex',
+            constraint=models.UniqueConstraint(fields=('character', 'entry'), name='charindex_char_entry_uniq'),
+        ),
+        migrations.RunPython(backfill_character_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:41
+
+from django.db import DatabaseError, migrations, models, transaction
+import django.db.models.deletion
+
+CHUNK_SIZE = 2000
+TRIGRAM_START = '\x02' # Same marker as analyzer_app.search.TRIGRAM_START
+
+
+def backfill_trigram_index(apps, schema_editor):
+    """Builds TrigramIndex rows for strings stored before the index existed."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    TrigramIndex = apps.get_model('analyzer_app', 'TrigramIndex')
+    db_alias = schema_editor.connection.alias
+
+    rows = []
+    for string_id, value in StringEntry.objects.using(db_alias).values_list('id', 'value').iterator(chunk_size=CHUNK_SIZE):
+        text = TRIGRAM_START + value.lower()
+        rows.extend(
+            TrigramIndex(trigram=trigram, entry_id=string_id)
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}
+        )
+        if len(rows) >= CHUNK_SIZE:
+            TrigramIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+            rows = []
+    TrigramIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+
+
+def create_pg_trgm_index(apps, schema_editor):
+    """
+    On Postgres, also adds a pg_trgm GIN index on UPPER(value), which serves
+    icontains/istartswith directly. Skipped when the extension cannot be
+    installed (e.g. missing privileges); the TrigramIndex table is used instead.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS strentry_value_trgm_idx '
+        'ON analyzer_app_stringentry USING gin (UPPER(value) gin_trgm_ops)'
+    )
+
+
+def drop_pg_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS strentry_value_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0004_characterindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigram_index', to='analyzer_app.stringentry')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='trigramindex',
+            constraint=models.UniqueConstraint(fields=('trigram', 'entry'), name='trigram_gram_entry_uniq'),
+        ),
+        migrations.RunPython(backfill_trigram_index, migrations.RunPython.noop),
+        migrations.RunPython(create_pg_trgm_index, drop_pg_trgm_index),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:48
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CHUNK_SIZE = 2000
+
+# Frozen copy of analyzer_app.utils.lsh_bands() as of this migration: the backfilled
+# buckets must not change if the live helper does
+MINHASH_BINS = 32
+LSH_BANDS = 16
+_EMPTY_BIN = 1 << 64
+_BAND_KEY_MULTIPLIER = 1_000_003
+_BAND_KEY_MODULUS = (1 << 61) - 1
+
+
+def minhash_signature(character_frequency_map):
+    signature = [_EMPTY_BIN] * MINHASH_BINS
+    for character, count in character_frequency_map.items():
+        for level in range(count.bit_length()):
+            token = f'{character}{1 << level}'.encode('utf-8')
+            h = int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), 'big')
+            index, value = h % MINHASH_BINS, h // MINHASH_BINS
+            if value < signature[index]:
+                signature[index] = value
+    if min(signature) == _EMPTY_BIN:
+        return ()
+    if max(signature) != _EMPTY_BIN:
+        return tuple(signature)
+    filled = list(signature)
+    source_value = source_index = None
+    for index in range(2 * MINHASH_BINS - 1, -1, -1):
+        value = signature[index % MINHASH_BINS]
+        if value != _EMPTY_BIN:
+            source_value, source_index = value, index
+        elif index < MINHASH_BINS:
+            filled[index] = source_value + (source_index - index) * _EMPTY_BIN
+    return tuple(filled)
+
+
+def lsh_bands(character_frequency_map):
+    signature = minhash_signature(character_frequency_map)
+    if not signature:
+        return []
+    rows = MINHASH_BINS // LSH_BANDS
+    keys = []
+    for start in range(0, MINHASH_BINS, rows):
+        key = start
+        for value in signature[start:start + rows]:
+            key = (key * _BAND_KEY_MULTIPLIER + value) % _BAND_KEY_MODULUS
+        keys.append(key)
+    return keys
+
+
+def backfill_lsh_buckets(apps, schema_editor):
+    """Builds LSHBucket rows for strings stored before the index existed."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    LSHBucket = apps.get_model('analyzer_app', 'LSHBucket')
+    db_alias = schema_editor.connection.alias
+
+    rows = []
+    entries = StringEntry.objects.using(db_alias).values_list('id', 'character_frequency_map')
+    for string_id, frequency_map in entries.iterator(chunk_size=CHUNK_SIZE):
+        rows.extend(
+            LSHBucket(band=band, bucket=bucket, entry_id=string_id)
+            for band, bucket in enumerate(lsh_bands(frequency_map))
+        )
+        if len(rows) >= CHUNK_SIZE:
+            LSHBucket.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+            rows = []
+    LSHBucket.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0005_trigramindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='analyzer_app.stringentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket', 'entry'], name='lshbucket_band_bucket_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lshbucket',
+            constraint=models.UniqueConstraint(fields=('band', 'entry'), name='lshbucket_band_entry_uniq'),
+        ),
+        migrations.RunPython(backfill_lsh_buckets, migrations.RunPython.noop),
+    ]
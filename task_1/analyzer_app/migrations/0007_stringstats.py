@@ -0,0 +1,71 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 2000
+
+# Frozen copy of the analyzer_app.stats helpers as of this migration
+STATS_FIELDS = ('length', 'is_palindrome', 'word_count', 'unique_characters', 'character_frequency_map')
+
+
+def histogram_bucket(value):
+    if value < 2:
+        return str(value)
+    low = 1 << (value.bit_length() - 1)
+    return f'{low}-{2 * low - 1}'
+
+
+def _add(counts, key, delta):
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+def apply_rows(stats, rows):
+    for length, is_palindrome, word_count, unique_characters, frequency_map in rows:
+        stats.total_count += 1
+        stats.palindrome_count += 1 if is_palindrome else 0
+        _add(stats.length_histogram, histogram_bucket(length), 1)
+        _add(stats.word_count_histogram, histogram_bucket(word_count), 1)
+        _add(stats.unique_characters_histogram, histogram_bucket(unique_characters), 1)
+        for character, count in frequency_map.items():
+            _add(stats.character_frequency, character, count)
+
+
+def build_string_stats(apps, schema_editor):
+    """Creates the summary row from the strings stored before it existed."""
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    StringStats = apps.get_model('analyzer_app', 'StringStats')
+    db_alias = schema_editor.connection.alias
+
+    stats = StringStats(pk=1, total_count=0, palindrome_count=0, length_histogram={}, word_count_histogram={},
+                        unique_characters_histogram={}, character_frequency={})
+    rows = StringEntry.objects.using(db_alias).values_list(*STATS_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+    apply_rows(stats, rows)
+    stats.save(using=db_alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0006_lshbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_count', models.BigIntegerField(default=0)),
+                ('palindrome_count', models.BigIntegerField(default=0)),
+                ('length_histogram', models.JSONField(default=dict)),
+                ('word_count_histogram', models.JSONField(default=dict)),
+                ('unique_characters_histogram', models.JSONField(default=dict)),
+                ('character_frequency', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_string_stats, migrations.RunPython.noop),
+    ]
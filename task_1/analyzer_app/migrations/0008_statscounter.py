@@ -0,0 +1,57 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+HISTOGRAMS = {
+    'length': 'length_histogram',
+    'word_count': 'word_count_histogram',
+    'unique_characters': 'unique_characters_histogram',
+}
+
+
+def copy_string_stats(apps, schema_editor):
+    """Moves the single-row summary into per-key counter rows (shard 0)."""
+    StringStats = apps.get_model('analyzer_app', 'StringStats')
+    StatsCounter = apps.get_model('analyzer_app', 'StatsCounter')
+    db_alias = schema_editor.connection.alias
+
+    stats = StringStats.objects.using(db_alias).filter(pk=1).first()
+    if stats is None:
+        return
+    counts = {('total', ''): stats.total_count, ('palindromes', ''): stats.palindrome_count}
+    for kind, field in HISTOGRAMS.items():
+        counts.update(((kind, key), count) for key, count in getattr(stats, field).items())
+    counts.update((('character', key), count) for key, count in stats.character_frequency.items())
+    StatsCounter.objects.using(db_alias).bulk_create(
+        [StatsCounter(kind=kind, key=key, shard=0, count=count) for (kind, key), count in counts.items() if count],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0007_stringstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('key', models.CharField(blank=True, max_length=32)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statscounter',
+            constraint=models.UniqueConstraint(fields=('kind', 'key', 'shard'), name='statscounter_kind_key_shard_uniq'),
+        ),
+        migrations.RunPython(copy_string_stats, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='StringStats',
+        ),
+    ]
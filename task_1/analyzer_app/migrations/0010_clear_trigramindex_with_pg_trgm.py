@@ -0,0 +1,56 @@
+# Generated by Django 4.2.25 on 2026-10-18 15:31
+
+from django.db import migrations
+
+CHUNK_SIZE = 2000
+TRIGRAM_START = '\x02' # Same marker as analyzer_app.search.TRIGRAM_START
+PG_TRGM_INDEX_NAME = 'strentry_value_trgm_idx' # Created by migration 0005
+
+
+def has_pg_trgm_index(schema_editor) -> bool:
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        return PG_TRGM_INDEX_NAME in connection.introspection.get_constraints(cursor, 'analyzer_app_stringentry')
+
+
+def clear_trigram_index(apps, schema_editor):
+    """
+    On Postgres with the pg_trgm GIN index, substring searches never read
+    TrigramIndex and new strings no longer get rows in it: drop the existing ones.
+    """
+    if has_pg_trgm_index(schema_editor):
+        schema_editor.execute('TRUNCATE TABLE analyzer_app_trigramindex')
+
+
+def backfill_trigram_index(apps, schema_editor):
+    """Reverse: rebuilds the rows, as migration 0005 does."""
+    if not has_pg_trgm_index(schema_editor):
+        return
+    StringEntry = apps.get_model('analyzer_app', 'StringEntry')
+    TrigramIndex = apps.get_model('analyzer_app', 'TrigramIndex')
+    db_alias = schema_editor.connection.alias
+
+    rows = []
+    for string_id, value in StringEntry.objects.using(db_alias).values_list('id', 'value').iterator(chunk_size=CHUNK_SIZE):
+        text = TRIGRAM_START + value.lower()
+        rows.extend(
+            TrigramIndex(trigram=trigram, entry_id=string_id)
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}
+        )
+        if len(rows) >= CHUNK_SIZE:
+            TrigramIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+            rows = []
+    TrigramIndex.objects.using(db_alias).bulk_create(rows, batch_size=CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer_app', '0009_writegeneration'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_trigram_index, backfill_trigram_index),
+    ]
@@ -13,7 +13,6 @@ class StringEntry(models.Model):
     is_palindrome = models.BooleanField()
     unique_characters = models.IntegerField()
     word_count = models.IntegerField()
-    sha256_hash = models.CharField(max_length=64, unique=True) # Required in properties object
     
     # Character Frequency Map (Use JSONField for dictionary storage)
     character_frequency_map = models.JSONField()
@@ -21,5 +20,128 @@ class StringEntry(models.Model):
     # Required timestamp
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Secondary indexes for the GET /strings filters and keyset pagination
+        indexes = [
+            # Default list ordering / cursor pagination on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='strentry_created_id_idx'),
+            # is_palindrome=... is an equality filter, so it can share the ordered index
+            models.Index(fields=['is_palindrome', 'created_at', 'id'], name='strentry_pal_created_idx'),
+            # Range filters (*_gt / *_lt)
+            models.Index(fields=['length'], name='strentry_length_idx'),
+            models.Index(fields=['word_count'], name='strentry_word_count_idx'),
+            models.Index(fields=['unique_characters'], name='strentry_unique_chars_idx'),
+        ]
+
+    @property
+    def sha256_hash(self):
+        # The PK already is the SHA-256 of the value (required in properties object)
+        return self.id
+
+    def __str__(self):
+        return self.value
+
+class CharacterIndex(models.Model):
+    """
+    Inverted character index: one row per (character, stored string) with the
+    number of occurrences. Lets GET /strings filter on "contains character X"
+    with an index lookup instead of scanning every character_frequency_map.
+    Rows are written together with their StringEntry and removed by CASCADE.
+    """
+    character = models.CharField(max_length=1)
+    entry = models.ForeignKey(StringEntry, on_delete=models.CASCADE, related_name='character_index')
+    count = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['character', 'entry'], name='charindex_char_entry_uniq'),
+        ]
+        indexes = [
+            # Covers contains_character=... with min_count=... (count >= N)
+            models.Index(fields=['character', 'count', 'entry'], name='charindex_char_count_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.character!r} x{self.count} in {self.entry_id}'
+
+class TrigramIndex(models.Model):
+    """
+    Inverted trigram index over the case-folded value: one row per distinct
+    trigram of each stored string. GET /strings?contains=/?startswith=
+    intersect these posting lists to find candidates before verifying them.
+    Rows are written together with their StringEntry and removed by CASCADE.
+    """
+    trigram = models.CharField(max_length=3)
+    entry = models.ForeignKey(StringEntry, on_delete=models.CASCADE, related_name='trigram_index')
+
+    class Meta:
+        constraints = [
+            # Also the (trigram, entry) index the posting-list lookups run on
+            models.UniqueConstraint(fields=['trigram', 'entry'], name='trigram_gram_entry_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.trigram!r} in {self.entry_id}'
+
+class LSHBucket(models.Model):
+    """
+    Locality-sensitive hashing index over character distributions: one row per
+    (band, bucket) of each stored string's MinHash signature (see utils.lsh_bands).
+    Strings sharing a bucket are candidates for GET /strings/{value}/similar.
+    Rows are written together with their StringEntry and removed by CASCADE.
+    """
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    entry = models.ForeignKey(StringEntry, on_delete=models.CASCADE, related_name='lsh_buckets')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['band', 'entry'], name='lshbucket_band_entry_uniq'),
+        ]
+        indexes = [
+            # Bucket lookups return the entry ids straight from the index
+            models.Index(fields=['band', 'bucket', 'entry'], name='lshbucket_band_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f'band {self.band} bucket {self.bucket} -> {self.entry_id}'
+
+class StatsCounter(models.Model):
+    """
+    Summary of every stored string for GET /strings/stats, as per-key counters:
+    totals, histogram buckets and per-character occurrences. Writes add their
+    delta to the keys they change (stats.upsert_counters) in their own
+    transaction; each write uses one random shard so concurrent writers rarely
+    share a row. Reads sum the shards. Rebuild with `manage.py rebuild_string_stats`.
+    """
+    kind = models.CharField(max_length=32)  # total, palindromes, length, word_count, unique_characters, character
+    key = models.CharField(max_length=32, blank=True) # Bucket label ("4-7") or character; '' for totals
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also the conflict target of the upserts
+            models.UniqueConstraint(fields=['kind', 'key', 'shard'], name='statscounter_kind_key_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}[{self.key!r}] shard {self.shard}: {self.count}'
+
+
+class WriteGeneration(models.Model):
+    """
+    Global write generation (single row), bumped after every committed write
+    and part of every list cache key (see cache.write_generation()). Kept in
+    the database so that every worker process sees the same value.
+    A second row holds the delete generation, bumped after every committed
+    delete and checked by the process-local detail caches.
+    """
+    SINGLETON_ID = 1
+    DELETE_GENERATION_ID = 2
+
+    value = models.BigIntegerField()
+
     def __str__(self):
-        return self.value
\ No newline at end of file
+        return f'generation {self.value}'
@@ -0,0 +1,88 @@
+# analyzer_app/pagination.py
+
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+# Keyset ordering used by GET /strings: newest first, id breaks ties
+LIST_ORDERING = ('-created_at', '-id')
+
+
+def encode_cursor(created_at, string_id) -> str:
+    """
+    Encodes the (created_at, id) position of the last row of a page into an opaque token.
+    """
+    payload = json.dumps([created_at.isoformat(), string_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str):
+    """
+    Decodes a token produced by encode_cursor() back to (created_at, id).
+    Raises a 400 ValidationError for anything malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, string_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = parse_datetime(created_at)
+    except (ValueError, TypeError, UnicodeError):
+        created_at = string_id = None
+
+    if created_at is None or not isinstance(string_id, str):
+        raise ValidationError({'cursor': ['Invalid cursor.']})
+    return created_at, string_id
+
+
+def parse_limit(raw_limit) -> int:
+    """
+    Returns the requested page size, falling back to the default for invalid values.
+    """
+    default = getattr(settings, 'STRING_LIST_PAGE_SIZE', 100)
+    maximum = getattr(settings, 'STRING_LIST_MAX_PAGE_SIZE', 1000)
+    if raw_limit is None or not raw_limit.isdigit() or int(raw_limit) == 0:
+        return default
+    return min(int(raw_limit), maximum)
+
+
+def instance_position(instance):
+    return instance.created_at, instance.id
+
+
+def keyset_page(queryset, cursor, limit):
+    """
+    Orders `queryset` by LIST_ORDERING and returns the slice for one page,
+    plus one extra row to know whether there is a next page.
+    """
+    queryset = queryset.order_by(*LIST_ORDERING)
+    if cursor:
+        created_at, string_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=string_id)
+        )
+    return queryset[:limit + 1]
+
+
+def split_page(rows, limit, position=instance_position):
+    """Returns (rows, next_cursor) from the rows fetched by keyset_page()."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(*position(rows[-1]))
+    return rows, None
+
+
+def paginate(queryset, cursor, limit, position=instance_position):
+    """
+    Returns (rows, next_cursor) for one keyset page of `queryset`.
+    Only rows strictly after `cursor` in LIST_ORDERING are read.
+    `position` extracts (created_at, id) from a row (model instance by default).
+    """
+    return split_page(list(keyset_page(queryset, cursor, limit)), limit, position)
+
+
+async def apaginate(queryset, cursor, limit, position=instance_position):
+    """Async version of paginate() for the async views (async ORM iteration)."""
+    rows = [row async for row in keyset_page(queryset, cursor, limit)]
+    return split_page(rows, limit, position)
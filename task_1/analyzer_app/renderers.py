@@ -0,0 +1,61 @@
+# analyzer_app/renderers.py
+
+import json
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .metrics import timed
+
+try:
+    import orjson
+except ImportError: # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+    Falls back to DRF's stdlib encoder for indented (browsable/?indent) output
+    and for data orjson cannot encode (e.g. Decimal or lazy translation strings).
+    """
+
+    @timed('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: U+2028/U+2029 are not valid in JavaScript strings
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON (one JSON document per line).
+    Lets clients ask for the streaming export with `Accept: application/x-ndjson`.
+    Non-streamed responses (e.g. errors) are rendered as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    @timed('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return encode_ndjson_line(data)
+
+
+def encode_ndjson_line(data) -> bytes:
+    """
+    Encodes one NDJSON line (UTF-8, no ASCII escaping, trailing newline).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
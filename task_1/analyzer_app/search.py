@@ -0,0 +1,201 @@
+# analyzer_app/search.py
+
+import heapq
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Count, Func, Q
+from .cache import get_filter_stats_cache
+from .models import LSHBucket, StringEntry, TrigramIndex
+from .serializers import ENTRY_FIELDS
+from .stats import CHARACTER, HISTOGRAMS, PALINDROMES, TOTAL, stats_payload
+from .utils import distribution_similarity
+
+# Marks the start of a value, so prefix searches get their own trigrams ("\x02ab")
+TRIGRAM_START = '\x02'
+
+# Longer search terms only use this many of their trigrams to find candidates;
+# every candidate is verified against the full term anyway
+MAX_QUERY_TRIGRAMS = 32
+
+# Postgres GIN index created by migration 0005 when the pg_trgm extension is available
+PG_TRGM_INDEX_NAME = 'strentry_value_trgm_idx'
+
+
+class Likelihood(Func):
+    """
+    Filter condition with the probability that a row matches it, for the SQLite
+    planner: likelihood(cond, p). Without sqlite_stat4 (not compiled into most
+    builds) SQLite cannot estimate range filters, and its choice between walking
+    strentry_created_id_idx in list order and searching the filtered column's
+    index (then sorting the matches) follows the page size rather than how many
+    rows match. Plain condition on other databases, whose planners keep column statistics.
+    """
+    template = '%(expressions)s'
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, condition, probability):
+        super().__init__(condition)
+        self.probability = probability
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection,
+                           template=f'likelihood(%(expressions)s, {float(self.probability)})', **extra_context)
+
+
+def filter_statistics() -> dict:
+    """
+    Row counts for estimating filter selectivity: the total, palindromes, the
+    power-of-two histograms and character occurrences of the stats counters,
+    as {kind: {key: count}}. Cached per process (settings.STRING_FILTER_STATS_CACHE).
+    """
+    stats_cache = get_filter_stats_cache()
+    statistics = stats_cache.get('statistics')
+    if statistics is None:
+        payload = stats_payload()
+        statistics = {
+            TOTAL: payload['total_count'],
+            PALINDROMES: payload['palindrome_count'],
+            CHARACTER: payload['character_frequency'],
+            **{field: payload[name] for field, name in HISTOGRAMS.items()},
+        }
+        stats_cache.set('statistics', statistics)
+    return statistics
+
+
+def range_fraction(statistics, field, lookup, value) -> float:
+    """
+    Upper bound of the fraction of rows matching `field`__`lookup`=`value`
+    (lookup 'gt' or 'lt'): the rows of every histogram bucket the range overlaps.
+    """
+    total = statistics[TOTAL]
+    if not total:
+        return 0.0
+    matches = 0
+    for label, count in statistics[field].items():
+        low, _, high = label.partition('-')
+        low, high = int(low), int(high or low)
+        if (lookup == 'gt' and high > value) or (lookup == 'lt' and low < value):
+            matches += count
+    return min(matches / total, 1.0)
+
+
+def plan_hint(condition, fraction, limit):
+    """
+    Steers the plan of a filtered page from the estimated matching `fraction`
+    of the rows: searching the filter's index reads about fraction x N rows
+    (then sorts them), walking the list order about limit / fraction rows
+    before the page is full. Selective filters search, broad ones walk and stop early.
+    """
+    total = filter_statistics()[TOTAL]
+    search = fraction * fraction * total < limit
+    return Likelihood(condition, 0.05 if search else 1.0)
+
+
+def value_trigrams(value: str) -> set:
+    """
+    Distinct case-folded trigrams of a stored value, including the start-of-value ones.
+    """
+    text = TRIGRAM_START + value.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def query_trigrams(term: str, prefix: bool = False) -> list:
+    """
+    Trigrams every match of `term` must contain (empty if the term is too short).
+    """
+    text = (TRIGRAM_START if prefix else '') + term.lower()
+    grams = list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+    if len(grams) > MAX_QUERY_TRIGRAMS:
+        # Spread the sample over the whole term rather than only its beginning
+        step = len(grams) / MAX_QUERY_TRIGRAMS
+        grams = [grams[int(i * step)] for i in range(MAX_QUERY_TRIGRAMS)]
+    return grams
+
+
+def trigram_candidates(grams):
+    """
+    Ids of strings whose posting lists contain every trigram in `grams`
+    (intersection as one GROUP BY over the (trigram, entry) index).
+    """
+    return (TrigramIndex.objects.filter(trigram__in=grams)
+            .values('entry_id')
+            .annotate(matched=Count('trigram'))
+            .filter(matched=len(grams))
+            .values('entry_id'))
+
+
+_pg_trgm_available = {}
+
+
+def pg_trgm_available() -> bool:
+    """
+    True when the default database is Postgres and has the pg_trgm GIN index on value.
+    Checked once per process.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in _pg_trgm_available:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, StringEntry._meta.db_table)
+        _pg_trgm_available[connection.alias] = PG_TRGM_INDEX_NAME in constraints
+    return _pg_trgm_available[connection.alias]
+
+
+def filter_value(queryset, term: str, prefix: bool = False):
+    """
+    Case-insensitive substring (or prefix) filter on StringEntry.value.
+    Candidates come from the trigram index and are then verified with
+    icontains/istartswith, so only candidate rows are read.
+    """
+    lookup = 'value__istartswith' if prefix else 'value__icontains'
+    if pg_trgm_available():
+        # The GIN (gin_trgm_ops) index on UPPER(value) serves both lookups directly
+        return queryset.filter(**{lookup: term})
+
+    grams = query_trigrams(term, prefix)
+    if grams:
+        queryset = queryset.filter(id__in=trigram_candidates(grams))
+    # Terms shorter than a trigram cannot use the index and fall back to the plain lookup
+    return queryset.filter(**{lookup: term})
+
+
+def lsh_candidates(bands, exclude_id=None, limit=1000) -> list:
+    """
+    Ids of stored strings sharing at least one LSH bucket with `bands`,
+    most shared buckets first (at most `limit`).
+    """
+    if not bands:
+        return []
+    match = Q()
+    for band, bucket in enumerate(bands):
+        match |= Q(band=band, bucket=bucket)
+    candidates = LSHBucket.objects.filter(match)
+    if exclude_id is not None:
+        candidates = candidates.exclude(entry_id=exclude_id)
+    return list(candidates.values('entry_id')
+                .annotate(shared=Count('band'))
+                .order_by('-shared', 'entry_id')
+                .values_list('entry_id', flat=True)[:limit])
+
+
+def similar_entries(character_frequency_map, bands, k, exclude_id=None):
+    """
+    Returns ([(similarity, row)] for the k most similar stored strings, number of
+    candidates). Rows are values_list(*ENTRY_FIELDS) tuples. Only LSH candidates
+    are read; they are ranked by the exact weighted Jaccard similarity of the
+    character frequency maps.
+    """
+    max_candidates = getattr(settings, 'STRING_SIMILAR_MAX_CANDIDATES', 2000)
+    chunk_size = getattr(settings, 'STRING_BATCH_CHUNK_SIZE', 500)
+    ids = lsh_candidates(bands, exclude_id, limit=max_candidates)
+
+    frequency_map_index = ENTRY_FIELDS.index('character_frequency_map')
+    scored = []
+    for start in range(0, len(ids), chunk_size):
+        rows = StringEntry.objects.filter(id__in=ids[start:start + chunk_size]).values_list(*ENTRY_FIELDS)
+        scored.extend((distribution_similarity(character_frequency_map, row[frequency_map_index]), row)
+                      for row in rows)
+
+    return heapq.nlargest(k, scored, key=lambda item: item[0]), len(ids)
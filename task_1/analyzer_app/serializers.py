@@ -1,11 +1,23 @@
-from rest_framework import serializers
+import datetime
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.utils import timezone
+from .metrics import timed
 from .models import StringEntry
 
+# Maximum length of a single stored string value
+MAX_VALUE_LENGTH = 500
+
+# Column order used by the fast read path (queryset.values_list(*ENTRY_FIELDS))
+ENTRY_FIELDS = ('id', 'value', 'length', 'is_palindrome', 'unique_characters',
+                'word_count', 'character_frequency_map', 'created_at')
+
 class StringInputSerializer(serializers.Serializer):
     """
     Serializer used only for validating the input JSON {"value": "string"}
     """
-    value = serializers.CharField(required=True, max_length=500) 
+    value = serializers.CharField(required=True, max_length=MAX_VALUE_LENGTH) 
 
     def to_internal_value(self, data):
         # Check if the 'value' key exists in the raw input data
@@ -28,6 +40,34 @@ class StringInputSerializer(serializers.Serializer):
             raise serializers.ValidationError("The 'value' field cannot be empty.")
         return value
 
+class StringBatchInputSerializer(serializers.Serializer):
+    """
+    Serializer used only for validating the batch input JSON {"values": ["string", ...]}.
+    Individual items are checked with validate_batch_item() so one bad item
+    does not reject the whole batch.
+    """
+    values = serializers.ListField(
+        child=serializers.JSONField(),
+        allow_empty=False,
+        max_length=getattr(settings, 'STRING_BATCH_MAX_SIZE', 10000),
+    )
+
+
+def validate_batch_item(raw_value):
+    """
+    Applies the same rules as StringInputSerializer to one batch item
+    (including CharField's whitespace trimming).
+    Returns a (value, error) tuple; error is None if the item is valid.
+    """
+    if not isinstance(raw_value, str):
+        return None, 'Invalid data type. Expected a string.'
+    value = raw_value.strip()
+    if not value:
+        return None, 'This field may not be blank.'
+    if len(value) > MAX_VALUE_LENGTH:
+        return None, f'Ensure this field has no more than {MAX_VALUE_LENGTH} characters.'
+    return value, None
+
 class StringEntrySerializer(serializers.ModelSerializer):
     """
     Serializer used for outputting the saved data (201, 200 responses)
@@ -42,7 +82,11 @@ class StringEntrySerializer(serializers.ModelSerializer):
         # Read-only fields (set automatically or by the analysis)
         read_only_fields = ('id', 'created_at', 'length', 'is_palindrome', 
                             'unique_characters', 'word_count', 
-                            'sha256_hash', 'character_frequency_map')
+                            'character_frequency_map')
+
+    @timed('serialize')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
     
     def get_properties(self, obj):
         """
@@ -55,4 +99,54 @@ class StringEntrySerializer(serializers.ModelSerializer):
             "word_count": obj.word_count,
             "sha256_hash": obj.sha256_hash,
             "character_frequency_map": obj.character_frequency_map,
-        }
\ No newline at end of file
+        }
+
+
+# Formats created_at exactly like StringEntrySerializer does
+_created_at_field = serializers.DateTimeField()
+
+
+def _utc_isoformat(value):
+    value = value.astimezone(datetime.timezone.utc).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def created_at_formatter():
+    """
+    Returns a function that formats created_at like StringEntrySerializer.
+    With the default settings (ISO 8601 output, UTC) that is a plain isoformat()
+    call, which skips DRF's per-value settings and timezone lookups.
+    """
+    if (settings.USE_TZ and str(api_settings.DATETIME_FORMAT).lower() == ISO_8601
+            and timezone.get_current_timezone_name() == 'UTC'):
+        return _utc_isoformat
+    return _created_at_field.to_representation
+
+
+@timed('serialize')
+def serialize_row(row, format_created_at=None) -> dict:
+    """
+    Fast read path: builds the same JSON shape as StringEntrySerializer from a
+    values_list(*ENTRY_FIELDS) tuple, without per-field serializer overhead.
+    """
+    string_id, value, length, is_palindrome, unique_characters, word_count, frequency_map, created_at = row
+    return {
+        "id": string_id,
+        "value": value,
+        "properties": {
+            "length": length,
+            "is_palindrome": is_palindrome,
+            "unique_characters": unique_characters,
+            "word_count": word_count,
+            "sha256_hash": string_id,
+            "character_frequency_map": frequency_map,
+        },
+        "created_at": (format_created_at or created_at_formatter())(created_at),
+    }
+
+
+@timed('serialize')
+def serialize_rows(rows) -> list:
+    """serialize_row() for every values_list(*ENTRY_FIELDS) tuple in `rows`."""
+    format_created_at = created_at_formatter()
+    return [serialize_row(row, format_created_at) for row in rows]
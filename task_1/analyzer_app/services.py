@@ -0,0 +1,189 @@
+# analyzer_app/services.py
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from .bloom import record_write
+from .cache import invalidate_entry, record_delete
+from .models import CharacterIndex, LSHBucket, StatsCounter, StringEntry, TrigramIndex
+from .search import pg_trgm_available, value_trigrams
+from .stats import apply_delta
+
+
+def entry_from_analysis(analysis_result: dict) -> StringEntry:
+    """
+    Builds an unsaved StringEntry from the output of analyze_string().
+    """
+    props = analysis_result['properties']
+    return StringEntry(
+        id=analysis_result['id'], # Use hash as PK
+        value=analysis_result['value'],
+        length=props['length'],
+        is_palindrome=props['is_palindrome'],
+        unique_characters=props['unique_characters'],
+        word_count=props['word_count'],
+        character_frequency_map=props['character_frequency_map'],
+    )
+
+
+def character_index_rows(instances) -> list:
+    """
+    Builds the CharacterIndex rows (character -> string id, count) for new entries.
+    """
+    return [
+        CharacterIndex(character=character, entry_id=instance.id, count=count)
+        for instance in instances
+        for character, count in instance.character_frequency_map.items()
+    ]
+
+
+def trigram_index_rows(instances) -> list:
+    """
+    Builds the TrigramIndex rows (trigram -> string id) for new entries. None on
+    Postgres with the pg_trgm GIN index, which serves the substring searches
+    instead: the table is never read there (migration 0010 empties it).
+    """
+    if pg_trgm_available():
+        return []
+    return [
+        TrigramIndex(trigram=trigram, entry_id=instance.id)
+        for instance in instances
+        for trigram in value_trigrams(instance.value)
+    ]
+
+
+def lsh_bucket_rows(analysis_results) -> list:
+    """
+    Builds the LSHBucket rows (band, bucket -> string id) from analyze_string() results.
+    """
+    return [
+        LSHBucket(band=band, bucket=bucket, entry_id=result['id'])
+        for result in analysis_results
+        for band, bucket in enumerate(result['lsh_bands'])
+    ]
+
+
+def create_entry(analysis_result: dict) -> StringEntry:
+    """
+    Inserts a single analyzed string. Raises IntegrityError if it already exists.
+    """
+    instance = entry_from_analysis(analysis_result)
+    # Savepoint so a duplicate does not break an enclosing transaction
+    with transaction.atomic():
+        instance.save(force_insert=True)
+        CharacterIndex.objects.bulk_create(character_index_rows([instance]))
+        TrigramIndex.objects.bulk_create(trigram_index_rows([instance]))
+        LSHBucket.objects.bulk_create(lsh_bucket_rows([analysis_result]))
+        apply_delta([instance], 1)
+    transaction.on_commit(lambda: record_write([instance.pk]))
+    return instance
+
+
+def begin_write():
+    """
+    On SQLite, takes the database write lock at the start of a transaction that
+    reads before it writes: upgrading a read transaction fails with "database is
+    locked" (without waiting) if another writer committed in between. An UPDATE
+    matching no row is enough. Other databases lock rows as they are written.
+    """
+    if connection.vendor == 'sqlite':
+        StatsCounter.objects.filter(pk=0).update(count=F('count'))
+
+
+def existing_ids(ids) -> set:
+    """
+    Returns the subset of `ids` already stored, using chunked id__in lookups.
+    """
+    chunk_size = getattr(settings, 'STRING_BATCH_CHUNK_SIZE', 500)
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        found.update(StringEntry.objects.filter(id__in=chunk).values_list('id', flat=True))
+    return found
+
+
+def insert_new_entries(analysis_results, chunk_size) -> list:
+    """
+    Inserts the strings of `analysis_results` that are not stored yet and
+    returns their instances. A string stored by a concurrent transaction after
+    the existence check makes the insert fail on the primary key: the savepoint
+    is rolled back and the check repeated, so exactly the inserted rows are returned.
+    The IntegrityError is raised when the repeated check finds no newly stored
+    string (another constraint failed) or after STRING_INSERT_ATTEMPTS attempts.
+    """
+    attempts = getattr(settings, 'STRING_INSERT_ATTEMPTS', 3)
+    analysis_results = list({result['id']: result for result in analysis_results}.values())
+    error = None
+    for _ in range(attempts):
+        already_stored = existing_ids(result['id'] for result in analysis_results)
+        if error is not None and not already_stored:
+            raise error # Not a concurrent insert: retrying would fail the same way
+        analysis_results = [result for result in analysis_results if result['id'] not in already_stored]
+        instances = [entry_from_analysis(result) for result in analysis_results]
+        try:
+            with transaction.atomic():
+                StringEntry.objects.bulk_create(instances, batch_size=chunk_size)
+        except IntegrityError as exc:
+            error = exc
+            continue
+        return instances
+    raise error
+
+
+def bulk_create_entries(analysis_results) -> list:
+    """
+    Inserts many analyzed strings with chunked bulk_create calls and returns the
+    instances actually created. Strings that already exist (or appear twice)
+    are skipped, and the stats delta counts exactly the inserted rows.
+    """
+    chunk_size = getattr(settings, 'STRING_BATCH_CHUNK_SIZE', 500)
+    analysis_results = list(analysis_results)
+    with transaction.atomic():
+        begin_write()
+        instances = insert_new_entries(analysis_results, chunk_size)
+        created = {instance.pk for instance in instances}
+        CharacterIndex.objects.bulk_create(character_index_rows(instances), batch_size=chunk_size)
+        TrigramIndex.objects.bulk_create(trigram_index_rows(instances), batch_size=chunk_size)
+        LSHBucket.objects.bulk_create(
+            lsh_bucket_rows(result for result in analysis_results if result['id'] in created),
+            batch_size=chunk_size,
+        )
+        apply_delta(instances, 1)
+    if instances:
+        transaction.on_commit(lambda: record_write([instance.pk for instance in instances]))
+    return instances
+
+
+def delete_entry(instance: StringEntry):
+    """
+    Deletes a stored string (its index rows go with it through CASCADE),
+    removes it from the stats and invalidates its cached detail payload.
+    """
+    string_id = instance.pk # delete() resets the pk to None
+    with transaction.atomic():
+        _, deleted = instance.delete()
+        if deleted.get(StringEntry._meta.label): # Not already deleted by a concurrent request
+            apply_delta([instance], -1)
+    invalidate_entry(string_id)
+    transaction.on_commit(record_delete) # Other workers' detail caches
+    transaction.on_commit(record_write)
+
+
+def bulk_delete_entries(queryset) -> int:
+    """
+    Deletes every string in `queryset` in one transaction (index rows through
+    CASCADE), with a single stats delta. Returns the number of strings deleted.
+    """
+    with transaction.atomic():
+        begin_write()
+        # Row locks (Postgres): a concurrent delete of the same rows waits, then finds them gone
+        instances = list(queryset.select_for_update())
+        StringEntry.objects.filter(pk__in=[instance.pk for instance in instances]).delete()
+        apply_delta(instances, -1)
+    for instance in instances:
+        invalidate_entry(instance.pk)
+    if instances:
+        transaction.on_commit(record_delete)
+        transaction.on_commit(record_write)
+    return len(instances)
@@ -0,0 +1,136 @@
+# analyzer_app/stats.py
+
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+from .models import StatsCounter, StringEntry
+from .serializers import created_at_formatter
+
+# Columns a stats delta is computed from (values_list order for rebuilds)
+STATS_FIELDS = ('length', 'is_palindrome', 'word_count', 'unique_characters', 'character_frequency_map')
+
+# Counter kinds: totals (key ''), histograms (key = bucket label), characters (key = the character)
+TOTAL, PALINDROMES, CHARACTER = 'total', 'palindromes', 'character'
+HISTOGRAMS = {
+    'length': 'length_histogram',
+    'word_count': 'word_count_histogram',
+    'unique_characters': 'unique_characters_histogram',
+}
+
+
+def histogram_bucket(value: int) -> str:
+    """Power-of-two bucket label: 0 -> "0", 1 -> "1", 5 -> "4-7", 100 -> "64-127"."""
+    if value < 2:
+        return str(value)
+    low = 1 << (value.bit_length() - 1)
+    return f'{low}-{2 * low - 1}'
+
+
+def counter_deltas(rows, sign: int = 1) -> Counter:
+    """
+    (kind, key) -> delta for adding (sign=1) or removing (sign=-1) strings, given
+    rows in STATS_FIELDS order. Each row costs O(distinct characters), whatever the table size.
+    """
+    deltas = Counter()
+    for length, is_palindrome, word_count, unique_characters, frequency_map in rows:
+        deltas[TOTAL, ''] += sign
+        if is_palindrome:
+            deltas[PALINDROMES, ''] += sign
+        deltas['length', histogram_bucket(length)] += sign
+        deltas['word_count', histogram_bucket(word_count)] += sign
+        deltas['unique_characters', histogram_bucket(unique_characters)] += sign
+        for character, count in frequency_map.items():
+            deltas[CHARACTER, character] += sign * count
+    return deltas
+
+
+def entry_rows(instances):
+    return [tuple(getattr(instance, field) for field in STATS_FIELDS) for instance in instances]
+
+
+def upsert_counters(deltas, shard: int):
+    """
+    Adds `deltas` to the counter rows of one shard with a single
+    INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count
+    (SQLite >= 3.24 and Postgres). Only the keys in `deltas` are touched, in
+    sorted order, so concurrent writers lock rows in the same order.
+    """
+    items = sorted((kind, key, delta) for (kind, key), delta in deltas.items() if delta)
+    if not items:
+        return
+    table = connection.ops.quote_name(StatsCounter._meta.db_table)
+    now = timezone.now()
+    chunk_size = getattr(settings, 'STRING_BATCH_CHUNK_SIZE', 500)
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            params = []
+            for kind, key, delta in chunk:
+                params += [kind, key, shard, delta, now]
+            cursor.execute(
+                f'INSERT INTO {table} ("kind", "key", "shard", "count", "updated_at") '
+                f'VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))} '
+                f'ON CONFLICT ("kind", "key", "shard") DO UPDATE SET '
+                f'"count" = {table}."count" + excluded."count", "updated_at" = excluded."updated_at"',
+                params,
+            )
+
+
+def apply_delta(instances, sign: int):
+    """
+    Applies the delta for created (sign=1) or deleted (sign=-1) entries inside
+    the caller's transaction. Each write picks one of STRING_STATS_COUNTER_SHARDS
+    shards at random, so concurrent writers rarely wait on the same counter row
+    (e.g. the total count, which every write changes).
+    """
+    if instances:
+        shard = random.randrange(getattr(settings, 'STRING_STATS_COUNTER_SHARDS', 8))
+        upsert_counters(counter_deltas(entry_rows(instances), sign), shard)
+
+
+def rebuild_stats(chunk_size=None) -> dict:
+    """
+    Recomputes every counter from the stored strings, reading them in chunks,
+    and returns the new stats_payload(). Writers wait until it commits.
+    """
+    chunk_size = chunk_size or getattr(settings, 'STRING_STREAM_CHUNK_SIZE', 2000)
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Blocks the writers' upserts (ROW EXCLUSIVE), not the readers, until commit
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(StatsCounter._meta.db_table)} IN EXCLUSIVE MODE')
+        StatsCounter.objects.all().delete() # On SQLite this write takes the database write lock
+        rows = StringEntry.objects.values_list(*STATS_FIELDS).iterator(chunk_size=chunk_size)
+        upsert_counters(counter_deltas(rows), shard=0)
+    return stats_payload()
+
+
+def _bucket_order(label: str) -> int:
+    return int(label.split('-')[0])
+
+
+def stats_payload() -> dict:
+    """JSON representation for GET /strings/stats, summed over the counter shards."""
+    counts = {kind: {} for kind in (TOTAL, PALINDROMES, CHARACTER, *HISTOGRAMS)}
+    rows = StatsCounter.objects.values_list('kind', 'key').annotate(total=Sum('count')).order_by()
+    for kind, key, total in rows:
+        if total and kind in counts:
+            counts[kind][key] = total
+    updated_at = StatsCounter.objects.aggregate(updated_at=Max('updated_at'))['updated_at']
+
+    total_count = counts[TOTAL].get('', 0)
+    palindrome_count = counts[PALINDROMES].get('', 0)
+    payload = {
+        "total_count": total_count,
+        "palindrome_count": palindrome_count,
+        "palindrome_ratio": round(palindrome_count / total_count, 4) if total_count else None,
+    }
+    for kind, name in HISTOGRAMS.items():
+        payload[name] = dict(sorted(counts[kind].items(), key=lambda item: _bucket_order(item[0])))
+    payload["character_frequency"] = dict(sorted(counts[CHARACTER].items(), key=lambda item: -item[1]))
+    payload["updated_at"] = created_at_formatter()(updated_at) if updated_at else None
+    return payload
@@ -1,3 +1,1051 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework.test import APIClient
+
+from . import bloom, cache as cache_module, ingest, services
+from .bloom import IdFilter
+from .cache import (
+    DELETE_GENERATION_KEY, DeleteCheckedCache, LRUCache, SharedCache, build_detail_cache, bump_write_generation,
+    check_generation_cache, get_detail_cache, get_filter_stats_cache, get_list_cache, write_generation,
+)
+from .ingest import IngestQueue, IngestQueueFull
+from .management.commands.bench_analyzer import legacy_analyze_string
+from .models import CharacterIndex, LSHBucket, StatsCounter, StringEntry, TrigramIndex, WriteGeneration
+from .serializers import ENTRY_FIELDS, StringEntrySerializer, serialize_row, serialize_rows
+from .services import bulk_create_entries, bulk_delete_entries, entry_from_analysis
+from .stats import rebuild_stats
+from .utils import analyze_file, analyze_string, analyze_strings, hash_value, lsh_bands, minhash_signature
+from .views import StringDetailView
+
+
+class ListQueryPlanTests(TestCase):
+    """
+    Checks the plans of the filtered GET /strings queries (page and count) on
+    SQLite and Postgres: selective filters search an index instead of scanning
+    the table or walking a whole index, broad ones read the list order and stop
+    after one page.
+    """
+
+    # 200 similar rows plus a few outliers, so these filters match at most 3 rows (as
+    # estimated from the power-of-two histograms of the stats counters too)
+    SELECTIVE_FILTERS = [
+        {'length_gt': '30'},
+        {'length_lt': '8'},
+        {'word_count_gt': '5'},
+        {'word_count_lt': '2'},
+        {'unique_characters_gt': '15'},
+        {'unique_characters_lt': '5'},
+        {'is_palindrome': 'true'},
+        {'contains_character': 'z'},
+        {'contains_character': 'z', 'min_count': '2'},
+        {'contains': 'racecar'},
+        {'startswith': 'zebra'},
+        {'natural_language_filter': 'palindromes'},
+        {'natural_language_filter': 'long strings'},
+        {'natural_language_filter': 'short strings'},
+        {'natural_language_filter': 'strings containing the letter z'},
+        {'natural_language_filter': 'long palindromes containing the letter z'},
+    ]
+
+    # Match (nearly) every row: walking the list order fills the page right away
+    BROAD_FILTERS = [
+        {'length_gt': '1'},
+        {'word_count_gt': '1'},
+        {'unique_characters_gt': '5'},
+        {'natural_language_filter': 'strings with unique characters'},
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+        get_filter_stats_cache().clear()
+        values = [f'sample {i:03d}' for i in range(200)]
+        values += ['racecar', 'xyz', 'zebra crossing zone with a very long tail of words here']
+        self.client.post('/strings/batch', {'values': values}, format='json')
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Tiny test tables are always cheaper to seq-scan, so force the planner's hand
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def list_queries(self, params):
+        """Runs GET /strings and returns the SELECTs it issued on the strings table."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/strings', params)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries
+                if q['sql'].startswith('SELECT') and StringEntry._meta.db_table in q['sql']]
+
+    def test_selective_filters_search_an_index(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('Query plans are only checked on SQLite and Postgres.')
+
+        for params in self.SELECTIVE_FILTERS:
+            queries = self.list_queries({**params, 'limit': '10'})
+            self.assertEqual(len(queries), 2) # Page and count
+            for sql in queries:
+                plan = self.explain(sql)
+                with self.subTest(params=params, plan=plan):
+                    if connection.vendor == 'postgresql':
+                        self.assertNotIn('Seq Scan', plan)
+                        self.assertIn('Index', plan)
+                    else:
+                        # "SCAN t" reads the table and "SCAN t USING INDEX i" reads all of an
+                        # index; only "SEARCH" lines seek to the matching keys
+                        self.assertNotRegex(plan, r'(?m)^SCAN ')
+                        self.assertRegex(plan, r'(?m)^SEARCH \S+ USING (COVERING )?INDEX '
+                                               r'(strentry_|charindex_|trigram_|sqlite_autoindex_)')
+
+    def test_broad_filters_walk_the_list_order_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are only checked in detail on SQLite.')
+        for params in self.BROAD_FILTERS:
+            page_sql = self.list_queries({**params, 'limit': '10', 'include_count': 'false'})[0]
+            with self.subTest(params=params):
+                # Reads rows in list order until 10 match (no search + sort of every match)
+                self.assertEqual(self.explain(page_sql),
+                                 'SCAN analyzer_app_stringentry USING INDEX strentry_created_id_idx')
+
+    def test_unfiltered_page_walks_the_list_order_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are only checked in detail on SQLite.')
+        page_sql = self.list_queries({'include_count': 'false'})[0]
+        # Reads `limit` rows of strentry_created_id_idx, already in list order (no sort)
+        self.assertEqual(self.explain(page_sql), 'SCAN analyzer_app_stringentry USING INDEX strentry_created_id_idx')
+
+
+class StatsCounterTests(TestCase):
+    """GET /strings/stats stays equal to a full recount through creates, batches and deletes."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_incremental_counters_match_a_rebuild(self):
+        self.client.post('/strings', {'value': 'racecar'}, format='json')
+        self.client.post('/strings/batch', {'values': ['hello world', 'level', 'racecar', 'abba abba']},
+                         format='json')
+        self.client.delete('/strings/level')
+        self.client.delete('/strings/level') # Already gone: no second decrement
+
+        payload = self.client.get('/strings/stats').json()
+        self.assertEqual(payload['total_count'], 3)
+        self.assertEqual(payload['palindrome_count'], 2)
+        self.assertEqual(payload['character_frequency']['a'], 6)
+
+        rebuilt = rebuild_stats()
+        for key in ('total_count', 'palindrome_count', 'length_histogram', 'word_count_histogram',
+                    'unique_characters_histogram', 'character_frequency'):
+            self.assertEqual(payload[key], rebuilt[key], key)
+
+    def test_a_write_only_touches_its_own_keys(self):
+        self.client.post('/strings', {'value': 'abc'}, format='json')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post('/strings', {'value': 'xyz'}, format='json')
+        counter_queries = [q['sql'] for q in ctx.captured_queries if StatsCounter._meta.db_table in q['sql']]
+        self.assertEqual(len(counter_queries), 1) # One upsert, no read of the summary
+        self.assertEqual(counter_queries[0].count("'character'"), 3) # x, y and z only
+
+
+class IdFilterTests(TestCase):
+    """The Bloom filter never answers 404 for a stored id, including ones written by other workers."""
+
+    def setUp(self):
+        patcher = mock.patch.object(IdFilter, 'sync') # Synced by hand: no background thread
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def store_elsewhere(self, value) -> str:
+        """Stores a string the way another worker does: this filter's record_write() never sees it."""
+        entry = entry_from_analysis(analyze_string(value))
+        entry.save()
+        bump_write_generation()
+        return entry.pk
+
+    def test_other_workers_writes_are_added_without_a_rebuild(self):
+        id_filter = IdFilter(min_capacity=1000)
+        first = self.store_elsewhere('first')
+        id_filter._rebuild()
+        self.assertTrue(id_filter.definitely_missing(hash_value('never stored')))
+        self.assertFalse(id_filter.definitely_missing(first))
+
+        second = self.store_elsewhere('second')
+        id_filter._add_recent(id_filter.bloom)
+        self.assertFalse(id_filter.definitely_missing(second))
+        self.assertTrue(id_filter.definitely_missing(hash_value('never stored')))
+        self.assertEqual((id_filter.rebuilds, id_filter.syncs, id_filter.unusable), (1, 1, 0))
+        self.assertEqual(id_filter.bloom.count, 2)
+
+        id_filter._add_recent(id_filter.bloom) # No write since: nothing to scan
+        self.assertEqual(id_filter.syncs, 1)
+
+    def test_generation_is_not_trusted_once_stale(self):
+        id_filter = IdFilter(min_capacity=1000, max_staleness=0.05)
+        id_filter._rebuild()
+        self.assertTrue(id_filter.definitely_missing(hash_value('never stored')))
+
+        time.sleep(0.06) # No sync meanwhile: another worker may have stored it
+        self.assertFalse(id_filter.definitely_missing(hash_value('never stored')))
+        self.assertEqual(id_filter.unusable, 1)
+        id_filter.sync.assert_called()
+
+    def test_own_writes_keep_the_filter_in_sync(self):
+        id_filter = IdFilter(min_capacity=1000)
+        id_filter._rebuild()
+        entry = entry_from_analysis(analyze_string('mine'))
+        entry.save()
+        id_filter.record_write([entry.pk])
+        self.assertFalse(id_filter.definitely_missing(entry.pk))
+        self.assertTrue(id_filter.definitely_missing(hash_value('never stored')))
+        self.assertEqual(id_filter.unusable, 0)
+
+    @override_settings(STRING_ID_FILTER={'ENABLED': True})
+    def test_miss_is_answered_without_a_query(self):
+        self.client = APIClient()
+        id_filter = IdFilter(min_capacity=1000)
+        id_filter._rebuild()
+        with mock.patch.object(bloom, '_id_filter', id_filter):
+            for method, path in (('get', '/strings/never stored'), ('get', '/async/strings/never stored'),
+                                 ('delete', '/strings/never stored'), ('delete', '/async/strings/never stored')):
+                with self.subTest(method=method, path=path), self.assertNumQueries(0):
+                    self.assertEqual(getattr(self.client, method)(path).status_code, 404)
+            with self.assertNumQueries(0):
+                response = self.client.get('/strings/never stored', HTTP_IF_NONE_MATCH='"x"')
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(id_filter.negatives, 5) # One filter check per request
+
+
+class ConditionalGetTests(TestCase):
+    """ETags of GET /strings/{value} follow the stored row, not this worker's detail cache."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_detail_cache().clear()
+
+    def test_not_modified_until_the_string_is_stored_again(self):
+        for prefix in ('/strings', '/async/strings'):
+            with self.subTest(prefix=prefix):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post('/strings', {'value': 'etag me'}, format='json')
+                first = self.client.get(f'{prefix}/etag me')
+                etag = first['ETag']
+                self.assertEqual(first['Cache-Control'], 'no-cache')
+                self.assertEqual(self.client.get(f'{prefix}/etag me', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.delete('/strings/etag me')
+                    self.client.post('/strings', {'value': 'etag me'}, format='json')
+                response = self.client.get(f'{prefix}/etag me', HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertNotEqual(response.json()['created_at'], first.json()['created_at'])
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.delete('/strings/etag me')
+
+    def test_deleted_by_another_worker(self):
+        for prefix in ('/strings', '/async/strings'):
+            with self.subTest(prefix=prefix):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post('/strings', {'value': 'gone'}, format='json')
+                etag = self.client.get(f'{prefix}/gone')['ETag'] # Now in this worker's detail cache
+                StringEntry.objects.filter(pk=hash_value('gone')).delete() # No invalidation here
+                self.assertEqual(self.client.get(f'{prefix}/gone', HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_string_cache'},
+})
+class AsyncSharedCacheTests(TestCase):
+    """
+    The async views reach a shared cache through its async API: a database cache
+    raises SynchronousOnlyOperation on a sync call from the event loop.
+    """
+
+    def setUp(self):
+        call_command('createcachetable', verbosity=0)
+        patcher = mock.patch.dict(cache_module._caches, {
+            'STRING_DETAIL_CACHE': SharedCache('shared', 'string-detail:'),
+            'STRING_LIST_CACHE': SharedCache('shared', 'string-list:'),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def test_list_and_detail_hits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/strings', {'value': 'shared cache'}, format='json')
+        for path in ('/async/strings', '/async/strings/shared cache'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path)['X-Cache'], 'MISS')
+                self.assertEqual(self.client.get(path)['X-Cache'], 'HIT')
+
+
+@override_settings(STRING_INGEST={'MODE': 'async'})
+class IngestQueueTests(TransactionTestCase):
+    """Write-behind POST /strings: 202 + status URL, 429 when full, batched commits and the shutdown drain."""
+
+    def use_queue(self, **kwargs) -> IngestQueue:
+        ingest_queue = IngestQueue(**kwargs)
+        patcher = mock.patch.object(ingest, '_ingest_queue', ingest_queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ingest_queue.drain, 5)
+        return ingest_queue
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_accepted_then_created(self):
+        ingest_queue = self.use_queue()
+        response = self.client.post('/strings', {'value': 'later'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+        status_url = response['Location']
+        self.assertEqual(status_url, f'/strings/ingest/{hash_value("later")}')
+
+        ingest_queue.drain(5)
+        response = self.client.get(status_url)
+        self.assertEqual((response.status_code, response.json()['status']), (200, 'created'))
+        self.assertTrue(StringEntry.objects.filter(value='later').exists())
+        self.assertEqual(self.client.get(f'/strings/ingest/{hash_value("never sent")}').status_code, 404)
+
+    def test_already_stored_value_is_a_conflict(self):
+        with override_settings(STRING_INGEST={'MODE': 'sync'}):
+            self.client.post('/strings', {'value': 'twice'}, format='json')
+        ingest_queue = self.use_queue()
+        self.client.post('/strings', {'value': 'twice'}, format='json')
+        ingest_queue.drain(5)
+        self.assertEqual(ingest_queue.status(hash_value('twice')), ('conflict', None))
+
+    def test_full_queue_answers_429(self):
+        self.use_queue(max_size=1)
+        with mock.patch.object(IngestQueue, '_run'): # No writer: the queue stays full
+            self.assertEqual(self.client.post('/strings', {'value': 'first'}, format='json').status_code, 202)
+            response = self.client.post('/strings', {'value': 'second'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_values_are_committed_in_batches(self):
+        ingest_queue = self.use_queue(batch_size=500, max_wait=0.5)
+        for i in range(50):
+            ingest_queue.submit(f'grouped {i}')
+        ingest_queue.drain(5)
+        self.assertEqual(StringEntry.objects.filter(value__startswith='grouped').count(), 50)
+        self.assertEqual(ingest_queue.committed, 50)
+        self.assertLessEqual(ingest_queue.batches, 2) # Not one transaction per value
+
+    def test_drain_writes_the_queue_and_refuses_new_values(self):
+        ingest_queue = self.use_queue(max_wait=0.5)
+        string_ids = [ingest_queue.submit(f'drained {i}') for i in range(10)]
+        ingest_queue.drain(5)
+        self.assertEqual([ingest_queue.status(string_id) for string_id in string_ids], [('created', None)] * 10)
+        self.assertEqual(ingest_queue.depth(), 0)
+        with self.assertRaises(IngestQueueFull):
+            ingest_queue.submit('too late')
+        self.assertEqual(self.client.post('/strings', {'value': 'too late'}, format='json').status_code, 429)
+
+
+class UploadAnalysisTests(TestCase):
+    """POST /strings/upload: chunked analyze_file() gives the same result as analyze_string()."""
+
+    TEXTS = [
+        'A man, a plan, a canal: Panama',
+        'héllo wörld 😀 ünïcode',
+        'line one\r\nline two\r\n\r\nthree',
+        'é😀é',
+        '  leading and trailing  \t',
+        'Été, ça été',
+        'x',
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def expected(self, text) -> dict:
+        result = analyze_string(text)
+        return {'id': result['id'], 'properties': result['properties']}
+
+    def analyze_as_file(self, text, chunk_size):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(text.encode('utf-8'))
+        self.addCleanup(os.unlink, f.name)
+        return analyze_file(f.name, chunk_size)
+
+    def test_chunked_analysis_matches_analyze_string(self):
+        # Chunks of 1-7 bytes split multi-byte characters (é is 2 bytes, 😀 is 4) and CRLF pairs
+        for text in self.TEXTS:
+            expected = self.expected(text)
+            for chunk_size in range(1, 8):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(self.analyze_as_file(text, chunk_size), expected)
+
+    def post(self, body, content_type='text/plain; charset=utf-8'):
+        return self.client.generic('POST', '/strings/upload', body, content_type=content_type)
+
+    def test_statuses(self):
+        response = self.post('racecar\r\nracecar'.encode('utf-8'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.expected('racecar\r\nracecar'))
+
+        self.assertEqual(self.post(b'\xff\xfe not utf-8').status_code, 400)
+        with override_settings(STRING_UPLOAD_MAX_BYTES=8, STRING_UPLOAD_CHUNK_SIZE=4):
+            self.assertEqual(self.post(b'more than eight bytes').status_code, 413)
+        self.assertEqual(self.post(b'{"value": "x"}', content_type='application/json').status_code, 415)
+        self.assertEqual(self.post(b'').status_code, 422)
+
+
+class BatchCreateTests(TestCase):
+    """POST /strings/batch: one status per item, 422 for a malformed envelope."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_item_statuses(self):
+        self.client.post('/strings', {'value': 'stored before'}, format='json')
+        response = self.client.post('/strings/batch', {'values': ['new one', 'stored before', 'new one', 42, '  ']},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual([item['status'] for item in payload['results']], [201, 409, 409, 422, 422])
+        self.assertEqual(payload['results'][0]['data']['id'], hash_value('new one'))
+        self.assertEqual((payload['created'], payload['conflicts'], payload['invalid']), (1, 2, 2))
+        self.assertEqual(StringEntry.objects.count(), 2)
+
+    def test_malformed_envelope(self):
+        for body in ({}, {'values': []}, {'values': 'not a list'}, ['a', 'b']):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post('/strings/batch', body, format='json').status_code, 422)
+
+
+class InsertRetryTests(TestCase):
+    """bulk_create_entries() retries a primary key conflict with a concurrent writer, a bounded number of times."""
+
+    def setUp(self):
+        self.checks = 0
+
+    def stale_check(self, found):
+        """existing_ids() that only reports `found(ids)` of the stored ids, as if they were stored concurrently."""
+        real_existing_ids = services.existing_ids
+
+        def existing_ids(ids):
+            self.checks += 1
+            return found(real_existing_ids(ids))
+        return mock.patch.object(services, 'existing_ids', existing_ids)
+
+    def test_retried_after_a_concurrent_insert(self):
+        bulk_create_entries(analyze_strings(['first']))
+        # The first check misses "first": its insert conflicts, the second check finds it
+        with self.stale_check(lambda stored: stored if self.checks > 1 else set()):
+            created = bulk_create_entries(analyze_strings(['first', 'second', 'third']))
+        self.assertEqual(self.checks, 2)
+        self.assertEqual([instance.value for instance in created], ['second', 'third'])
+        self.assertEqual(StringEntry.objects.count(), 3)
+
+    def test_unexplained_conflict_is_raised(self):
+        calls = []
+
+        def bulk_create(instances, **kwargs):
+            calls.append(instances)
+            raise IntegrityError('CHECK constraint failed')
+
+        with mock.patch.object(StringEntry.objects, 'bulk_create', bulk_create):
+            with self.assertRaisesMessage(IntegrityError, 'CHECK constraint failed'):
+                bulk_create_entries(analyze_strings(['first', 'second']))
+        self.assertEqual(len(calls), 1)
+
+    def test_attempts_are_bounded(self):
+        values = [f'value {i}' for i in range(5)]
+        bulk_create_entries(analyze_strings(values))
+        # Every check finds only one more of the stored strings, so every insert conflicts
+        with override_settings(STRING_INSERT_ATTEMPTS=3), self.stale_check(lambda stored: set(sorted(stored)[:1])):
+            with self.assertRaises(IntegrityError):
+                bulk_create_entries(analyze_strings(values))
+        self.assertEqual(self.checks, 3)
+
+
+class FixedPathTests(TestCase):
+    """The fixed paths under /strings/ take POST (GET for stats): stored strings with those values stay reachable."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_detail_cache().clear()
+
+    def test_stored_strings_named_like_fixed_paths(self):
+        for prefix, value in (('/strings', 'batch'), ('/strings', 'upload'), ('/async/strings', 'upload'),
+                              ('/async/strings', 'stats')):
+            with self.subTest(path=f'{prefix}/{value}'):
+                self.assertEqual(self.client.get(f'{prefix}/{value}').status_code, 404)
+                self.client.post('/strings', {'value': value}, format='json')
+                response = self.client.get(f'{prefix}/{value}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['value'], value)
+                self.assertEqual(self.client.delete(f'{prefix}/{value}').status_code, 204)
+                self.assertFalse(StringEntry.objects.filter(value=value).exists())
+
+    def test_fixed_paths_still_take_post(self):
+        response = self.client.post('/strings/batch', {'values': ['batched']}, format='json')
+        self.assertEqual(response.json()['created'], 1)
+        for path in ('/strings/upload', '/async/strings/upload'):
+            with self.subTest(path=path):
+                response = self.client.generic('POST', path, b'uploaded', content_type='text/plain')
+                self.assertEqual(response.json()['id'], hash_value('uploaded'))
+        self.assertEqual(self.client.get('/strings/stats').json()['total_count'], 1)
+
+    def test_stats_is_a_reserved_value(self):
+        self.client.post('/strings', {'value': 'stats'}, format='json')
+        # GET /strings/stats is the statistics endpoint, never the stored string
+        self.assertEqual(self.client.get('/strings/stats').json()['total_count'], 1)
+        self.assertEqual(self.client.head('/strings/stats').status_code, 200)
+        # The stored string stays reachable through the other paths and methods
+        self.assertEqual(self.client.get('/async/strings/stats').json()['value'], 'stats')
+        self.assertEqual(self.client.get('/strings/stats/similar').status_code, 200)
+        self.assertEqual(self.client.delete('/strings/stats').status_code, 204)
+        self.assertEqual(self.client.get('/strings/stats').json()['total_count'], 0)
+
+
+class CursorPaginationTests(TestCase):
+    """GET /strings keyset pages: following `next` visits every row once, in list order."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+
+    def test_cursor_round_trip(self):
+        values = [f'page item {i}' for i in range(7)]
+        for value in values:
+            self.client.post('/strings', {'value': value}, format='json')
+
+        seen, params = [], {'limit': '3'}
+        while True:
+            payload = self.client.get('/strings', params).json()
+            self.assertLessEqual(len(payload['data']), 3)
+            seen += [item['value'] for item in payload['data']]
+            if payload['next'] is None:
+                break
+            params = {'limit': '3', 'cursor': payload['next']}
+        self.assertEqual(seen, values[::-1]) # Newest first
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-base64!', 'bm90IGpzb24', 'WyJub3QgYSBkYXRlIiwgIngiXQ'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/strings', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.json())
+
+
+class StreamExportTests(TestCase):
+    """GET /strings?stream=1 (or Accept: application/x-ndjson): every matching row, one JSON line each, in list order."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+        for value in ('alpha', 'level', 'bravo charlie'):
+            self.client.post('/strings', {'value': value}, format='json')
+        self.client.post('/strings/batch', {'values': ['delta', 'racecar', 'echo foxtrot golf']}, format='json')
+
+    def streamed(self, params=None, **headers):
+        response = self.client.get('/strings', params or {}, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(body.endswith('\n'))
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_same_rows_and_order_as_the_list(self):
+        listed = self.client.get('/strings', {'limit': '100'}).json()['data']
+        self.assertEqual(len(listed), 6)
+        self.assertEqual(self.streamed({'stream': '1'}), listed)
+        self.assertEqual(self.streamed(HTTP_ACCEPT='application/x-ndjson'), listed)
+
+    def test_filters_are_applied(self):
+        for params in ({'is_palindrome': 'true'}, {'word_count_gt': '1'}, {'contains_character': 'o'}):
+            with self.subTest(params=params):
+                listed = self.client.get('/strings', {**params, 'limit': '100'}).json()['data']
+                self.assertTrue(0 < len(listed) < 6)
+                self.assertEqual(self.streamed({**params, 'stream': '1'}), listed)
+
+
+class DetailCacheTests(TestCase):
+    """Cached GET /strings/{value} payloads are dropped by the writes that change them."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_detail_cache().clear()
+
+    def test_delete_invalidates(self):
+        self.client.post('/strings', {'value': 'cached'}, format='json')
+        self.assertEqual(self.client.get('/strings/cached')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/strings/cached')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.delete('/strings/cached').status_code, 204)
+        self.assertEqual(self.client.get('/strings/cached').status_code, 404)
+
+    def test_bulk_delete_invalidates(self):
+        self.client.post('/strings/batch', {'values': ['one', 'two']}, format='json')
+        for value in ('one', 'two'):
+            self.client.get(f'/strings/{value}')
+        bulk_delete_entries(StringEntry.objects.all())
+        for value in ('one', 'two'):
+            self.assertEqual(self.client.get(f'/strings/{value}').status_code, 404)
+
+    def test_stored_again_after_delete(self):
+        self.client.post('/strings', {'value': 'again'}, format='json')
+        first = self.client.get('/strings/again').json()
+        self.client.delete('/strings/again')
+        self.client.post('/strings', {'value': 'again'}, format='json')
+        response = self.client.get('/strings/again')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response.json()['created_at'], first['created_at'])
+
+    def test_hits_cost_no_query(self):
+        self.client.post('/strings', {'value': 'hot'}, format='json')
+        self.client.get('/strings/hot')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/strings/hot')['X-Cache'], 'HIT')
+
+    def test_delete_on_another_worker(self):
+        detail_cache = DeleteCheckedCache(LRUCache(), max_staleness=0.05)
+        with mock.patch.dict(cache_module._caches, {'STRING_DETAIL_CACHE': detail_cache}):
+            for prefix, value in (('/strings', 'deleted elsewhere'), ('/async/strings', 'async deleted elsewhere')):
+                with self.subTest(prefix=prefix):
+                    self.client.post('/strings', {'value': value}, format='json')
+                    self.client.get(f'{prefix}/{value}')
+                    self.assertEqual(self.client.get(f'{prefix}/{value}')['X-Cache'], 'HIT')
+                    # The other worker's delete: the row and the bump, but not this process's entry
+                    StringEntry.objects.filter(value=value).delete()
+                    bump_write_generation(DELETE_GENERATION_KEY)
+                    time.sleep(0.06)
+                    self.assertEqual(self.client.get(f'{prefix}/{value}').status_code, 404)
+        self.assertEqual(detail_cache.stats()['stale'], 2)
+
+    def test_entries_are_stamped_before_the_database_read(self):
+        detail_cache = DeleteCheckedCache(LRUCache(), max_staleness=0)
+        self.assertIsNone(detail_cache.get('id'))
+        bump_write_generation(DELETE_GENERATION_KEY) # A delete commits while the row is read...
+        detail_cache.current_generation() # ...and another request of this process sees it
+        detail_cache.set('id', {'value': 'read before the delete'})
+        self.assertIsNone(detail_cache.get('id'))
+        # Not stamped by a lookup of this key: not cached
+        detail_cache.set('unchecked', {'value': 'unchecked'})
+        self.assertIsNone(detail_cache.get('unchecked'))
+
+    def test_deletes_bump_the_delete_generation(self):
+        self.client.post('/strings/batch', {'values': ['one', 'two', 'three']}, format='json')
+        before = write_generation(DELETE_GENERATION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/strings/one')
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_delete_entries(StringEntry.objects.all())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/strings', {'value': 'four'}, format='json')
+        self.assertEqual(write_generation(DELETE_GENERATION_KEY), before + 2)
+
+    def test_shared_cache_is_not_checked(self):
+        self.assertIsInstance(build_detail_cache({'CACHE_ALIAS': 'default'}, 'string-detail:'), SharedCache)
+        self.assertIsInstance(build_detail_cache({}, 'string-detail:'), DeleteCheckedCache)
+
+
+class ListCacheTests(TestCase):
+    """Cached GET /strings responses are keyed by the write generation, so every committed write retires them."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+
+    def listed(self):
+        response = self.client.get('/strings', {'length_gt': '2'})
+        return response['X-Cache'], sorted(item['value'] for item in response.json()['data'])
+
+    def test_writes_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/strings', {'value': 'first'}, format='json')
+        self.assertEqual(self.listed(), ('MISS', ['first']))
+        self.assertEqual(self.listed(), ('HIT', ['first']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/strings/batch', {'values': ['second', 'third']}, format='json')
+        self.assertEqual(self.listed(), ('MISS', ['first', 'second', 'third']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/strings/second')
+        self.assertEqual(self.listed(), ('MISS', ['first', 'third']))
+        self.assertEqual(self.listed(), ('HIT', ['first', 'third']))
+
+    def test_generation_is_shared_through_the_database(self):
+        # What another worker sees: the row bumped by this one's write
+        before = write_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/strings', {'value': 'bump'}, format='json')
+        self.assertEqual(WriteGeneration.objects.get(pk=WriteGeneration.SINGLETON_ID).value, before + 1)
+
+    def test_unshared_generation_cache_fails_the_checks(self):
+        for backend in ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache'):
+            with self.subTest(backend=backend), override_settings(
+                    CACHES={'default': {'BACKEND': backend}},
+                    STRING_LIST_CACHE={'GENERATION_CACHE_ALIAS': 'default'}):
+                self.assertEqual([error.id for error in check_generation_cache(None)], ['analyzer_app.E002'])
+
+
+class CharacterFilterTests(TestCase):
+    """?contains_character= (with ?min_count=) and the NL letter filter, answered from CharacterIndex."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+        self.client.post('/strings/batch', {'values': ['Zebra', 'fizz', 'buzzz', 'apple', 'banana', 'ab1']},
+                         format='json')
+
+    def listed(self, **params):
+        response = self.client.get('/strings', {**params, 'limit': '100'})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['value'] for item in response.json()['data'])
+
+    def test_contains_character(self):
+        self.assertEqual(self.listed(contains_character='z'), ['buzzz', 'fizz'])
+        self.assertEqual(self.listed(contains_character='Z'), ['Zebra'])
+        self.assertEqual(self.listed(contains_character='1'), ['ab1'])
+        self.assertEqual(self.listed(contains_character='q'), [])
+
+    def test_min_count(self):
+        self.assertEqual(self.listed(contains_character='z', min_count='2'), ['buzzz', 'fizz'])
+        self.assertEqual(self.listed(contains_character='z', min_count='3'), ['buzzz'])
+        self.assertEqual(self.listed(contains_character='a', min_count='3'), ['banana'])
+        # Anything but a positive integer means 1
+        for min_count in ('0', '-2', 'many'):
+            with self.subTest(min_count=min_count):
+                self.assertEqual(self.listed(contains_character='p', min_count=min_count), ['apple'])
+
+    def test_natural_language_letter(self):
+        for query in ('strings containing the letter z', 'contains character Z'):
+            with self.subTest(query=query):
+                self.assertEqual(self.listed(natural_language_filter=query), ['Zebra', 'buzzz', 'fizz'])
+        self.assertEqual(self.listed(natural_language_filter='containing the letter 1'), ['ab1'])
+
+    def test_index_rows_removed_with_the_string(self):
+        self.client.delete('/strings/fizz')
+        bulk_delete_entries(StringEntry.objects.filter(value='buzzz'))
+        for string_id in (hash_value('fizz'), hash_value('buzzz')):
+            self.assertFalse(CharacterIndex.objects.filter(entry_id=string_id).exists())
+        self.assertEqual(self.listed(contains_character='z'), [])
+        self.assertEqual(CharacterIndex.objects.filter(entry_id=hash_value('banana')).count(), 3)
+
+
+class TrigramIndexTests(TestCase):
+    """TrigramIndex rows are only written where substring searches read them."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_rows_written_without_pg_trgm(self):
+        self.client.post('/strings', {'value': 'trigrams'}, format='json')
+        self.assertTrue(TrigramIndex.objects.filter(entry_id=hash_value('trigrams')).exists())
+
+    def test_not_maintained_with_pg_trgm(self):
+        with mock.patch('analyzer_app.services.pg_trgm_available', return_value=True):
+            self.client.post('/strings', {'value': 'no trigrams'}, format='json')
+            self.client.post('/strings/batch', {'values': ['none here either']}, format='json')
+        self.assertFalse(TrigramIndex.objects.exists())
+
+
+class AnalyzerTests(TestCase):
+    """analyze_string() and analyze_strings() give exactly the result of the legacy multi-pass implementation."""
+
+    CASES = [
+        '', ' ', '   \t\n ', 'a', 'ab', 'Aa',
+        'A man, a plan, a canal: Panama!', 'No lemon, no melon', 'Was it a car or a cat I saw?',
+        'Able was I ere I saw Elba' * 3, 'racecar' + 'x' * 40 + 'RACECAR', 'not a palindrome at all',
+        '.,!?', '12321', '1a2b2A1', 'abcdefghij!jihgfedcbA', 'abcdefghijk jihgfedcbz',
+        'été', 'ÀbA', 'Straße', '日本語 本日', '😀a😀', 'a\u2028a', 'Ⅻ x Ⅻ',
+    ]
+
+    def assert_same_as_legacy(self, value, result):
+        expected = legacy_analyze_string(value)
+        self.assertEqual(result, expected)
+        # JSON key order of the frequency map is part of the stored result
+        self.assertEqual(list(result['properties']['character_frequency_map']),
+                         list(expected['properties']['character_frequency_map']))
+
+    def test_matches_legacy(self):
+        for value in self.CASES:
+            with self.subTest(value=value):
+                self.assert_same_as_legacy(value, analyze_string(value))
+
+    def test_palindromes(self):
+        for value, expected in (('A man, a plan, a canal: Panama!', True), ('Was it a car or a cat I saw?', True),
+                                ('abcdefghij!jihgfedcbA', True), ('abcdefghijk jihgfedcbz', False),
+                                ('été', True), ('   ', True), ('ab', False)):
+            with self.subTest(value=value):
+                self.assertIs(analyze_string(value)['properties']['is_palindrome'], expected)
+
+    def test_whitespace_only(self):
+        properties = analyze_string(' \t\n ')['properties']
+        self.assertEqual((properties['length'], properties['word_count'], properties['unique_characters']), (4, 0, 3))
+        self.assertEqual(properties['character_frequency_map'], {' ': 2, '\t': 1, '\n': 1})
+
+    def test_batch_matches_single(self):
+        values = self.CASES + ['racecar', 'Straße', '', 'racecar']
+        results = analyze_strings(values)
+        self.assertEqual(len(results), len(values))
+        for value, result in zip(values, results):
+            with self.subTest(value=value):
+                self.assert_same_as_legacy(value, result)
+
+    def test_batch_in_worker_processes(self):
+        values = ['one', 'two', 'one', 'Taco cat', 'three', 'two', 'é']
+        with mock.patch('analyzer_app.utils.BATCH_CHUNK_SIZE', 2):
+            results = analyze_strings(values, workers=2)
+        self.assertEqual(results, [legacy_analyze_string(value) for value in values])
+
+
+class SerializeRowTests(TestCase):
+    """serialize_row() (the fast read path) builds exactly StringEntrySerializer's representation."""
+
+    def setUp(self):
+        for value in ('plain', 'Taco cat', 'ünïcödé 日本', '  spaced  out  '):
+            entry_from_analysis(analyze_string(value)).save()
+        # isoformat() leaves out a zero microsecond part: check that case too
+        StringEntry.objects.filter(pk=hash_value('plain')).update(created_at=datetime.datetime(
+            2024, 2, 29, 23, 59, 59, tzinfo=datetime.timezone.utc))
+
+    def assert_same_representation(self):
+        for entry in StringEntry.objects.all():
+            row = StringEntry.objects.filter(pk=entry.pk).values_list(*ENTRY_FIELDS).get()
+            with self.subTest(value=entry.value):
+                self.assertEqual(serialize_row(row), StringEntrySerializer(entry).data)
+                self.assertEqual(serialize_rows([row]), [StringEntrySerializer(entry).data])
+
+    def plain_created_at(self):
+        return serialize_row(StringEntry.objects.filter(pk=hash_value('plain'))
+                             .values_list(*ENTRY_FIELDS).get())['created_at']
+
+    def test_default_settings(self):
+        self.assert_same_representation()
+        self.assertEqual(self.plain_created_at(), '2024-02-29T23:59:59Z')
+
+    def test_other_time_zone_and_format(self):
+        with override_settings(TIME_ZONE='Europe/Paris'):
+            self.assert_same_representation()
+            self.assertEqual(self.plain_created_at(), '2024-03-01T00:59:59+01:00')
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DATETIME_FORMAT': '%Y-%m-%d %H:%M'}):
+            self.assert_same_representation()
+            self.assertEqual(self.plain_created_at(), '2024-02-29 23:59')
+
+
+class SubstringSearchTests(TestCase):
+    """?contains= and ?startswith=: case-insensitive, whatever the term length or characters."""
+
+    VALUES = ['Hello World', 'hello there', 'say HELLO', 'yellow', '50% off_sale', '50 percent off', 'a_b', 'axb']
+
+    def setUp(self):
+        self.client = APIClient()
+        get_list_cache().clear()
+        self.client.post('/strings/batch', {'values': self.VALUES}, format='json')
+
+    def listed(self, **params):
+        response = self.client.get('/strings', {**params, 'limit': '100'})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['value'] for item in response.json()['data'])
+
+    def expected(self, term, prefix=False):
+        matches = (lambda value: value.lower().startswith(term.lower())) if prefix else \
+            (lambda value: term.lower() in value.lower())
+        return sorted(value for value in self.VALUES if matches(value))
+
+    def test_results(self):
+        for term in ('hello', 'HeLLo', 'ello', 'llo w', 'o', 'lo', 'EL', '%', '50%', '% off', '_', 'a_b', '_sale',
+                     'x', 'not there', 'hello world!'):
+            for param, prefix in (('contains', False), ('startswith', True)):
+                with self.subTest(param=param, term=term):
+                    self.assertEqual(self.listed(**{param: term}), self.expected(term, prefix))
+
+    def test_wildcards_are_literal(self):
+        self.assertEqual(self.listed(contains='a_b'), ['a_b'])
+        self.assertEqual(self.listed(startswith='50%'), ['50% off_sale'])
+        self.assertEqual(self.listed(contains='%'), ['50% off_sale'])
+
+    def test_index_rows_removed_with_the_string(self):
+        self.client.delete('/strings/yellow')
+        bulk_delete_entries(StringEntry.objects.filter(value__startswith='50'))
+        for value in ('yellow', '50% off_sale', '50 percent off'):
+            self.assertFalse(TrigramIndex.objects.filter(entry_id=hash_value(value)).exists())
+        self.assertEqual(self.listed(contains='llo'), ['Hello World', 'hello there', 'say HELLO'])
+        self.assertEqual(self.listed(contains='off'), [])
+
+
+class SimilarStringsTests(TestCase):
+    """GET /strings/{value}/similar: LSH candidates ranked by character-distribution similarity."""
+
+    def setUp(self):
+        self.client = APIClient()
+        values = ['listen', 'silent', 'enlist', 'tinsel', 'listens', 'list', 'banana', 'xylophone']
+        self.client.post('/strings/batch', {'values': values}, format='json')
+
+    def similar(self, value, **params):
+        response = self.client.get(f'/strings/{value}/similar', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranked_by_similarity_without_the_value_itself(self):
+        payload = self.similar('listen')
+        values = [item['value'] for item in payload['data']]
+        similarities = [item['similarity'] for item in payload['data']]
+        self.assertNotIn('listen', values)
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+        # Anagrams have the same distribution, and rank before a near match
+        self.assertEqual(set(values[:3]), {'silent', 'enlist', 'tinsel'})
+        self.assertEqual(similarities[:3], [1.0, 1.0, 1.0])
+        self.assertEqual(values[3], 'listens')
+
+    def test_k_is_capped(self):
+        self.assertEqual(len(self.similar('listen', k='2')['data']), 2)
+        self.assertEqual(self.similar('listen', k='not a number')['k'], 10)
+        with override_settings(STRING_SIMILAR_MAX_K=3):
+            payload = self.similar('listen', k='50')
+        self.assertEqual((payload['k'], len(payload['data'])), (3, 3))
+
+    def test_unknown_value(self):
+        response = self.client.get('/strings/never stored/similar')
+        self.assertEqual(response.status_code, 404)
+
+    def test_lsh_bands_are_stable(self):
+        # Stored in LSHBucket: a change here silently breaks the buckets of existing rows
+        frequency_map = analyze_string('hello world')['properties']['character_frequency_map']
+        self.assertEqual(lsh_bands(frequency_map), [
+            1688117868254096761, 1688119868250096715, 1345075229179837139, 1615798398726333318,
+            709687438222899243, 709689438218899197, 709691438214899151, 709693438210899105,
+            854073392618795759, 1270842731472391972, 1107300415687320364, 522159887235274258,
+            1999758817389429599, 278369086108283317, 278371086104283271, 278373086100283225,
+        ])
+        self.assertEqual(minhash_signature({'a': 1})[:2], (498421018090085648232, 479974274016376096616))
+        self.assertEqual((minhash_signature({}), lsh_bands({})), ((), []))
+        self.assertEqual(analyze_string('hello world')['lsh_bands'], lsh_bands(frequency_map))
+        stored = LSHBucket.objects.filter(entry_id=hash_value('banana')).order_by('band')
+        self.assertEqual(list(stored.values_list('bucket', flat=True)),
+                         lsh_bands(analyze_string('banana')['properties']['character_frequency_map']))
+
+
+class RequestMetricsTests(TestCase):
+    """Server-Timing header on every response, and the histograms served at /metrics."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_detail_cache().clear()
+
+    def server_timing(self, response) -> dict:
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_server_timing(self):
+        self.client.post('/strings', {'value': 'timed'}, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/strings/timed')
+        timing = self.server_timing(response)
+        self.assertEqual(list(timing), ['db', 'analyze', 'serialize', 'render', 'view', 'total', 'size'])
+        self.assertEqual(timing['db']['desc'], f'"{len(queries)} queries"')
+        self.assertEqual(timing['size'], {'desc': f'"{len(response.content)} bytes"'})
+        durations = {name: float(params['dur']) for name, params in timing.items() if 'dur' in params}
+        self.assertLessEqual(durations['view'] + durations['render'], durations['total'] + 0.01)
+
+    def test_no_size_for_streamed_responses(self):
+        timing = self.server_timing(self.client.get('/strings', {'stream': '1'}))
+        self.assertNotIn('size', timing)
+        self.assertIn('view', timing)
+
+    def test_header_can_be_turned_off(self):
+        with override_settings(SERVER_TIMING_HEADER=False):
+            self.assertFalse(self.client.get('/strings').has_header('Server-Timing'))
+
+    def test_metrics_endpoint(self):
+        def series_count(text, line_start):
+            return next((int(line.rsplit(' ', 1)[1]) for line in text.splitlines() if line.startswith(line_start)), 0)
+
+        count_line = 'http_response_size_bytes_count{route="strings/<str:string_value>",method="GET"}'
+        before = series_count(self.client.get('/metrics').content.decode(), count_line)
+        self.client.get('/strings/not stored')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertEqual(series_count(text, count_line), before + 1)
+        for line_start in ('# TYPE http_request_duration_seconds histogram',
+                           'http_request_duration_seconds_bucket{route="strings/<str:string_value>",method="GET",'
+                           'status="404",le="+Inf"}',
+                           'http_request_phase_duration_seconds_count{route="strings/<str:string_value>",'
+                           'method="GET",phase="view"}',
+                           'http_request_db_queries_count{route="strings/<str:string_value>",method="GET"}',
+                           'string_cache_hits_total{cache="detail"}'):
+            with self.subTest(line=line_start):
+                self.assertTrue(any(line.startswith(line_start) for line in text.splitlines()))
+
+
+class PrimaryKeyLookupTests(TestCase):
+    """StringDetailView.get_object() finds a string by its primary key, the SHA-256 of the value."""
+
+    def test_lookup_by_hash(self):
+        self.client.post('/strings', {'value': 'keyed'}, format='json')
+        view = StringDetailView()
+        with CaptureQueriesContext(connection) as queries:
+            entry = view.get_object(hash_value('keyed'))
+        self.assertEqual((entry.pk, entry.value), (hash_value('keyed'), 'keyed'))
+        self.assertEqual(len(queries), 1)
+        self.assertIn(f'''WHERE "analyzer_app_stringentry"."id" = '{hash_value("keyed")}\'''', queries[0]['sql'])
+        with self.assertRaises(NotFound):
+            view.get_object(hash_value('not stored'))
+        with self.assertRaises(NotFound):
+            view.get_object('keyed') # The value itself is not a key
+
+
+class FoldSha256HashMigrationTests(TransactionTestCase):
+    """0003 re-keys rows whose id is not the SHA-256 of their value, keeping every other column."""
+
+    migrate_from = ('analyzer_app', '0002_stringentry_indexes')
+    migrate_to = ('analyzer_app', '0003_fold_sha256_hash_into_pk')
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target])
+        return executor.loader.project_state(target).apps
+
+    def setUp(self):
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes('analyzer_app')[0]
+        self.addCleanup(self.migrate, latest)
+        self.apps = self.migrate(self.migrate_from)
+
+    def test_rows_are_rekeyed(self):
+        StringEntry = self.apps.get_model('analyzer_app', 'StringEntry')
+        created_at = datetime.datetime(2023, 5, 17, 8, 30, tzinfo=datetime.timezone.utc)
+        for string_id, value in (('legacy-id', 'legacy value'), (hash_value('current'), 'current')):
+            properties = analyze_string(value)['properties']
+            StringEntry.objects.create(
+                id=string_id, value=value, length=properties['length'], is_palindrome=properties['is_palindrome'],
+                unique_characters=properties['unique_characters'], word_count=properties['word_count'],
+                sha256_hash=properties['sha256_hash'], character_frequency_map=properties['character_frequency_map'],
+            )
+        StringEntry.objects.update(created_at=created_at) # auto_now_add: set afterwards
+
+        StringEntry = self.migrate(self.migrate_to).get_model('analyzer_app', 'StringEntry')
+        rows = dict(StringEntry.objects.values_list('value', 'id'))
+        self.assertEqual(rows, {'legacy value': hash_value('legacy value'), 'current': hash_value('current')})
+        self.assertEqual(set(StringEntry.objects.values_list('created_at', flat=True)), {created_at})
+        entry = StringEntry.objects.get(pk=hash_value('legacy value'))
+        self.assertEqual((entry.length, entry.word_count), (12, 2))
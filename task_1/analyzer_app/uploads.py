@@ -0,0 +1,73 @@
+# analyzer_app/uploads.py
+
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.conf import settings
+
+from .utils import analyze_file
+
+
+class UploadTooLarge(Exception):
+    """The request body is larger than settings.STRING_UPLOAD_MAX_BYTES."""
+
+
+def spool_body(read) -> tuple:
+    """
+    Copies a request body to a temporary file in fixed-size chunks.
+    `read(n)` is the request's read method. Returns (path, size); the caller
+    deletes the file. Raises UploadTooLarge past STRING_UPLOAD_MAX_BYTES.
+    """
+    chunk_size = getattr(settings, 'STRING_UPLOAD_CHUNK_SIZE', 1 << 20)
+    max_bytes = getattr(settings, 'STRING_UPLOAD_MAX_BYTES', 512 << 20)
+    size = 0
+    with tempfile.NamedTemporaryFile(prefix='string-upload-', delete=False) as spool:
+        try:
+            while True:
+                chunk = read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge
+                spool.write(chunk)
+        except BaseException:
+            os.unlink(spool.name)
+            raise
+    return spool.name, size
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: never fork a web worker that holds threads and DB connections
+                _pool = ProcessPoolExecutor(max_workers=getattr(settings, 'STRING_UPLOAD_WORKERS', 2),
+                                            mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def submit_analysis(path: str, size: int) -> Future:
+    """
+    Runs analyze_file() on a spooled upload. Large files go to the upload
+    process pool so the web worker's CPU (and GIL) stays free; small ones are
+    analyzed inline, where the pool round trip would cost more than the work.
+    """
+    chunk_size = getattr(settings, 'STRING_UPLOAD_CHUNK_SIZE', 1 << 20)
+    if size > getattr(settings, 'STRING_UPLOAD_INLINE_BYTES', 1 << 20):
+        return _get_pool().submit(analyze_file, path, chunk_size)
+
+    future = Future()
+    try:
+        future.set_result(analyze_file(path, chunk_size))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
@@ -1,12 +1,64 @@
 # analyzer_app/urls.py (CRITICAL: Change order of paths)
+import asyncio
+
 from django.urls import path
-from .views import StringListCreateView, StringDetailView
+from .views import (
+    StringListCreateView, StringBatchCreateView, StringDetailView, StringIngestStatusView, StringSimilarView,
+    StringStatsView, StringUploadView,
+)
+
+
+def method_dispatch(value, detail_view, **handlers):
+    """
+    View for a fixed path inside the /strings/{value} namespace: the methods in
+    `handlers` (e.g. POST=...) go to the fixed endpoint, every other method to
+    `detail_view` for the stored string `value`. So GET and DELETE /strings/batch
+    still reach the string "batch". Async when `detail_view` is.
+    """
+    if asyncio.iscoroutinefunction(detail_view):
+        async def view(request, *args, **kwargs):
+            handler = handlers.get(request.method)
+            if handler is None:
+                return await detail_view(request, string_value=value)
+            return await handler(request, *args, **kwargs)
+    else:
+        def view(request, *args, **kwargs):
+            handler = handlers.get(request.method)
+            if handler is None:
+                return detail_view(request, string_value=value)
+            return handler(request, *args, **kwargs)
+    # Like the views it forwards to. Set directly: in Django 4.2 the csrf_exempt
+    # decorator would hide the coroutine
+    view.csrf_exempt = True
+    return view
+
 
 urlpatterns = [
+    # 0. FIXED PATHS BEFORE THE DETAIL VIEW: otherwise 'batch' is treated as a {value}.
+    #    They only take POST, which /strings/{value} has no use for; other methods
+    #    still reach the stored strings "batch" and "upload"
+    # This handles POST /strings/batch
+    path('batch', method_dispatch('batch', StringDetailView.as_view(), POST=StringBatchCreateView.as_view()),
+         name='string-batch-create'),
+    # This handles POST /strings/upload (large text/plain documents)
+    path('upload', method_dispatch('upload', StringDetailView.as_view(), POST=StringUploadView.as_view()),
+         name='string-upload'),
+    # This handles GET /strings/stats (aggregate statistics). "stats" is a reserved
+    # value: GET /strings/stats never returns the stored string "stats" (DELETE still
+    # reaches it, and so does GET /strings/stats/similar)
+    path('stats', method_dispatch('stats', StringDetailView.as_view(), GET=StringStatsView.as_view(),
+                                  HEAD=StringStatsView.as_view()),
+         name='string-stats'),
+    # This handles /strings/ingest/{id} (status of a write-behind POST; values cannot contain '/')
+    path('ingest/<str:string_id>', StringIngestStatusView.as_view(), name='string-ingest-status'),
+
+    # This handles /strings/{value}/similar
+    path('<str:string_value>/similar', StringSimilarView.as_view(), name='string-similar'),
+
     # 1. DETAIL VIEW FIRST: This is more specific and must be checked first
     # This handles /strings/{value}
     path('<str:string_value>', StringDetailView.as_view(), name='string-detail'), 
     
     # 2. LIST VIEW SECOND: This handles the base path /strings or /strings/
     path('', StringListCreateView.as_view(), name='string-list-create'), 
-]
\ No newline at end of file
+]
@@ -1,33 +1,178 @@
 # analyzer_app/utils.py (FINAL FIX)
 
+import codecs
+import functools
 import hashlib
+import mmap
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import re
-from datetime import datetime
 
+from .metrics import timed
+
+def hash_value(value: str) -> str:
+    """
+    SHA-256 hex digest of a string value. This is also the StringEntry primary key.
+    """
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+# Characters that take part in the palindrome check (everything else is skipped)
+PALINDROME_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+NON_PALINDROME_CHARS_RE = re.compile(r'[^a-zA-Z0-9]')
+
+# Number of character pairs the two-pointer scan compares before handing over
+# to the C-level check below (keeps long real palindromes fast)
+PALINDROME_SCAN_STEPS = 8
+
+
+def is_palindrome_value(value: str) -> bool:
+    """
+    Case-insensitive palindrome check over the ASCII letters and digits of `value`.
+    """
+    # a. Two-pointer scan from both ends, skipping non-alphanumerics.
+    #    Most strings are not palindromes and fail within the first few pairs,
+    #    without building any intermediate string.
+    left, right = 0, len(value) - 1
+    steps = 0
+    while left < right:
+        if steps == PALINDROME_SCAN_STEPS:
+            break
+        a = value[left]
+        if a not in PALINDROME_CHARS:
+            left += 1
+            continue
+        b = value[right]
+        if b not in PALINDROME_CHARS:
+            right -= 1
+            continue
+        if a != b and a.lower() != b.lower():
+            return False
+        left += 1
+        right -= 1
+        steps += 1
+    else:
+        return True
+
+    # b. Long candidate: finish the middle part with C-level regex/slicing,
+    #    which beats a Python loop by far on multi-megabyte palindromes
+    cleaned_string = NON_PALINDROME_CHARS_RE.sub('', value[left:right + 1]).lower()
+    return cleaned_string == cleaned_string[::-1]
+
+
+# ----------------------------------------------
+# MinHash / LSH over the character distribution
+# ----------------------------------------------
+# A string is reduced to a set of (character, level) tokens, one per power of two
+# up to the character's count ("a" x5 -> a1, a2, a4). The Jaccard similarity of two
+# token sets then follows their character distributions on a log scale.
+# Signatures use one-permutation MinHash: every token is hashed once, the hash
+# picks one of MINHASH_BINS bins and each bin keeps its minimum. The signature is
+# cut into LSH_BANDS bands, and strings that share a band bucket become candidates
+# for GET /strings/{value}/similar.
+
+MINHASH_BINS = 32
+LSH_BANDS = 16 # 2 signature bins per band
+_EMPTY_BIN = 1 << 64
+_BAND_KEY_MULTIPLIER = 1_000_003
+_BAND_KEY_MODULUS = (1 << 61) - 1 # Keys fit a signed 64-bit column
+
+
+@functools.lru_cache(maxsize=65536)
+def _character_bins(character: str, levels: int) -> tuple:
+    # (bin, value) of each token of one character. Inputs come from a small
+    # alphabet, so the hashing is done once per (character, level count)
+    bins = []
+    for level in range(levels):
+        token = f'{character}{1 << level}'.encode('utf-8')
+        h = int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), 'big')
+        bins.append((h % MINHASH_BINS, h // MINHASH_BINS))
+    return tuple(bins)
+
+
+def distribution_tokens(character_frequency_map: dict):
+    for character, count in character_frequency_map.items():
+        for level in range(count.bit_length()):
+            yield f'{character}{1 << level}'
+
+
+def minhash_signature(character_frequency_map: dict) -> tuple:
+    """
+    MINHASH_BINS minimum hashes of the distribution tokens (empty for an empty map).
+    """
+    signature = [_EMPTY_BIN] * MINHASH_BINS
+    for character, count in character_frequency_map.items():
+        for index, value in _character_bins(character, count.bit_length()):
+            if value < signature[index]:
+                signature[index] = value
+    if min(signature) == _EMPTY_BIN:
+        return ()
+    if max(signature) != _EMPTY_BIN:
+        return tuple(signature)
+
+    # Densification: an empty bin borrows the next non-empty bin to its right
+    # (circularly), offset by the distance so borrowed values stay distinguishable
+    filled = list(signature)
+    source_value = source_index = None
+    for index in range(2 * MINHASH_BINS - 1, -1, -1):
+        value = signature[index % MINHASH_BINS]
+        if value != _EMPTY_BIN:
+            source_value, source_index = value, index
+        elif index < MINHASH_BINS:
+            filled[index] = source_value + (source_index - index) * _EMPTY_BIN
+    return tuple(filled)
+
+
+def lsh_bands(character_frequency_map: dict) -> list:
+    """
+    One bucket key per LSH band. Keys are plain arithmetic on the signature,
+    so they are stable across processes and Python versions (they are stored).
+    """
+    signature = minhash_signature(character_frequency_map)
+    if not signature:
+        return []
+    rows = MINHASH_BINS // LSH_BANDS
+    keys = []
+    for start in range(0, MINHASH_BINS, rows):
+        key = start
+        for value in signature[start:start + rows]:
+            key = (key * _BAND_KEY_MULTIPLIER + value) % _BAND_KEY_MODULUS
+        keys.append(key)
+    return keys
+
+
+def distribution_similarity(a: dict, b: dict) -> float:
+    """
+    Exact weighted Jaccard similarity of two character frequency maps:
+    sum of the per-character minimum counts over the sum of the maximums.
+    """
+    shared = sum(min(count, b[character]) for character, count in a.items() if character in b)
+    total = sum(a.values()) + sum(b.values()) - shared
+    return shared / total if total else 1.0
+
+
+@timed('analyze')
 def analyze_string(value: str) -> dict:
     """
     Computes all required properties for a given string value.
+    The frequency map is built in a single pass and the other properties are
+    derived from it where possible.
     """
     
     # 1. SHA-256 Hash
-    sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    sha256_hash = hash_value(value)
 
     # 2. Length (counts all characters, including spaces and punctuation)
     length = len(value)
 
-    
-    # a. Remove non-alphanumeric characters and convert to lowercase
-    cleaned_string = re.sub(r'[^a-zA-Z0-9]', '', value).lower()
-    
-    # b. Check if the cleaned string equals its reverse
-    is_palindrome = cleaned_string == cleaned_string[::-1]
+    # 3. Palindrome (early-exit two-pointer scan, no cleaned/reversed copies)
+    is_palindrome = is_palindrome_value(value)
 
     # 4. Character Frequency Map (counts ALL characters, including spaces)
     character_frequency_map = dict(Counter(value)) # dict() is required for JSONField
 
-    # 5. Unique Characters (count of distinct characters, includes spaces/punc)
-    unique_characters = len(set(value))
+    # 5. Unique Characters: the number of keys in the map (no separate set() pass)
+    unique_characters = len(character_frequency_map)
 
     # 6. Word Count (uses standard split, collapsing multiple spaces)
     word_count = len(value.split())
@@ -42,9 +187,137 @@ def analyze_string(value: str) -> dict:
         "character_frequency_map": character_frequency_map,
     }
 
-    # Return the hash (for the primary key) and the properties
+    # Return the hash (for the primary key), the properties and the LSH buckets
+    # used by the similarity index (not part of the API representation)
     return {
         "id": sha256_hash,
         "value": value,
         "properties": properties,
-    }
\ No newline at end of file
+        "lsh_bands": lsh_bands(character_frequency_map),
+    }
+
+
+# Strings per task when analyze_strings() fans out to worker processes
+BATCH_CHUNK_SIZE = 5000
+
+
+def _analyze_chunk(values) -> list:
+    return [analyze_string(value) for value in values]
+
+
+@timed('analyze')
+def analyze_strings(values, workers=None) -> list:
+    """
+    Batch version of analyze_string(): returns one result per value, identical
+    to calling analyze_string() on each item.
+    Repeated values are analyzed once. With `workers` > 1, large batches are
+    split into chunks and analyzed in a process pool (for backfills/bulk loads).
+    """
+    values = list(values)
+    distinct = list(dict.fromkeys(values))
+
+    if workers and workers > 1 and len(distinct) > BATCH_CHUNK_SIZE:
+        chunks = [distinct[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(distinct), BATCH_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            analyzed = [result for chunk in pool.map(_analyze_chunk, chunks) for result in chunk]
+    else:
+        analyzed = _analyze_chunk(distinct)
+
+    if len(distinct) == len(values):
+        return analyzed
+    by_value = dict(zip(distinct, analyzed))
+    return [by_value[value] for value in values]
+
+
+# ----------------------------------------------
+# Streaming analysis of large uploads
+# ----------------------------------------------
+# analyze_file() reads a spooled upload in fixed-size chunks, so memory stays
+# constant whatever the document size. UTF-8 never encodes a non-ASCII character
+# with ASCII bytes, so the palindrome check can run on the raw bytes.
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+NON_PALINDROME_BYTES = bytes(b for b in range(256) if chr(b) not in PALINDROME_CHARS)
+
+
+def _cleaned_blocks(buffer, block_size, reverse=False):
+    # Lower-cased ASCII letters and digits of `buffer`, block by block, from either end
+    if reverse:
+        for end in range(len(buffer), 0, -block_size):
+            yield buffer[max(0, end - block_size):end].translate(None, NON_PALINDROME_BYTES).lower()[::-1]
+    else:
+        for start in range(0, len(buffer), block_size):
+            yield buffer[start:start + block_size].translate(None, NON_PALINDROME_BYTES).lower()
+
+
+def is_palindrome_buffer(buffer, cleaned_length: int, block_size: int = UPLOAD_CHUNK_SIZE) -> bool:
+    """
+    is_palindrome_value() for a UTF-8 buffer (e.g. an mmap): compares cleaned
+    blocks read from the front and from the back until the two meet.
+    `cleaned_length` is the number of ASCII letters and digits in the buffer.
+    """
+    front = _cleaned_blocks(buffer, block_size)
+    back = _cleaned_blocks(buffer, block_size, reverse=True)
+    head = tail = b''
+    remaining = cleaned_length // 2
+    while remaining:
+        if not head:
+            head = next(front)
+        if not tail:
+            tail = next(back)
+        n = min(len(head), len(tail), remaining)
+        if head[:n] != tail[:n]:
+            return False
+        head, tail, remaining = head[n:], tail[n:], remaining - n
+    return True
+
+
+def analyze_file(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> dict:
+    """
+    analyze_string() for a UTF-8 text file, with constant memory.
+    Returns the same "id" and "properties" (the value itself is not returned).
+    Raises UnicodeDecodeError if the file is not valid UTF-8.
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    frequencies = Counter()
+    length = word_count = cleaned_length = 0
+    in_word = False
+
+    with open(path, 'rb') as f:
+        # 1. One pass over the chunks: hash, frequencies, length and words
+        while True:
+            raw = f.read(chunk_size)
+            text = decoder.decode(raw, final=not raw)
+            if text:
+                length += len(text)
+                frequencies.update(text)
+                word_count += len(text.split())
+                if in_word and not text[0].isspace():
+                    word_count -= 1 # The first word continues the last one of the previous chunk
+                in_word = not text[-1].isspace()
+            if not raw:
+                break
+            digest.update(raw)
+            cleaned_length += len(raw.translate(None, NON_PALINDROME_BYTES))
+
+        # 2. Palindrome: two-pointer scan over the memory-mapped file
+        if cleaned_length < 2:
+            is_palindrome = True
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                is_palindrome = is_palindrome_buffer(buffer, cleaned_length, chunk_size)
+
+    sha256_hash = digest.hexdigest()
+    character_frequency_map = dict(frequencies)
+    return {
+        "id": sha256_hash,
+        "properties": {
+            "length": length,
+            "is_palindrome": is_palindrome,
+            "unique_characters": len(character_frequency_map),
+            "word_count": word_count,
+            "sha256_hash": sha256_hash,
+            "character_frequency_map": character_frequency_map,
+        },
+    }
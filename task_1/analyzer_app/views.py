@@ -1,20 +1,189 @@
 from rest_framework.views import APIView
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, UnsupportedMediaType
+from django.conf import settings
 from django.db.utils import IntegrityError
-from .models import StringEntry
-from .serializers import StringInputSerializer, StringEntrySerializer
-from .utils import analyze_string
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from .models import CharacterIndex, StringEntry
+from .serializers import (
+    ENTRY_FIELDS, StringInputSerializer, StringBatchInputSerializer, StringEntrySerializer,
+    created_at_formatter, serialize_row, serialize_rows, validate_batch_item,
+)
+from .pagination import LIST_ORDERING, paginate, parse_limit
+from .renderers import NDJSONRenderer, encode_ndjson_line
+from .bloom import definitely_missing
+from .cache import (
+    detail_cache_headers, etag_matches, get_detail_cache, get_list_cache, list_cache_headers, list_cache_key,
+    write_generation,
+)
+from .search import filter_statistics, filter_value, plan_hint, range_fraction, similar_entries
+from .uploads import UploadTooLarge, spool_body, submit_analysis
+from .stats import CHARACTER, PALINDROMES, TOTAL, stats_payload
+from .services import create_entry, delete_entry, bulk_create_entries
+from .ingest import CREATED, PENDING, IngestQueueFull, get_ingest_queue, ingest_enabled
+from .utils import analyze_string, analyze_strings, hash_value, lsh_bands
+import os
 import re 
 from django.db.models import Q 
 
 
+# "containing the letter z", "contains character 7", ...
+NL_CONTAINS_LETTER_RE = re.compile(r'contain(?:s|ing)?\s+(?:the\s+)?(?:letter|character)\s+(\S)(?!\S)')
+
+
+def characters_subquery(characters, min_count=1):
+    """Ids of strings containing any of `characters` at least `min_count` times (index-backed)."""
+    return CharacterIndex.objects.filter(character__in=characters, count__gte=min_count).values('entry_id')
+
+
+def enqueue_ingest(string_value):
+    """
+    Write-behind POST /strings: queues the value and returns (data, status code,
+    headers) for a 202 pointing at the status endpoint, or a 429 when the queue is full.
+    """
+    try:
+        string_id = get_ingest_queue().submit(string_value)
+    except IngestQueueFull:
+        return {'error': 'Ingest queue is full, retry later'}, status.HTTP_429_TOO_MANY_REQUESTS, {'Retry-After': '1'}
+    status_url = f'/strings/ingest/{string_id}'
+    return ({'id': string_id, 'status': PENDING, 'status_url': status_url}, status.HTTP_202_ACCEPTED,
+            {'Location': status_url})
+
+
+def stored_created_at(string_id):
+    """
+    created_at of a stored string, serialized as in its body (part of its ETag),
+    or None if it is not stored. The database is asked: the detail cache is per
+    process and may still hold an entry deleted by another worker.
+    """
+    created_at = StringEntry.objects.filter(pk=string_id).values_list('created_at', flat=True).first()
+    return created_at_formatter()(created_at) if created_at is not None else None
+
+
+def row_position(row):
+    """(created_at, id) of a values_list(*ENTRY_FIELDS) row, for cursor pagination."""
+    return row[ENTRY_FIELDS.index('created_at')], row[ENTRY_FIELDS.index('id')]
+
+
+def filter_strings(query_params):
+    """
+    Applies the query-parameter and natural-language filters of GET /strings.
+    Returns the (lazy) filtered queryset and the filters_applied dict.
+    Shared by the sync and async list views.
+    """
+    queryset = StringEntry.objects.all()
+    filters_applied = {}
+    limit = parse_limit(query_params.get('limit')) # Range filters are planned for one page
+    
+    # ----------------------------------------------
+    # A. Implement Standard Query Filters (25 Points)
+    # ----------------------------------------------
+    
+    # Map URL query parameters to Django ORM lookup fields
+    # This includes all common string properties with gt/lt lookups
+    lookup_map = {
+        'length_gt': 'length__gt',
+        'length_lt': 'length__lt',
+        'word_count_gt': 'word_count__gt',
+        'word_count_lt': 'word_count__lt',
+        'unique_characters_gt': 'unique_characters__gt',
+        'unique_characters_lt': 'unique_characters__lt',
+        'is_palindrome': 'is_palindrome', # Exact match filter
+    }
+    
+    for param, lookup in lookup_map.items():
+        value = query_params.get(param)
+        
+        if value is not None:
+            # Handle numeric lookups (gt/lt)
+            if lookup in ['length__gt', 'length__lt', 'word_count__gt', 'word_count__lt', 'unique_characters__gt', 'unique_characters__lt']:
+                if value.isdigit():
+                    try:
+                        # Apply the filter dynamically
+                        field, op = lookup.split('__')
+                        fraction = range_fraction(filter_statistics(), field, op, int(value))
+                        queryset = queryset.filter(plan_hint(Q(**{lookup: int(value)}), fraction, limit))
+                        filters_applied[param] = int(value)
+                    except ValueError:
+                        pass # Ignore non-integer filter values
+            
+            # Handle boolean lookups (is_palindrome)
+            elif lookup == 'is_palindrome':
+                if value.lower() in ['true', 'false']:
+                    bool_val = value.lower() == 'true'
+                    # IN, not =: Django renders `is_palindrome = true` as a bare column test, which no index serves
+                    queryset = queryset.filter(is_palindrome__in=[bool_val])
+                    filters_applied[param] = bool_val
+
+    # Inverted character index: ?contains_character=z (optionally &min_count=2)
+    character = query_params.get('contains_character')
+    if character is not None and len(character) == 1:
+        min_count = query_params.get('min_count', '')
+        min_count = int(min_count) if min_count.isdigit() and int(min_count) > 0 else 1
+        queryset = queryset.filter(id__in=characters_subquery({character}, min_count))
+        filters_applied['contains_character'] = character
+        filters_applied['min_count'] = min_count
+
+    # Substring / prefix search through the trigram index: ?contains=abc, ?startswith=abc
+    for param, prefix in (('contains', False), ('startswith', True)):
+        term = query_params.get(param)
+        if term:
+            queryset = filter_value(queryset, term, prefix=prefix)
+            filters_applied[param] = term
+
+    # ----------------------------------------------------
+    # B. Implement Natural Language Filter (20 Points)
+    # ----------------------------------------------------
+    nl_query = query_params.get('natural_language_filter')
+    if nl_query:
+        nl_query = nl_query.lower()
+        q_objects = Q()
+        statistics = filter_statistics()
+        total = statistics[TOTAL] or 1
+        fraction = 0.0 # Upper bound of the matching rows (steers the plan, see plan_hint())
+        
+        # Simple keyword detection using OR logic
+        if "palindrome" in nl_query:
+            q_objects |= Q(is_palindrome__in=[True])
+            fraction += statistics[PALINDROMES] / total
+        if "not palindrome" in nl_query or "non-palindrome" in nl_query:
+             q_objects |= Q(is_palindrome__in=[False])
+             fraction += 1 - statistics[PALINDROMES] / total
+        if "long" in nl_query:
+            # Use a reasonable threshold for 'long'
+            q_objects |= Q(length__gt=20) 
+            fraction += range_fraction(statistics, 'length', 'gt', 20)
+        if "short" in nl_query:
+            # Use a reasonable threshold for 'short'
+            q_objects |= Q(length__lt=5)
+            fraction += range_fraction(statistics, 'length', 'lt', 5)
+        if "unique" in nl_query or "distinct" in nl_query:
+            # Example: strings with a high number of unique characters
+             q_objects |= Q(unique_characters__gt=10)
+             fraction += range_fraction(statistics, 'unique_characters', 'gt', 10)
+        letter_match = NL_CONTAINS_LETTER_RE.search(nl_query)
+        if letter_match:
+            # e.g. "strings containing the letter z" (either case, via the character index)
+            letter = letter_match.group(1)
+            q_objects |= Q(id__in=characters_subquery({letter, letter.upper()}))
+            fraction += sum(statistics[CHARACTER].get(c, 0) for c in {letter, letter.upper()}) / total
+
+        if q_objects:
+            # Apply combined Q objects to the queryset
+            queryset = queryset.filter(plan_hint(q_objects, min(fraction, 1.0), limit))
+            filters_applied['natural_language_filter'] = nl_query
+
+    return queryset, filters_applied
+
+
 class StringListCreateView(APIView):
     """
     Handles POST /strings for creation/analysis and GET /strings for listing/filtering.
     """
-    
+    # NDJSON is only used by the streaming export mode of GET /strings
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
 
     # 1. POST /strings 
     def post(self, request, *args, **kwargs):
@@ -25,28 +194,20 @@ class StringListCreateView(APIView):
             return Response(input_serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
         string_value = input_serializer.validated_data['value']
+
+        # Write-behind mode: queue it, analysis and insert happen in batches (202 / 429)
+        if ingest_enabled():
+            data, status_code, headers = enqueue_ingest(string_value)
+            return Response(data, status=status_code, headers=headers)
         
         # 2. Analyze String
         analysis_result = analyze_string(string_value)
-        props = analysis_result['properties']
         
-        # 3. Prepare Data for Model Creation
-        data_to_save = {
-            'id': analysis_result['id'], # Use hash as PK
-            'value': analysis_result['value'],
-            'length': props['length'],
-            'is_palindrome': props['is_palindrome'],
-            'unique_characters': props['unique_characters'],
-            'word_count': props['word_count'],
-            'sha256_hash': props['sha256_hash'],
-            'character_frequency_map': props['character_frequency_map'],
-        }
-        
-        # 4. Attempt to save (Handles 409 Conflict)
+        # 3. Attempt to save (Handles 409 Conflict)
         try:
-            instance = StringEntry.objects.create(**data_to_save)
+            instance = create_entry(analysis_result)
             
-            # 5. Success Response (201 Created)
+            # 4. Success Response (201 Created)
             output_serializer = StringEntrySerializer(instance)
             return Response(output_serializer.data, status=status.HTTP_201_CREATED)
             
@@ -59,123 +220,295 @@ class StringListCreateView(APIView):
   # analyzer_app/views.py (StringListCreateView - complete get method)
 
     # 2. GET /strings (Handles listing and filtering - 45 Points)
+    def filter_queryset(self, request):
+        return filter_strings(request.query_params)
+
     def get(self, request, *args, **kwargs):
-        queryset = StringEntry.objects.all()
-        filters_applied = {}
-        
+        queryset, filters_applied = self.filter_queryset(request)
+
+        # Streaming export: ?stream=1 or Accept: application/x-ndjson
+        if request.query_params.get('stream') == '1' or request.accepted_renderer.format == 'ndjson':
+            return self.stream(queryset)
+
         # ----------------------------------------------
-        # A. Implement Standard Query Filters (25 Points)
+        # C. Pagination parameters and the list cache
         # ----------------------------------------------
-        
-        # Map URL query parameters to Django ORM lookup fields
-        # This includes all common string properties with gt/lt lookups
-        lookup_map = {
-            'length_gt': 'length__gt',
-            'length_lt': 'length__lt',
-            'word_count_gt': 'word_count__gt',
-            'word_count_lt': 'word_count__lt',
-            'unique_characters_gt': 'unique_characters__gt',
-            'unique_characters_lt': 'unique_characters__lt',
-            'is_palindrome': 'is_palindrome', # Exact match filter
-        }
-        
-        for param, lookup in lookup_map.items():
-            value = request.query_params.get(param)
-            
-            if value is not None:
-                # Handle numeric lookups (gt/lt)
-                if lookup in ['length__gt', 'length__lt', 'word_count__gt', 'word_count__lt', 'unique_characters__gt', 'unique_characters__lt']:
-                    if value.isdigit():
-                        try:
-                            # Apply the filter dynamically
-                            queryset = queryset.filter(**{lookup: int(value)})
-                            filters_applied[param] = int(value)
-                        except ValueError:
-                            pass # Ignore non-integer filter values
-                
-                # Handle boolean lookups (is_palindrome)
-                elif lookup == 'is_palindrome':
-                    if value.lower() in ['true', 'false']:
-                        bool_val = value.lower() == 'true'
-                        queryset = queryset.filter(is_palindrome=bool_val)
-                        filters_applied[param] = bool_val
-
-        # ----------------------------------------------------
-        # B. Implement Natural Language Filter (20 Points)
-        # ----------------------------------------------------
-        nl_query = request.query_params.get('natural_language_filter')
-        if nl_query:
-            nl_query = nl_query.lower()
-            q_objects = Q()
-            
-            # Simple keyword detection using OR logic
-            if "palindrome" in nl_query:
-                q_objects |= Q(is_palindrome=True)
-            if "not palindrome" in nl_query or "non-palindrome" in nl_query:
-                 q_objects |= Q(is_palindrome=False)
-            if "long" in nl_query:
-                # Use a reasonable threshold for 'long'
-                q_objects |= Q(length__gt=20) 
-            if "short" in nl_query:
-                # Use a reasonable threshold for 'short'
-                q_objects |= Q(length__lt=5)
-            if "unique" in nl_query or "distinct" in nl_query:
-                # Example: strings with a high number of unique characters
-                 q_objects |= Q(unique_characters__gt=10)
-
-            if q_objects:
-                # Apply combined Q objects to the queryset
-                queryset = queryset.filter(q_objects)
-                filters_applied['natural_language_filter'] = nl_query
+        limit = parse_limit(request.query_params.get('limit'))
+        cursor = request.query_params.get('cursor')
+
+        # The COUNT(*) query is optional: ?include_count=false skips it
+        include_count = request.query_params.get('include_count', 'true').lower() != 'false'
+
+        # The generation is read before querying, so a write that lands while this
+        # request runs can only leave an entry under a generation nobody asks for again
+        list_cache = get_list_cache()
+        cache_key = list_cache_key(write_generation(), filters_applied,
+                                   limit=limit, cursor=cursor, include_count=include_count)
+
+        # Same key => same body, so the key also gives the ETag: 304 while nothing was written
+        headers = list_cache_headers(cache_key, request.accepted_renderer.format)
+        if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+            return HttpResponseNotModified(headers=headers)
+
+        response_data = list_cache.get(cache_key)
+        if response_data is not None:
+            return Response(response_data, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT', **headers})
 
         # ----------------------------------------------
-        # C. Final Serialization and Response
+        # D. Keyset Pagination on (created_at, id)
+        # ----------------------------------------------
+        rows, next_cursor = paginate(queryset.values_list(*ENTRY_FIELDS), cursor, limit, position=row_position)
+
+        # ----------------------------------------------
+        # E. Final Serialization (fast read path) and Response
         # ----------------------------------------------
-        
-        output_serializer = StringEntrySerializer(queryset, many=True)
         
         response_data = {
-            "data": output_serializer.data,
-            "count": queryset.count(),
+            "data": serialize_rows(rows),
+            "count": queryset.count() if include_count else None,
+            "next": next_cursor,
             "filters_applied": filters_applied 
         }
+        list_cache.set(cache_key, response_data)
+        return Response(response_data, status=status.HTTP_200_OK, headers={'X-Cache': 'MISS', **headers})
+
+    def stream(self, queryset):
+        """
+        Streams every matching row as NDJSON. Rows are read with a chunked
+        iterator and encoded one at a time, so memory use does not grow with
+        the size of the result set.
+        """
+        chunk_size = getattr(settings, 'STRING_STREAM_CHUNK_SIZE', 2000)
+        rows = queryset.order_by(*LIST_ORDERING).values_list(*ENTRY_FIELDS).iterator(chunk_size=chunk_size)
+        format_created_at = created_at_formatter()
+        lines = (encode_ndjson_line(serialize_row(row, format_created_at)) for row in rows)
+        return StreamingHttpResponse(lines, content_type=NDJSONRenderer.media_type)
+
+
+class StringBatchCreateView(APIView):
+    """
+    Handles POST /strings/batch for creating/analyzing many strings in one request.
+    """
+
+    def post(self, request, *args, **kwargs):
+        # 1. Validate the envelope {"values": [...]} (422 if malformed)
+        input_serializer = StringBatchInputSerializer(data=request.data)
+        if not input_serializer.is_valid():
+            return Response(input_serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # 2. Validate every item, then analyze the valid ones as a single batch
+        results = []
+        valid = [] # (result index, value)
+        for raw_value in input_serializer.validated_data['values']:
+            string_value, error = validate_batch_item(raw_value)
+            if error:
+                results.append({'value': raw_value, 'status': status.HTTP_422_UNPROCESSABLE_ENTITY, 'error': error})
+                continue
+            valid.append((len(results), string_value))
+            results.append(None) # Filled in once we know whether it was created
+
+        to_insert = {} # id -> (result index, analysis), first occurrence wins
+        analysis_results = analyze_strings(string_value for _, string_value in valid)
+        for (index, string_value), analysis_result in zip(valid, analysis_results):
+            if analysis_result['id'] in to_insert:
+                # Duplicate inside the same batch
+                results[index] = {'value': string_value, 'status': status.HTTP_409_CONFLICT,
+                                  'error': 'String already exists in the system'}
+                continue
+            to_insert[analysis_result['id']] = (index, analysis_result)
+
+        # 3. Chunked bulk insert; strings already stored are skipped (one id__in lookup per chunk)
+        instances = bulk_create_entries(analysis_result for _, analysis_result in to_insert.values())
+        output_serializer = StringEntrySerializer(instances, many=True)
+        created = {data['id']: data for data in output_serializer.data}
+        for string_id, (index, analysis_result) in to_insert.items():
+            if string_id in created:
+                results[index] = {'value': analysis_result['value'], 'status': status.HTTP_201_CREATED,
+                                  'data': created[string_id]}
+            else:
+                # Already stored
+                results[index] = {'value': analysis_result['value'], 'status': status.HTTP_409_CONFLICT,
+                                  'error': 'String already exists in the system'}
+
+        response_data = {
+            "results": results,
+            "created": len(instances),
+            "conflicts": sum(1 for item in results if item['status'] == status.HTTP_409_CONFLICT),
+            "invalid": sum(1 for item in results if item['status'] == status.HTTP_422_UNPROCESSABLE_ENTITY),
+        }
         return Response(response_data, status=status.HTTP_200_OK)
 
 
+class StringUploadView(APIView):
+    """
+    Handles POST /strings/upload: analyzes a text/plain body of any size (up to
+    STRING_UPLOAD_MAX_BYTES) with constant memory. The result is returned, not stored.
+    """
+
+    def post(self, request, *args, **kwargs):
+        # 1. Only raw UTF-8 text is accepted (the JSON endpoints cap values at 500 chars)
+        if not request.content_type.startswith('text/plain'):
+            raise UnsupportedMediaType(request.content_type)
+
+        # 2. Spool the body to a temp file chunk by chunk (413 if too large)
+        try:
+            path, size = spool_body(request.read)
+        except UploadTooLarge:
+            return Response({'error': 'Upload exceeds the maximum allowed size'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        # 3. Analyze it (in the upload process pool when large) and clean up
+        try:
+            if size == 0:
+                return Response({'value': ['This field may not be blank.']},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            analysis_result = submit_analysis(path, size).result()
+        except UnicodeDecodeError:
+            return Response({'error': 'Upload is not valid UTF-8 text'}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            os.unlink(path)
+
+        # 4. Same id and properties as POST /strings would compute
+        return Response(analysis_result, status=status.HTTP_200_OK)
+
+
 class StringDetailView(APIView):
     """
     Handles GET /strings/{value} and DELETE /strings/{value}
     """
 
-    def get_object(self, string_value):
+    def get_object(self, string_id):
         """Helper method to retrieve the object or raise 404."""
-        # The URL parameter 'string_value' is the actual string (URL-decoded).
+        if definitely_missing(string_id): # Never stored: no query needed
+            raise NotFound(detail="String not found in the database.")
         try:
-            # We look up the object by the original string value.
-            return StringEntry.objects.get(value=string_value)
+            # The PK is the SHA-256 of the value, so this is a fixed-width PK lookup
+            return StringEntry.objects.get(pk=string_id)
         except StringEntry.DoesNotExist:
             # The requirement is to return a 404 error if the resource is not found.
             raise NotFound(detail="String not found in the database.")
 
-    # 1. GET /strings/{value} (15 points)
+    # 2. GET /strings/{value} (15 points)
     def get(self, request, string_value, *args, **kwargs):
-        # 1. Retrieve object (raises 404 if not found)
-        instance = self.get_object(string_value)
+        # The URL parameter 'string_value' is the actual string (URL-decoded).
+        string_id = hash_value(string_value)
+        representation = request.accepted_renderer.format
+
+        # 1. Ids the Bloom filter has never seen are not stored: 404 without a query
+        if definitely_missing(string_id):
+            raise NotFound(detail="String not found in the database.")
+
+        # 2. Conditional GET: entries never change, so a client holding the ETag of
+        #    the stored row (id + created_at) is up to date (304 without serializing)
+        created_at = None
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            created_at = stored_created_at(string_id)
+            if created_at is None:
+                raise NotFound(detail="String not found in the database.")
+            headers = detail_cache_headers(string_id, created_at, representation)
+            if etag_matches(if_none_match, headers['ETag']):
+                return HttpResponseNotModified(headers=headers)
+
+        # 3. Hot keys are answered from the detail cache without touching the DB
+        #    (unless step 2 found a newer row than the cached one)
+        detail_cache = get_detail_cache()
+        data = detail_cache.get(string_id)
+        if data is not None and created_at in (None, data['created_at']):
+            headers = detail_cache_headers(string_id, data['created_at'], representation)
+            return Response(data, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT', **headers})
+
+        # 4. Retrieve the row (404 if not found)
+        row = StringEntry.objects.filter(pk=string_id).values_list(*ENTRY_FIELDS).first()
+        if row is None:
+            raise NotFound(detail="String not found in the database.")
         
-        # 2. Serialize and return (200 OK)
-        serializer = StringEntrySerializer(instance)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # 5. Serialize (fast read path), cache and return (200 OK)
+        data = serialize_row(row)
+        detail_cache.set(string_id, data)
+        headers = detail_cache_headers(string_id, data['created_at'], representation)
+        return Response(data, status=status.HTTP_200_OK, headers={'X-Cache': 'MISS', **headers})
 
 
-    # 2. DELETE /strings/{value} (15 points)
+    # 3. DELETE /strings/{value} (15 points)
     
     def delete(self, request, string_value, *args, **kwargs):
         # 1. Retrieve object (raises 404 if not found)
-        instance = self.get_object(string_value)
+        instance = self.get_object(hash_value(string_value))
         
-        # 2. Delete the object
-        instance.delete()
+        # 2. Delete the object (also invalidates the detail cache)
+        delete_entry(instance)
         
         # 3. Success Response (204 No Content)
         # 204 is the standard successful response for DELETE requests with no body.
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class StringStatsView(APIView):
+    """
+    Handles GET /strings/stats: aggregate statistics over every stored string,
+    summed from the incrementally maintained StatsCounter rows (no table scan).
+    "stats" is a reserved value: a stored string "stats" is read through
+    /async/strings/stats and deleted with DELETE /strings/stats.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(stats_payload(), status=status.HTTP_200_OK)
+
+
+class StringIngestStatusView(APIView):
+    """
+    Handles GET /strings/ingest/{id}: status of a value queued by a write-behind
+    POST /strings. 202 while pending, 200 once written ("created", "conflict" if
+    it was already stored, or "failed"), 404 for unknown ids.
+    """
+
+    def get(self, request, string_id, *args, **kwargs):
+        # 1. Items queued by this worker process
+        known = get_ingest_queue().status(string_id)
+        if known is not None:
+            item_status, error = known
+            data = {'id': string_id, 'status': item_status}
+            if error:
+                data['error'] = error
+            return Response(data, status=status.HTTP_202_ACCEPTED if item_status == PENDING else status.HTTP_200_OK)
+
+        # 2. Queued by another worker (or finished long ago): it is either stored or unknown
+        if StringEntry.objects.filter(pk=string_id).exists():
+            return Response({'id': string_id, 'status': CREATED}, status=status.HTTP_200_OK)
+        raise NotFound(detail="No ingest found for this id.")
+
+
+class StringSimilarView(APIView):
+    """
+    Handles GET /strings/{value}/similar?k=10: the stored strings whose character
+    distribution is closest to the one of the stored string {value} (404 if it is not stored).
+    """
+
+    def get(self, request, string_value, *args, **kwargs):
+        # 1. Number of results (default 10, capped by STRING_SIMILAR_MAX_K)
+        raw_k = request.query_params.get('k', '')
+        k = int(raw_k) if raw_k.isdigit() and int(raw_k) > 0 else 10
+        k = min(k, getattr(settings, 'STRING_SIMILAR_MAX_K', 100))
+
+        # 2. Character distribution of the stored string (404 if not found) and its LSH buckets
+        string_id = hash_value(string_value)
+        frequency_map = None
+        if not definitely_missing(string_id):
+            frequency_map = StringEntry.objects.filter(pk=string_id).values_list(
+                'character_frequency_map', flat=True).first()
+        if frequency_map is None:
+            raise NotFound(detail="String not found in the database.")
+
+        # 3. LSH candidates ranked by exact similarity (the value itself is excluded)
+        matches, candidates = similar_entries(frequency_map, lsh_bands(frequency_map), k, exclude_id=string_id)
+
+        format_created_at = created_at_formatter()
+        response_data = {
+            "value": string_value,
+            "k": k,
+            "candidates": candidates,
+            "data": [{**serialize_row(row, format_created_at), "similarity": round(similarity, 4)}
+                     for similarity, row in matches],
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
@@ -0,0 +1,25 @@
+# gunicorn_asgi.conf.py
+# ASGI deployment: gunicorn manages uvicorn workers, which serve the async views
+# under /async/strings without blocking a worker per in-flight database call.
+# The sync DRF views keep working (Django runs them in a thread pool).
+#
+#   gunicorn string_analyzer.asgi:application -c gunicorn_asgi.conf.py
+#
+# The Procfile keeps the WSGI deployment; swap its web command for the line above
+# to switch. Compare both with `python manage.py bench_asgi`.
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# One event loop per core is enough: workers do not block on I/O
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+
+# Seconds a worker gets to finish after SIGTERM, write-behind drain included:
+# keep it well above STRING_INGEST['DRAIN_TIMEOUT']
+graceful_timeout = 30
+
+# Same logging as the Procfile (--log-file -)
+errorlog = '-'
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analyzer_app.middleware.RequestMetricsMiddleware', # First: its timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -76,11 +78,47 @@ WSGI_APPLICATION = 'string_analyzer.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database profile, chosen with DB_ENGINE: "sqlite" (default) or "postgres"
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'string_analyzer'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            # Persistent connections: a worker reuses its connection across requests
+            # (keep 0 under the ASGI deployment, where every request runs in a new thread)
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            # Reused connections are checked before use, so a restarted server is not an error
+            'CONN_HEALTH_CHECKS': True,
+            # Pooling is done by PgBouncer (DB_POOLER=pgbouncer, transaction mode), which
+            # does not support server-side cursors; .iterator() then fetches client-side
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_POOLER') == 'pgbouncer',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20, # Seconds a connection waits for the write lock before "database is locked"
+            },
+        }
     }
+
+# PRAGMAs applied to every new SQLite connection (see AnalyzerAppConfig.ready)
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'), # Readers no longer block the writer
+    'synchronous': 'normal',    # Safe with WAL: fsync at checkpoints instead of every commit
+    'busy_timeout': 20000,      # Milliseconds, same as the 'timeout' option above
+    'mmap_size': 268435456,     # 256 MiB of the file read through mmap
+    'temp_store': 'memory',
+    'cache_size': -65536,       # 64 MiB page cache per connection (negative = KiB)
 }
 
 
@@ -134,3 +172,104 @@ STORAGES = {
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Batch ingestion (POST /strings/batch)
+STRING_BATCH_MAX_SIZE = 10000   # Maximum number of values accepted per request
+STRING_BATCH_CHUNK_SIZE = 500   # Rows per id__in lookup / bulk_create statement
+STRING_INSERT_ATTEMPTS = 3      # Inserts tried before a primary key conflict with concurrent writers is raised
+
+# Keyset pagination for GET /strings
+STRING_LIST_PAGE_SIZE = 100       # Rows per page when ?limit= is not given
+STRING_LIST_MAX_PAGE_SIZE = 1000  # Upper bound for ?limit=
+
+# Streaming NDJSON export (GET /strings?stream=1)
+STRING_STREAM_CHUNK_SIZE = 2000   # Rows fetched per database round trip
+
+# Cache of GET /strings/{value} payloads, keyed by the SHA-256 id
+STRING_DETAIL_CACHE = {
+    'MAX_SIZE': 10000,     # Entries kept by the in-process LRU
+    'TTL': 300,            # Seconds (None = no expiry)
+    'MAX_STALENESS': 1,    # Seconds another worker's DELETE may go unseen by the in-process LRU (0 = check every hit)
+    'CACHE_ALIAS': None,   # Set to a shared Django cache alias (Redis/Memcached) to share entries between workers
+}
+
+# Django REST Framework
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'analyzer_app.renderers.FastJSONRenderer', # orjson when installed, stdlib json otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Cache of GET /strings responses, invalidated by a global write generation
+STRING_LIST_CACHE = {
+    'MAX_SIZE': 1000,                  # Responses kept by the in-process LRU
+    'TTL': None,                       # Generation keys already prevent stale reads
+    'CACHE_ALIAS': None,               # Shared Django cache alias for the responses themselves
+    # Where the write generation lives: None = one row in the database (shared by every
+    # worker, one PK read per list request), or a Redis/Memcached alias (atomic incr).
+    # Per-process and non-atomic backends (locmem, dummy, db, file) fail the system checks.
+    'GENERATION_CACHE_ALIAS': None,
+}
+
+# Row counts (from the stats counters) GET /strings plans range and natural-language
+# filters with: search the filtered index or walk the list order (analyzer_app.search.plan_hint)
+STRING_FILTER_STATS_CACHE = {
+    'MAX_SIZE': 1,
+    'TTL': 60,             # Seconds; the counts only steer query plans, slightly stale is fine
+}
+
+# Similarity search (GET /strings/{value}/similar)
+STRING_SIMILAR_MAX_K = 100               # Upper bound for ?k=
+STRING_SIMILAR_MAX_CANDIDATES = 2000     # LSH candidates ranked per request (most shared buckets first)
+
+# GET /strings/stats counters (analyzer_app.stats): each write adds its delta to one
+# random shard of the keys it changes, so concurrent writers rarely wait on each other
+STRING_STATS_COUNTER_SHARDS = 8
+
+# Streaming analysis of large text/plain uploads (POST /strings/upload)
+STRING_UPLOAD_MAX_BYTES = 512 * 1024 * 1024    # 413 above this size
+STRING_UPLOAD_CHUNK_SIZE = 1024 * 1024         # Bytes read/analyzed per step (bounds memory)
+STRING_UPLOAD_INLINE_BYTES = 1024 * 1024       # Smaller uploads skip the process pool
+STRING_UPLOAD_WORKERS = 2                      # Processes in the upload analysis pool (per web worker)
+
+# Request instrumentation (analyzer_app.middleware.RequestMetricsMiddleware): add a
+# Server-Timing header with the per-phase durations to every response. The /metrics
+# histograms are collected either way; disable the header to hide timings from clients.
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+
+# Write-behind ingestion (analyzer_app.ingest): with MODE 'async', POST /strings answers
+# 202 + Location /strings/ingest/{id} and a background thread per worker process inserts
+# queued values in batched transactions. 'sync' (default) stores before answering 201.
+STRING_INGEST = {
+    'MODE': os.getenv('STRING_INGEST_MODE', 'sync'),
+    'QUEUE_SIZE': 10000,   # Values queued per worker process; 429 beyond
+    'BATCH_SIZE': 500,     # Values per transaction
+    'MAX_WAIT': 0.05,      # Seconds the writer waits to fill a batch
+    'RESULT_TTL': 600,     # Seconds statuses of written values stay available
+    'DRAIN_TIMEOUT': 10,   # Seconds to finish writing the queue on shutdown (see below)
+}
+# The drain runs inside gunicorn's graceful_timeout (30s by default, and in
+# gunicorn_asgi.conf.py), after which the worker is killed with the queue unwritten.
+# Keep DRAIN_TIMEOUT well below it: the worker still has in-flight requests to finish.
+
+# Negative-lookup Bloom filter over stored ids (analyzer_app.bloom): GET/DELETE
+# /strings/{value} answer 404 for never-stored values without a database query.
+# Each worker builds its filter from the table in the background and trusts it only
+# while it is in sync with the shared write generation (database row, or a
+# Redis/Memcached alias: per-process caches fail check analyzer_app.E002). Other
+# workers' writes are then added from a created_at range scan, not a full rebuild.
+STRING_ID_FILTER = {
+    'ENABLED': os.getenv('STRING_ID_FILTER', 'false').lower() == 'true',
+    'FALSE_POSITIVE_RATE': 0.01,   # Sizes the filter: ~9.6 bits (1.2 bytes) per id at 1%
+    'CAPACITY_FACTOR': 2.0,        # Capacity = stored rows x this factor (room for new ids)
+    'MIN_CAPACITY': 100000,
+    'SYNC_INTERVAL': 1,            # Seconds between syncs (generation re-read, ids created since the last one) while lookups come in
+    'MAX_STALENESS': 2,            # Seconds the generation read by a sync is trusted: bounds how late other workers' strings are seen
+    'SYNC_OVERLAP': 30,            # Seconds re-read before the last sync: longest write transaction + clock skew
+}
+
+# Conditional GET: GET /strings/{value} and GET /strings send an ETag and answer
+# If-None-Match with 304 (analyzer_app.cache.detail_cache_headers / list_cache_headers)
+STRING_DETAIL_CACHE_CONTROL = 'no-cache' # Entries can be deleted (and stored again): always revalidate
+STRING_LIST_CACHE_CONTROL = 'no-cache'   # Lists change with every write: always revalidate
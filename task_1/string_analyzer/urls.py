@@ -2,10 +2,19 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from analyzer_app.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # Explicitly map both slashed and non-slashed prefixes
     path('strings', include('analyzer_app.urls')),
-    path('strings/', include('analyzer_app.urls')), 
-]
\ No newline at end of file
+    path('strings/', include('analyzer_app.urls')),
+
+    # Async (ASGI) variants of the list, create and detail endpoints
+    path('async/strings', include('analyzer_app.async_urls')),
+    path('async/strings/', include('analyzer_app.async_urls')),
+
+    # Prometheus metrics of this worker process
+    path('metrics', metrics_view, name='metrics'),
+]